@@ -1,7 +1,13 @@
 import psycopg2
+from psycopg2.errors import QueryCanceled
+from psycopg2.extras import execute_values
 import os
 import sys
 import hashlib
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
 
 def get_db_connection(DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD):
@@ -20,48 +26,338 @@ def get_db_connection(DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD):
         print(f"ERROR: Unable to connect to the database: {e}")
         sys.exit(1)
 
+class DatabasePool:
+    """Thread-safe pool of psycopg2 connections for concurrent pipeline workers.
+
+    Checkouts are bounded by `maxconn` and wait up to `checkout_timeout` seconds.
+    Idle connections are health-checked before reuse and replaced transparently
+    when the pooler has dropped them. Every checkout starts its transaction with
+    SET LOCAL statement_timeout, which also works behind a transaction-mode pooler.
+    """
+
+    def __init__(self, DB_HOST, DB_PORT, DB_NAME, DB_USER, DB_PASSWORD, minconn=1, maxconn=5,
+                 checkout_timeout=30.0, statement_timeout_ms=30000, health_check_interval=30.0):
+        self.connect_kwargs = dict(host=DB_HOST, port=DB_PORT, dbname=DB_NAME, user=DB_USER, password=DB_PASSWORD)
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self.statement_timeout_ms = statement_timeout_ms
+        self.health_check_interval = health_check_interval
+        self.stats = {"checkouts": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0, "reconnects": 0, "timeouts": 0}
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._idle = []  # (connection, last_used)
+        self._lock = threading.Lock()
+        self._closed = False
+        for _ in range(min(minconn, maxconn)):
+            self._idle.append((self._connect(), time.monotonic()))
+        print(f"Database pool ready ({len(self._idle)}/{maxconn} connections open).")
+
+    def _connect(self):
+        return psycopg2.connect(connect_timeout=10, **self.connect_kwargs)
+
+    def _is_healthy(self, conn, last_used):
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.health_check_interval:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            with self._lock:
+                self.stats["timeouts"] += 1
+            raise psycopg2.OperationalError(f"Timed out after {self.checkout_timeout}s waiting for a database connection.")
+        waited = time.monotonic() - started
+        with self._lock:
+            self.stats["checkouts"] += 1
+            self.stats["wait_seconds"] += waited
+            self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+            idle = self._idle.pop() if self._idle else None
+        try:
+            if idle is not None and self._is_healthy(*idle):
+                return idle[0]
+            if idle is not None:
+                self._discard(idle[0])
+                with self._lock:
+                    self.stats["reconnects"] += 1
+                print("Database connection was dropped; reconnecting.")
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _checkin(self, conn, broken=False):
+        try:
+            if broken or conn.closed or self._closed:
+                self._discard(conn)
+                return
+            if conn.status != psycopg2.extensions.STATUS_READY:
+                conn.rollback()
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        except psycopg2.Error:
+            self._discard(conn)
+        finally:
+            self._slots.release()
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    @contextmanager
+    def connection(self):
+        """Checks out a healthy connection for the duration of the block."""
+        conn = self._checkout()
+        broken = False
+        try:
+            if self.statement_timeout_ms:
+                with conn.cursor() as cursor:
+                    cursor.execute("SET LOCAL statement_timeout = %s", (int(self.statement_timeout_ms),))
+            yield conn
+        except QueryCanceled:
+            # A statement timeout aborts the transaction, not the connection:
+            # roll back and return it to the pool
+            try:
+                conn.rollback()
+            except psycopg2.Error:
+                broken = True
+            raise
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self._checkin(conn, broken)
+
+    def run(self, func, *args, retries=1, **kwargs):
+        """Calls func(conn, *args) with a pooled connection, retrying on a fresh
+        connection when the pooler drops the current one mid-call. A statement
+        timeout (QueryCanceled) is an OperationalError too, but is not retried:
+        the connection is fine and the query would only time out again."""
+        for attempt in range(retries + 1):
+            try:
+                with self.connection() as conn:
+                    return func(conn, *args, **kwargs)
+            except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+                if attempt == retries or isinstance(e, QueryCanceled):
+                    raise
+                with self._lock:
+                    self.stats["reconnects"] += 1
+                print(f"WARNING: Database connection lost ({e}); retrying with a new connection.")
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def print_stats(self):
+        s = self.stats
+        average = s["wait_seconds"] / s["checkouts"] if s["checkouts"] else 0.0
+        print(f"DB pool: checkouts={s['checkouts']} avg_wait={average * 1000:.1f}ms max_wait={s['max_wait_seconds'] * 1000:.1f}ms "
+              f"reconnects={s['reconnects']} timeouts={s['timeouts']}")
+
+# Unique indexes store_verification_batch relies on for its ON CONFLICT upserts:
+# one source per URL, one claim per (source, hash) and one evaluation per
+# (claim, model). Created once with migrate_unique_keys (--migrate-db).
+UNIQUE_KEYS = [
+    ("sources_source_url_key", "Sources (source_url)"),
+    ("claims_source_claim_hash_key", "Claims (source_id, claim_hash)"),
+    ("evaluations_claim_model_key", "Evaluations (claim_id, llm_model_used)"),
+]
+
+# Duplicates are merged into the row with the lowest id: rows that point at a
+# duplicate are repointed first, then the duplicate is deleted.
+DEDUPLICATE_STATEMENTS = [
+    ("claims repointed to their source", """
+        UPDATE Claims c SET source_id = d.keep_id
+        FROM (SELECT source_id, MIN(source_id) OVER (PARTITION BY source_url) AS keep_id FROM Sources) d
+        WHERE c.source_id = d.source_id AND d.source_id <> d.keep_id
+    """),
+    ("duplicate sources deleted", """
+        DELETE FROM Sources s
+        WHERE EXISTS (SELECT 1 FROM Sources k WHERE k.source_url = s.source_url AND k.source_id < s.source_id)
+    """),
+    ("evaluations repointed to their claim", """
+        UPDATE Evaluations e SET claim_id = d.keep_id
+        FROM (SELECT claim_id, MIN(claim_id) OVER (PARTITION BY source_id, claim_hash) AS keep_id FROM Claims) d
+        WHERE e.claim_id = d.claim_id AND d.claim_id <> d.keep_id
+    """),
+    ("duplicate claims deleted", """
+        DELETE FROM Claims c
+        WHERE EXISTS (SELECT 1 FROM Claims k WHERE k.source_id = c.source_id AND k.claim_hash = c.claim_hash
+                      AND k.claim_id < c.claim_id)
+    """),
+    ("evidence of duplicate evaluations deleted", """
+        DELETE FROM Evidence v USING Evaluations e
+        WHERE v.evaluation_id = e.evaluation_id
+          AND EXISTS (SELECT 1 FROM Evaluations k WHERE k.claim_id = e.claim_id
+                      AND k.llm_model_used = e.llm_model_used AND k.evaluation_id < e.evaluation_id)
+    """),
+    ("duplicate evaluations deleted", """
+        DELETE FROM Evaluations e
+        WHERE EXISTS (SELECT 1 FROM Evaluations k WHERE k.claim_id = e.claim_id
+                      AND k.llm_model_used = e.llm_model_used AND k.evaluation_id < e.evaluation_id)
+    """),
+]
+
+def _unique_key_status(cursor):
+    """Returns {index name: is valid} for the UNIQUE_KEYS that exist."""
+    cursor.execute("""
+        SELECT c.relname, i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = ANY(%s)
+    """, ([name for name, _ in UNIQUE_KEYS],))
+    return dict(cursor.fetchall())
+
+def has_unique_keys(conn):
+    """True when every index in UNIQUE_KEYS exists and is valid. Without them
+    batched writes cannot upsert and records are written one by one."""
+    cursor = conn.cursor()
+    try:
+        status = _unique_key_status(cursor)
+        conn.commit()
+        return all(status.get(name) for name, _ in UNIQUE_KEYS)
+    except psycopg2.Error as e:
+        print(f"WARNING: Could not check the unique keys used by batched storage: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+
+def migrate_unique_keys(conn):
+    """One-off migration behind --migrate-db: merges duplicate Sources, Claims
+    and Evaluations in one transaction, then builds UNIQUE_KEYS with CREATE
+    UNIQUE INDEX CONCURRENTLY so running writers are not blocked. An invalid
+    index left by an earlier failed build is dropped and rebuilt. Returns True
+    when every index is in place."""
+    conn.rollback()  # End the pool's transaction and its statement_timeout
+    cursor = conn.cursor()
+    try:
+        for description, sql in DEDUPLICATE_STATEMENTS:
+            cursor.execute(sql)
+            print(f"Migration: {cursor.rowcount} {description}.")
+        conn.commit()
+
+        conn.autocommit = True  # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+        status = _unique_key_status(cursor)
+        for name, target in UNIQUE_KEYS:
+            if status.get(name):
+                print(f"Migration: index {name} already exists.")
+                continue
+            if name in status:
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+            print(f"Migration: creating index {name} on {target}...")
+            cursor.execute(f"CREATE UNIQUE INDEX CONCURRENTLY {name} ON {target}")
+        return True
+    except psycopg2.Error as e:
+        # Rows written concurrently can reintroduce a duplicate; running the migration again merges it
+        print(f"ERROR: Migration failed: {e}")
+        if not conn.autocommit:
+            conn.rollback()
+        return False
+    finally:
+        conn.autocommit = False
+        cursor.close()
+
+def compute_claim_hash(claim_text):
+    """SHA-256 hex digest used as Claims.claim_hash."""
+    return hashlib.sha256(claim_text.encode()).hexdigest()
+
+def fetch_evaluated_claim_keys(conn, claim_keys, GEMINI_MODEL_NAME):
+    """Returns the subset of (source_url, claim_hash) pairs that already have an
+    evaluation by GEMINI_MODEL_NAME, using a single query for the whole batch.
+    Raises psycopg2.Error after rolling back on failure."""
+    if not claim_keys:
+        return set()
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT DISTINCT s.source_url, c.claim_hash
+            FROM Claims c
+            JOIN Sources s ON s.source_id = c.source_id
+            JOIN Evaluations e ON e.claim_id = c.claim_id
+            WHERE c.claim_hash = ANY(%s) AND e.llm_model_used = %s
+        """, (list({claim_hash for _, claim_hash in claim_keys}), GEMINI_MODEL_NAME))
+        found = set(cursor.fetchall())
+        conn.commit()
+        return found & set(claim_keys)
+    except psycopg2.Error:
+        # Raised so DatabasePool.run can retry; an empty result would send
+        # every claim of the batch to search and Gemini again
+        conn.rollback()
+        raise
+    finally:
+        if cursor: cursor.close()
+
+def fetch_stored_claim_texts(conn, platforms, limit=5000):
+    """Returns the texts of the most recent stored claims from `platforms`.
+    Only evaluations that contained a verifiable claim are stored, so these
+    are the positive examples for the pre-filter."""
+    cursor = None
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT c.claim_text
+            FROM Claims c
+            JOIN Sources s ON s.source_id = c.source_id
+            WHERE s.platform = ANY(%s)
+            ORDER BY c.date_extracted DESC
+            LIMIT %s
+        """, (list(platforms), limit))
+        texts = [claim_text for (claim_text,) in cursor.fetchall()]
+        conn.commit()
+        return texts
+    except psycopg2.Error as e:
+        print(f"ERROR: Database error while reading stored claims: {e}")
+        if conn: conn.rollback()
+        return []
+    finally:
+        if cursor: cursor.close()
+
+def is_no_claim_evaluation(evaluation_data):
+    """True when the LLM found no verifiable claim; such results are not stored."""
+    rating = evaluation_data['truthfulness_rating']
+    reasoning = evaluation_data.get('llm_reasoning', '')
+    claims_detected = evaluation_data.get('claims_detected', '')
+
+    # List of phrases that indicate no verifiable claims were found
+    no_claims_indicators = [
+        "inga verifierbara påståenden",
+        "ingen verifierbar",
+        "inga påståenden",
+        "inga faktapåståenden",
+        "innehåller inte något påstående",
+        "innehåller inte några påståenden",
+        "no verifiable claims",
+        "no factual claims",
+        "cannot verify"
+    ]
+
+    # Check in rating, reasoning and claims detected (case-insensitive)
+    for text in (rating, reasoning, claims_detected):
+        if text and any(indicator in text.lower() for indicator in no_claims_indicators):
+            return True
+    return rating == "Inga verifierbara påståenden hittades" or rating == "Cannot Verify"
+
 def store_verification_data(conn, source_data, claim_data, evaluation_data, evidence_list, GEMINI_MODEL_NAME):
     """Stores all collected data into the database using a transaction.
     Skips storage if the LLM determines there's no verifiable claim."""
     cursor = None
     try:
-        # Enhanced check for non-claim content
-        rating = evaluation_data['truthfulness_rating']
-        reasoning = evaluation_data.get('llm_reasoning', '')
-        claims_detected = evaluation_data.get('claims_detected', '')
-        
-        # List of phrases that indicate no verifiable claims were found
-        no_claims_indicators = [
-            "inga verifierbara påståenden",
-            "ingen verifierbar",
-            "inga påståenden",
-            "inga faktapåståenden",
-            "innehåller inte något påstående",
-            "innehåller inte några påståenden",
-            "no verifiable claims",
-            "no factual claims",
-            "cannot verify"
-        ]
-        
-        # Check in rating, reasoning and claims detected
-        skip_storage = False
-        
-        # Check rating (case-insensitive)
-        if rating and any(indicator in rating.lower() for indicator in no_claims_indicators):
-            skip_storage = True
-        
-        # Check reasoning and claims detected for no-claim indicators
-        if reasoning and any(indicator in reasoning.lower() for indicator in no_claims_indicators):
-            skip_storage = True
-        
-        if claims_detected and any(indicator in claims_detected.lower() for indicator in no_claims_indicators):
-            skip_storage = True
-            
         # Skip storage for content without verifiable claims
-        if skip_storage or rating == "Inga verifierbara påståenden hittades" or rating == "Cannot Verify":
+        if is_no_claim_evaluation(evaluation_data):
             print(f"LLM determined that no verifiable claims were found. Skipping database storage.")
-            print(f"Rating: {rating}")
-            print(f"Reasoning excerpt: {reasoning[:100]}...")
+            print(f"Rating: {evaluation_data['truthfulness_rating']}")
+            print(f"Reasoning excerpt: {(evaluation_data.get('llm_reasoning') or '')[:100]}...")
             return True
 
         cursor = conn.cursor()
@@ -85,7 +381,7 @@ def store_verification_data(conn, source_data, claim_data, evaluation_data, evid
             source_id = cursor.fetchone()[0]
             print(f"New Source inserted with ID: {source_id}")
         # 2. Check for existing claim with the same hash before inserting
-        claim_hash = hashlib.sha256(claim_data['claim_text'].encode()).hexdigest()
+        claim_hash = compute_claim_hash(claim_data['claim_text'])
         cursor.execute("SELECT claim_id FROM Claims WHERE claim_hash = %s AND source_id = %s", 
                       (claim_hash, source_id))
         existing_claim = cursor.fetchone()
@@ -163,3 +459,223 @@ def store_verification_data(conn, source_data, claim_data, evaluation_data, evid
     finally:
         if cursor: cursor.close()
 
+
+
+def store_verification_batch(conn, records, GEMINI_MODEL_NAME):
+    """Stores many verification results in one transaction with a handful of
+    multi-row statements instead of a SELECT/INSERT round trip per row.
+
+    `records` is a list of (source_data, claim_data, evaluation_data, evidence_list)
+    tuples, the same arguments store_verification_data takes. Returns the number
+    of evaluations inserted; raises psycopg2.Error after rolling back on failure.
+    """
+    records = [record for record in records if not is_no_claim_evaluation(record[2])]
+    if not records:
+        return 0
+    cursor = conn.cursor()
+    try:
+        # 1. Sources: look up existing rows, insert the rest in one statement
+        sources = {}
+        for source_data, _, _, _ in records:
+            sources.setdefault(source_data['source_url'], source_data)
+        cursor.execute("SELECT source_url, source_id FROM Sources WHERE source_url = ANY(%s)", (list(sources),))
+        source_ids = dict(cursor.fetchall())
+        new_sources = [s for url, s in sources.items() if url not in source_ids]
+        if new_sources:
+            inserted = execute_values(cursor, """
+                INSERT INTO Sources (platform, source_url, author_id, author_username, post_timestamp, fetch_timestamp)
+                VALUES %s ON CONFLICT (source_url) DO NOTHING RETURNING source_url, source_id
+            """, [(s['platform'], s['source_url'], s.get('author_id'), s.get('author_username'),
+                   s.get('post_timestamp'), s['fetch_timestamp']) for s in new_sources], fetch=True)
+            source_ids.update(dict(inserted))
+            missing = [url for url in sources if url not in source_ids]
+            if missing:  # Inserted concurrently by another writer
+                cursor.execute("SELECT source_url, source_id FROM Sources WHERE source_url = ANY(%s)", (missing,))
+                source_ids.update(dict(cursor.fetchall()))
+
+        # 2. Claims: keyed by (source_id, claim_hash) like store_verification_data
+        claims = {}
+        for source_data, claim_data, _, _ in records:
+            key = (source_ids[source_data['source_url']], compute_claim_hash(claim_data['claim_text']))
+            claims.setdefault(key, claim_data)
+        cursor.execute("""
+            SELECT source_id, claim_hash, claim_id FROM Claims
+            WHERE source_id = ANY(%s) AND claim_hash = ANY(%s)
+        """, (list({key[0] for key in claims}), list({key[1] for key in claims})))
+        claim_ids = {(source_id, claim_hash): claim_id for source_id, claim_hash, claim_id in cursor.fetchall()}
+        new_claims = [(key, c) for key, c in claims.items() if key not in claim_ids]
+        if new_claims:
+            inserted = execute_values(cursor, """
+                INSERT INTO Claims (source_id, claim_text, claim_hash, extraction_method, date_extracted)
+                VALUES %s ON CONFLICT (source_id, claim_hash) DO NOTHING RETURNING source_id, claim_hash, claim_id
+            """, [(key[0], c['claim_text'], key[1], c.get('extraction_method', 'full_tweet_text'), c['date_extracted'])
+                  for key, c in new_claims], fetch=True)
+            claim_ids.update({(source_id, claim_hash): claim_id for source_id, claim_hash, claim_id in inserted})
+            missing = [key for key in claims if key not in claim_ids]
+            if missing:  # Inserted concurrently by another writer
+                cursor.execute("""
+                    SELECT source_id, claim_hash, claim_id FROM Claims
+                    WHERE source_id = ANY(%s) AND claim_hash = ANY(%s)
+                """, (list({key[0] for key in missing}), list({key[1] for key in missing})))
+                claim_ids.update({(source_id, claim_hash): claim_id for source_id, claim_hash, claim_id in cursor.fetchall()})
+
+        # 3. Evaluations: skip claims that already have one for this model
+        pending = {}
+        for source_data, claim_data, evaluation_data, evidence_list in records:
+            claim_id = claim_ids[(source_ids[source_data['source_url']], compute_claim_hash(claim_data['claim_text']))]
+            model = evaluation_data.get('llm_model_used', GEMINI_MODEL_NAME)
+            pending.setdefault((claim_id, model), (evaluation_data, evidence_list))
+        cursor.execute("""
+            SELECT claim_id, llm_model_used FROM Evaluations
+            WHERE claim_id = ANY(%s) AND llm_model_used = ANY(%s)
+        """, (list({key[0] for key in pending}), list({key[1] for key in pending})))
+        for existing in cursor.fetchall():
+            pending.pop(tuple(existing), None)
+        if not pending:
+            conn.commit()
+            return 0
+        # RETURNING order is not guaranteed, so evidence is matched by key;
+        # evaluations inserted concurrently by another writer are not returned
+        inserted = execute_values(cursor, """
+            INSERT INTO Evaluations (claim_id, evaluation_timestamp, llm_model_used, search_api_used,
+                                     search_query_used, truthfulness_rating, truthfulness_score,
+                                     llm_reasoning, evaluation_status)
+            VALUES %s ON CONFLICT (claim_id, llm_model_used) DO NOTHING
+            RETURNING claim_id, llm_model_used, evaluation_id
+        """, [(claim_id, e['evaluation_timestamp'], model, e.get('search_api_used', 'tavily_search_api'),
+               e.get('search_query_used'), e['truthfulness_rating'], e.get('truthfulness_score'),
+               e['llm_reasoning'], e.get('evaluation_status', 'Completed'))
+              for (claim_id, model), (e, _) in pending.items()], fetch=True)
+
+        # 4. Evidence for every new evaluation in a single statement
+        evidence_timestamp = datetime.now(timezone.utc)
+        evidence_rows = [
+            (evaluation_id, evidence.get('url'), evidence.get('title'), evidence.get('snippet'),
+             evidence_timestamp, 'sv', evidence.get('relevance_score'))
+            for claim_id, model, evaluation_id in inserted
+            for evidence in pending[(claim_id, model)][1]
+        ]
+        if evidence_rows:
+            execute_values(cursor, """
+                INSERT INTO Evidence (evaluation_id, evidence_url, evidence_title, evidence_snippet,
+                                       retrieved_timestamp, language, relevance_score)
+                VALUES %s
+            """, evidence_rows)
+
+        conn.commit()
+        return len(inserted)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+class BatchWriter:
+    """Write-behind persistence for verification results.
+
+    `submit()` only enqueues a record; a background thread groups records and
+    writes them with store_verification_batch once `batch_size` are queued or
+    `flush_interval` seconds have passed. If a batch fails it is retried record
+    by record with store_verification_data so one bad row cannot drop the rest.
+    Each flush checks out its own connection from the DatabasePool.
+    `flush()` waits until everything submitted so far is written; `close()`
+    flushes everything still queued and stops the thread. `on_written`, if
+    given, is called from the writer thread with the records that were written
+    (or deliberately skipped as containing no claim). With `batched=False`
+    (the unique keys are missing) every record is written on its own.
+    """
+
+    def __init__(self, pool, GEMINI_MODEL_NAME, batch_size=50, flush_interval=5.0, on_written=None, batched=True):
+        self.pool = pool
+        self.batched = batched
+        self.on_written = on_written
+        self.model_name = GEMINI_MODEL_NAME
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.stats = {"submitted": 0, "stored": 0, "batches": 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, source_data, claim_data, evaluation_data, evidence_list):
+        if self._closed:
+            raise RuntimeError("BatchWriter is closed.")
+        with self._stats_lock:
+            self.stats["submitted"] += 1
+        self._queue.put((source_data, claim_data, evaluation_data, evidence_list))
+
+    def flush(self):
+        """Blocks until every record submitted so far has been written."""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Flushes queued records and stops the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        print(f"DB writer: {self.stats['stored']} evaluations stored in {self.stats['batches']} batches "
+              f"({self.stats['failed']} failed records).")
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = []
+            flushed = None  # Event of a flush() caller waiting for this batch
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    record = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                if isinstance(record, threading.Event):
+                    flushed = record
+                    break
+                batch.append(record)
+            if batch:
+                self._flush(batch)
+            if flushed is not None:
+                flushed.set()
+
+    def _flush(self, batch):
+        if self.batched:
+            try:
+                stored = self.pool.run(store_verification_batch, batch, self.model_name)
+                self.stats["stored"] += stored
+                self.stats["batches"] += 1
+                print(f"DB writer: flushed {len(batch)} results ({stored} new evaluations).")
+                self._written(batch)
+                return
+            except Exception as e:
+                print(f"ERROR: Batched storage failed ({e}); retrying {len(batch)} records one by one.")
+        written = []
+        for record in batch:
+            source_data, claim_data, evaluation_data, evidence_list = record
+            try:
+                stored = self.pool.run(store_verification_data, source_data, claim_data, evaluation_data, evidence_list, self.model_name)
+            except psycopg2.Error as e:
+                print(f"ERROR: Could not get a database connection for storage: {e}")
+                stored = False
+            self.stats["stored" if stored else "failed"] += 1
+            if stored:
+                written.append(record)
+        self._written(written)
+
+    def _written(self, records):
+        if self.on_written is None or not records:
+            return
+        try:
+            self.on_written(records)
+        except Exception as e:
+            print(f"ERROR: BatchWriter on_written callback failed: {e}")
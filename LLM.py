@@ -1,7 +1,86 @@
-import google.generativeai as genai
+import json
+import os
 import re
+import threading
+from llm_cache import get_llm_cache, llm_cache_key
+from ratelimit import get_rate_limiter, is_throttling_error
+from prompts import PROMPT_TEMPLATE_VERSION, build_claim_prompt, build_batch_prompt
 
-def evaluate_claim_with_llm(claim_text, search_results, llm_model=genai.GenerativeModel(), metadata=None):
+NO_CLAIMS_PHRASE = "Inga verifierbara påståenden hittades"
+VALID_RATINGS = ['Likely True', 'Likely False', 'Misleading', 'Uncertain', 'Cannot Verify', NO_CLAIMS_PHRASE]
+
+# Structured output: Gemini is asked for JSON constrained to EVALUATION_SCHEMA and the
+# reply is validated in one pass; the free-text regex parser remains the fallback.
+LLM_STRUCTURED_OUTPUT = os.getenv("LLM_STRUCTURED_OUTPUT", "true").lower() in ("1", "true", "yes")
+
+EVALUATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "claims_detected": {"type": "string"},
+        "rating": {"type": "string", "enum": VALID_RATINGS},
+        "reasoning": {"type": "string"},
+        "truthfulness_score": {"type": "number", "nullable": True},
+    },
+    "required": ["claims_detected", "rating", "reasoning", "truthfulness_score"],
+}
+STRUCTURED_GENERATION_CONFIG = {"response_mime_type": "application/json", "response_schema": EVALUATION_SCHEMA}
+# The batch reply is keyed by item number, which a fixed schema cannot express
+BATCH_GENERATION_CONFIG = {"response_mime_type": "application/json"}
+
+SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+]
+
+_models = {}
+_models_lock = threading.Lock()
+
+def get_gemini_model(model_name=None, api_key=None):
+    """Returns the process-wide Gemini model. The SDK is imported, configured and
+    the model built on first use, so importing this module stays cheap."""
+    model_name = model_name or os.getenv("GEMINI_MODEL_NAME", "gemini-1.5-flash")
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=api_key or os.getenv("GOOGLE_API_KEY"))
+            model = _models[model_name] = genai.GenerativeModel(model_name)
+        return model
+
+def _generate(llm_model, prompt, generation_config=None):
+    """Calls Gemini through the shared rate limiter, backing off on quota errors."""
+    limiter = get_rate_limiter()
+    limiter.acquire("gemini")
+    try:
+        response = llm_model.generate_content(prompt, safety_settings=SAFETY_SETTINGS, generation_config=generation_config)
+    except Exception as e:
+        if is_throttling_error(e):
+            limiter.report_throttled("gemini")
+        raise
+    limiter.report_success("gemini")
+    return response
+
+prompt_token_stats = {"requests": 0, "prompt_tokens": 0}
+prompt_token_stats_lock = threading.Lock()
+
+def _record_prompt_tokens(response, estimated_tokens):
+    """Adds the prompt size Gemini reports (the local estimate if it reports none)
+    to the run totals."""
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or estimated_tokens
+    with prompt_token_stats_lock:
+        prompt_token_stats["requests"] += 1
+        prompt_token_stats["prompt_tokens"] += prompt_tokens
+
+def print_prompt_token_stats():
+    requests = prompt_token_stats["requests"]
+    average = prompt_token_stats["prompt_tokens"] / requests if requests else 0.0
+    print(f"Gemini prompts: requests={requests} prompt_tokens={prompt_token_stats['prompt_tokens']} avg={average:.0f}")
+
+def evaluate_claim_with_llm(claim_text, search_results, llm_model=None, metadata=None):
+    llm_model = llm_model or get_gemini_model()
     print(f"Evaluating claim using LLM: '{claim_text.split('#', 1)[0].strip()[:50]}...'")
     if not search_results:
         print("WARNING: No search results provided to LLM. Evaluation may be unreliable.")
@@ -12,147 +91,27 @@ def evaluate_claim_with_llm(claim_text, search_results, llm_model=genai.Generati
             "claims_detected": "Cannot Verify due to lack of search results."
         }
 
-    metadata_str = ""
-    if metadata:
-        platform = metadata.get('platform')
-        post_date = metadata.get('post_date')
-        if platform:
-            metadata_str += f"\nPlatform: {platform}"
-        if post_date:
-            metadata_str += f"\nPost Date: {post_date}"
-        if metadata_str:
-            metadata_str = f"\n[Metadata]{metadata_str}\n"
-
-    prompt = f"""
-    Please act as a neutral and critical fact-checker. Your task is to evaluate the truthfulness of the following content, which may be a short social media post or tweet. 
-    The original post and search results may be in Swedish, and your output should also be in Swedish. Let's think step by step.
-
-    {metadata_str if metadata_str else ''}
-    Instructions:
-    1.  **Crucially, first determine if the 'Content to Evaluate' contains one or more *specific, verifiable factual claims*.**
-        * A factual claim is a statement asserting something that can potentially be proven true or false with objective evidence (e.g., data, statistics, historical records, scientific findings, quotes).
-        * It is **NOT** an opinion (e.g., "this is good/bad"), a question, a prediction about the future, a command, a vague statement, or subjective experience.
-        * **Example of a claim:** "Stockholm är Sveriges huvudstad." (Verifiable)
-        * **Example of NOT a claim:** "Jag tycker att sommaren är bäst." (Opinion), "Kommer det att regna?" (Question), "Alla borde läsa mer." (Recommendation/Vague)
-    2.  **If the content lacks *any* such verifiable factual claim:**
-        * Your response for 'Claim(s) Detected:' MUST be exactly: Inga verifierbara påståenden hittades.
-        * Your response for 'Rating:' MUST be exactly: Inga verifierbara påståenden hittades.
-        * Your response for 'Reasoning:' should briefly state why no verifiable claim was found (e.g., "Innehållet uttrycker en åsikt." or "Innehållet ställer en fråga.").
-        * Your response for 'Truthfulness Score:' should be N/A or left blank/null.
-        * **Do NOT proceed to evaluate using search results if no verifiable claim is identified.**
-    3.  **If, and *only* if, you identify one or more verifiable factual claims:**
-        * Clearly state the identified claim(s) in the 'Claim(s) Detected:' field.
-        * Evaluate their truthfulness based *only* on the provided search result snippets.
-        * When reviewing the snippets:
-            * Prioritize content from credible, authoritative, and neutral sources.
-            * Discount or be skeptical of sources that show bias, sensationalism, or lack supporting evidence.
-            * Consider any contradictory or conflicting information.
-        * Be cautious of misinformation patterns.
-        * Provide the appropriate rating, reasoning, and score based on your evaluation of the claim(s) against the evidence.
-
-    Content to Evaluate (Claim or Tweet):
-    \"{claim_text}\"
-
-    Search Results Snippets:
-    """
-    for i, result in enumerate(search_results, 1):
-        prompt += f"\n{i}. URL: {result.get('url', 'N/A')}\n   Title: {result.get('title', 'N/A')}\n   Snippet: {result.get('snippet', 'N/A')}\n"
-
-    prompt += """
-    Based *strictly* on the instructions above and the provided snippets, provide:
+    llm_cache = get_llm_cache()
+    model_name = getattr(llm_model, 'model_name', str(llm_model))
+    cache_key = llm_cache_key(model_name, PROMPT_TEMPLATE_VERSION, claim_text, search_results)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        print("LLM cache hit; reusing stored evaluation.")
+        return dict(cached["result"])
 
-    Claim(s) Detected: [Summarize the identified factual claim(s), OR write *exactly* "Inga verifierbara påståenden hittades." if none were found.]
-    Rating: [Your chosen rating category (Likely True, Likely False, Misleading, Uncertain, Cannot Verify) OR *exactly* "Inga verifierbara påståenden hittades." if no claim was detected.]
-    Reasoning: [Your brief explanation based on the evaluation OR why no claim was found.]
-    Truthfulness Score: [0-10 OR N/A if no claim was detected.]
-    """
+    structured = LLM_STRUCTURED_OUTPUT
+    prompt, estimated_tokens = build_claim_prompt(claim_text, search_results, metadata, structured=structured)
 
     try:
-        safety_settings = [
-            {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-            {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-            {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-            {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-        ]
-        response = llm_model.generate_content(prompt, safety_settings=safety_settings)
+        response = _generate(llm_model, prompt, STRUCTURED_GENERATION_CONFIG if structured else None)
+        _record_prompt_tokens(response, estimated_tokens)
         llm_output = response.text.strip()
         print(f"LLM Raw Output:\n{llm_output}")
 
-        rating = "Error Parsing LLM Output"
-        reasoning = "Could not parse the reasoning from the LLM response."
-        truthfulness_score_str = None
-        claims_detected = "Error Parsing LLM Output"
-
-        claims_match = re.search(r"Claim\(s\) Detected:\s*(.*)", llm_output, re.IGNORECASE | re.DOTALL)
-        rating_match = re.search(r"Rating:\s*(.*)", llm_output, re.IGNORECASE | re.DOTALL)
-        reasoning_match = re.search(r"Reasoning:\s*(.*)", llm_output, re.IGNORECASE | re.DOTALL)
-        score_match = re.search(r"Truthfulness Score:\s*(.*)", llm_output, re.IGNORECASE | re.DOTALL)
-
-        if claims_match:
-            claims_detected = claims_match.group(1).split('\n')[0].strip()
-        if rating_match:
-            rating = rating_match.group(1).split('\n')[0].strip()
-        if reasoning_match:
-            reasoning = reasoning_match.group(1).split('\n')[0].strip()
-        if score_match:
-            truthfulness_score_str = score_match.group(1).split('\n')[0].strip()
-
-        no_claims_phrase = "Inga verifierbara påståenden hittades"
-        is_no_claim_case = False
-
-        if claims_detected.strip().lower() == no_claims_phrase.lower() or \
-           rating.strip().lower() == no_claims_phrase.lower():
-            is_no_claim_case = True
-            print("LLM indicated no verifiable claims found via specific phrase.")
-            rating = no_claims_phrase
-            claims_detected = no_claims_phrase
-
-        no_claim_indicators_in_reasoning = [
-            "inga verifierbara påståenden", "ingen verifierbar", "inga påståenden",
-            "inga faktapåståenden", "innehåller inte något påstående",
-            "innehåller inte några påståenden", "är en åsikt", "ställer en fråga",
-            "är en uppmaning", "är subjektivt", "no verifiable claims",
-            "no factual claims", "is an opinion", "asks a question"
-        ]
-        if not is_no_claim_case and reasoning and any(phrase in reasoning.lower() for phrase in no_claim_indicators_in_reasoning):
-             if rating in ["Uncertain", "Cannot Verify", "Error Parsing LLM Output"]:
-                 print("LLM reasoning suggests no verifiable claims found, overriding rating.")
-                 is_no_claim_case = True
-                 rating = no_claims_phrase
-                 claims_detected = no_claims_phrase
-
-        truthfulness_score = None
-        if not is_no_claim_case and truthfulness_score_str:
-             try:
-                 score_cleaned = re.match(r"^\s*(\d{1,2}(?:\.\d+)?)\s*", truthfulness_score_str)
-                 if score_cleaned:
-                     truthfulness_score = float(score_cleaned.group(1))
-                     if 0 <= truthfulness_score <= 10:
-                         truthfulness_score = int(truthfulness_score) if truthfulness_score.is_integer() else truthfulness_score
-                     else:
-                         print(f"WARNING: Parsed score {truthfulness_score} out of range 0-10.")
-                         truthfulness_score = None
-                 elif truthfulness_score_str.strip().upper() == 'N/A':
-                     truthfulness_score = None
-                 else:
-                    print(f"WARNING: Could not parse numeric score from '{truthfulness_score_str}'")
-                    truthfulness_score = None
-             except ValueError:
-                 print(f"WARNING: Could not parse truthfulness score '{truthfulness_score_str}' as a number.")
-                 truthfulness_score = None
-        elif is_no_claim_case:
-             truthfulness_score = None
-
-        valid_ratings = ['Likely True', 'Likely False', 'Misleading', 'Uncertain', 'Cannot Verify', no_claims_phrase, 'Error Parsing LLM Output']
-        if rating not in valid_ratings:
-              print(f"WARNING: LLM provided an unexpected rating category: '{rating}'. Storing as is, but might indicate misinterpretation.")
-
-        print(f"Parsed Claims Detected: {claims_detected}")
-        print(f"Parsed Rating: {rating}")
-        print(f"Parsed Reasoning: {reasoning}")
-        print(f"Parsed Truthfulness Score: {truthfulness_score}")
-
-        return {"rating": rating, "reasoning": reasoning, "truthfulness_score": truthfulness_score, "claims_detected": claims_detected}
+        result = parse_structured_output(llm_output) if structured else parse_llm_output(llm_output)
+        if result["rating"] != "Error Parsing LLM Output":
+            llm_cache.set(cache_key, {"raw_output": llm_output, "result": result})
+        return result
 
     except Exception as e:
         print(f"ERROR: LLM API call or parsing failed: {e}")
@@ -162,4 +121,199 @@ def evaluate_claim_with_llm(claim_text, search_results, llm_model=genai.Generati
                  print(f"Content blocked due to: {response.prompt_feedback.block_reason}")
         except Exception as feedback_error:
              print(f"Could not retrieve prompt feedback: {feedback_error}")
-        return {"rating": "LLM Error", "reasoning": f"An error occurred during LLM evaluation: {e}", "truthfulness_score": None, "claims_detected": "LLM Error"}
\ No newline at end of file
+        return {"rating": "LLM Error", "reasoning": f"An error occurred during LLM evaluation: {e}", "truthfulness_score": None, "claims_detected": "LLM Error"}
+
+def _strip_fences(llm_output):
+    text = llm_output.strip()
+    if text.startswith("```"):
+        text = re.sub(r"^```[a-zA-Z]*\s*|\s*```$", "", text)
+    return text
+
+def validate_evaluation_fields(fields):
+    """Checks one decoded JSON evaluation against EVALUATION_SCHEMA, raising
+    ValueError on the first violation, then normalizes it. An unexpected rating
+    is kept with a warning, as the text parser does."""
+    if not isinstance(fields, dict):
+        raise ValueError("Evaluation is not a JSON object.")
+    for key in ("claims_detected", "rating", "reasoning"):
+        if not isinstance(fields.get(key), str) or not fields[key].strip():
+            raise ValueError(f"'{key}' is missing or not a non-empty string.")
+    score = fields.get("truthfulness_score")
+    if score is not None and (isinstance(score, bool) or not isinstance(score, (int, float, str))):
+        raise ValueError("'truthfulness_score' is not a number or null.")
+    rating = fields["rating"].strip().rstrip(".")
+    claims_detected = fields["claims_detected"].strip()
+    if claims_detected.rstrip(".") == NO_CLAIMS_PHRASE:
+        claims_detected = NO_CLAIMS_PHRASE
+    return normalize_evaluation(claims_detected, rating, fields["reasoning"].strip(), score)
+
+def parse_structured_output(llm_output):
+    """Parses a structured (JSON) reply, falling back to the free-text parser when
+    Gemini ignored the requested format."""
+    try:
+        return validate_evaluation_fields(json.loads(_strip_fences(llm_output)))
+    except ValueError as e:  # Includes json.JSONDecodeError
+        print(f"WARNING: Structured LLM output failed validation ({e}); falling back to text parsing.")
+        return parse_llm_output(llm_output)
+
+def _parse_batch_output(llm_output, count):
+    """Returns {index: (result, raw item JSON)} for every item that could be parsed from the JSON reply."""
+    data = json.loads(_strip_fences(llm_output))
+    if not isinstance(data, dict):
+        raise ValueError("Batch reply is not a JSON object keyed by item number.")
+    results = {}
+    for index in range(1, count + 1):
+        fields = data.get(str(index))
+        try:
+            result = validate_evaluation_fields(fields)
+        except ValueError as e:
+            print(f"WARNING: Batch item {index} failed validation: {e}")
+            continue
+        results[index] = (result, json.dumps(fields, ensure_ascii=False))
+    return results
+
+def evaluate_claims_with_llm(batch, llm_model):
+    """Evaluates several claims with a single Gemini request.
+
+    `batch` is a list of dicts with 'claim_text', 'search_results' and optional
+    'metadata'. Returns the same result dicts as evaluate_claim_with_llm, in order.
+    Cached claims are answered from the LLM cache; claims without evidence and any
+    claim missing from an unparseable reply fall back to per-claim evaluation.
+    """
+    results = [None] * len(batch)
+    llm_cache = get_llm_cache()
+    model_name = getattr(llm_model, 'model_name', str(llm_model))
+    pending = []
+    for position, item in enumerate(batch):
+        if not item['search_results']:
+            results[position] = evaluate_claim_with_llm(item['claim_text'], item['search_results'], llm_model=llm_model, metadata=item.get('metadata'))
+            continue
+        cache_key = llm_cache_key(model_name, PROMPT_TEMPLATE_VERSION, item['claim_text'], item['search_results'])
+        cached = llm_cache.get(cache_key)
+        if cached is not None:
+            results[position] = dict(cached["result"])
+        else:
+            pending.append((position, cache_key))
+
+    if len(pending) == 1:
+        position, _ = pending[0]
+        item = batch[position]
+        results[position] = evaluate_claim_with_llm(item['claim_text'], item['search_results'], llm_model=llm_model, metadata=item.get('metadata'))
+        pending = []
+
+    if pending:
+        print(f"Evaluating {len(pending)} claims in one batched LLM request...")
+        parsed = {}
+        try:
+            prompt, estimated_tokens = build_batch_prompt([batch[position] for position, _ in pending])
+            response = _generate(llm_model, prompt, BATCH_GENERATION_CONFIG)
+            _record_prompt_tokens(response, estimated_tokens)
+            parsed = _parse_batch_output(response.text, len(pending))
+        except Exception as e:
+            print(f"WARNING: Batched LLM evaluation failed ({e}); falling back to per-claim calls.")
+        for index, (position, cache_key) in enumerate(pending, 1):
+            if index in parsed:
+                result, raw_output = parsed[index]
+                results[position] = result
+                llm_cache.set(cache_key, {"raw_output": raw_output, "result": result})
+            else:
+                item = batch[position]
+                results[position] = evaluate_claim_with_llm(item['claim_text'], item['search_results'], llm_model=llm_model, metadata=item.get('metadata'))
+        print(f"Batched LLM request answered {len(parsed)}/{len(pending)} claims.")
+    return results
+
+
+# Each field's value is the rest of the line after its label (the first non-empty
+# line when the label ends its line), so no scan runs to the end of the reply.
+_CLAIMS_FIELD = re.compile(r"Claim\(s\) Detected:\s*(.*)", re.IGNORECASE)
+_RATING_FIELD = re.compile(r"Rating:\s*(.*)", re.IGNORECASE)
+_REASONING_FIELD = re.compile(r"Reasoning:\s*(.*)", re.IGNORECASE)
+_SCORE_FIELD = re.compile(r"Truthfulness Score:\s*(.*)", re.IGNORECASE)
+
+def parse_llm_output(llm_output):
+    """Extracts claims detected, rating, reasoning and score from the free-text Gemini reply."""
+    rating = "Error Parsing LLM Output"
+    reasoning = "Could not parse the reasoning from the LLM response."
+    truthfulness_score_str = None
+    claims_detected = "Error Parsing LLM Output"
+
+    claims_match = _CLAIMS_FIELD.search(llm_output)
+    rating_match = _RATING_FIELD.search(llm_output)
+    reasoning_match = _REASONING_FIELD.search(llm_output)
+    score_match = _SCORE_FIELD.search(llm_output)
+
+    if claims_match:
+        claims_detected = claims_match.group(1).strip()
+    if rating_match:
+        rating = rating_match.group(1).strip()
+    if reasoning_match:
+        reasoning = reasoning_match.group(1).strip()
+    if score_match:
+        truthfulness_score_str = score_match.group(1).strip()
+
+    return normalize_evaluation(claims_detected, rating, reasoning, truthfulness_score_str)
+
+
+def normalize_evaluation(claims_detected, rating, reasoning, truthfulness_score_str):
+    """Applies the no-claim rules and score validation to raw extracted fields."""
+    no_claims_phrase = NO_CLAIMS_PHRASE
+    is_no_claim_case = False
+    claims_detected = claims_detected or "Error Parsing LLM Output"
+    rating = rating or "Error Parsing LLM Output"
+    reasoning = reasoning or ""
+    if truthfulness_score_str is not None:
+        truthfulness_score_str = str(truthfulness_score_str)
+
+    if claims_detected.strip().lower() == no_claims_phrase.lower() or \
+       rating.strip().lower() == no_claims_phrase.lower():
+        is_no_claim_case = True
+        print("LLM indicated no verifiable claims found via specific phrase.")
+        rating = no_claims_phrase
+        claims_detected = no_claims_phrase
+
+    no_claim_indicators_in_reasoning = [
+        "inga verifierbara påståenden", "ingen verifierbar", "inga påståenden",
+        "inga faktapåståenden", "innehåller inte något påstående",
+        "innehåller inte några påståenden", "är en åsikt", "ställer en fråga",
+        "är en uppmaning", "är subjektivt", "no verifiable claims",
+        "no factual claims", "is an opinion", "asks a question"
+    ]
+    if not is_no_claim_case and reasoning and any(phrase in reasoning.lower() for phrase in no_claim_indicators_in_reasoning):
+         if rating in ["Uncertain", "Cannot Verify", "Error Parsing LLM Output"]:
+             print("LLM reasoning suggests no verifiable claims found, overriding rating.")
+             is_no_claim_case = True
+             rating = no_claims_phrase
+             claims_detected = no_claims_phrase
+
+    truthfulness_score = None
+    if not is_no_claim_case and truthfulness_score_str:
+         try:
+             score_cleaned = re.match(r"^\s*(\d{1,2}(?:\.\d+)?)\s*", truthfulness_score_str)
+             if score_cleaned:
+                 truthfulness_score = float(score_cleaned.group(1))
+                 if 0 <= truthfulness_score <= 10:
+                     truthfulness_score = int(truthfulness_score) if truthfulness_score.is_integer() else truthfulness_score
+                 else:
+                     print(f"WARNING: Parsed score {truthfulness_score} out of range 0-10.")
+                     truthfulness_score = None
+             elif truthfulness_score_str.strip().upper() == 'N/A':
+                 truthfulness_score = None
+             else:
+                print(f"WARNING: Could not parse numeric score from '{truthfulness_score_str}'")
+                truthfulness_score = None
+         except ValueError:
+             print(f"WARNING: Could not parse truthfulness score '{truthfulness_score_str}' as a number.")
+             truthfulness_score = None
+    elif is_no_claim_case:
+         truthfulness_score = None
+
+    valid_ratings = VALID_RATINGS + ['Error Parsing LLM Output']
+    if rating not in valid_ratings:
+          print(f"WARNING: LLM provided an unexpected rating category: '{rating}'. Storing as is, but might indicate misinterpretation.")
+
+    print(f"Parsed Claims Detected: {claims_detected}")
+    print(f"Parsed Rating: {rating}")
+    print(f"Parsed Reasoning: {reasoning}")
+    print(f"Parsed Truthfulness Score: {truthfulness_score}")
+
+    return {"rating": rating, "reasoning": reasoning, "truthfulness_score": truthfulness_score, "claims_detected": claims_detected}
@@ -0,0 +1,47 @@
+import os
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from cache import DiskCache, CACHE_DIR
+
+ARTICLE_CACHE_PATH = os.getenv("ARTICLE_CACHE_PATH", os.path.join(CACHE_DIR, "article_cache.sqlite3"))
+ARTICLE_CACHE_MAX_ENTRIES = int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", "5000"))
+# Stored extractions are dropped after this age (the Reddit window is 7 days) ...
+ARTICLE_CACHE_MAX_AGE = int(os.getenv("ARTICLE_CACHE_MAX_AGE", str(8 * 24 * 3600)))
+# ... and reused without any request while younger than this; older entries
+# are revalidated with a conditional GET.
+ARTICLE_CACHE_FRESH_SECONDS = int(os.getenv("ARTICLE_CACHE_FRESH_SECONDS", str(6 * 3600)))
+ARTICLE_CACHE_DISABLED = os.getenv("ARTICLE_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "cmpid", "at_medium", "at_campaign"}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def canonicalize_url(url):
+    """Normalizes a URL so cross-posted links to the same article share one entry:
+    lowercase scheme/host, no default port, fragment or tracking parameters,
+    sorted query string and no trailing slash."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = (parts.hostname or "").lower()
+    if parts.port and not ((scheme == "http" and parts.port == 80) or (scheme == "https" and parts.port == 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
+
+
+def get_article_cache():
+    """Returns the process-wide article store (None when disabled)."""
+    global _cache
+    if ARTICLE_CACHE_DISABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(ARTICLE_CACHE_PATH, table="articles", max_entries=ARTICLE_CACHE_MAX_ENTRIES,
+                               default_ttl=ARTICLE_CACHE_MAX_AGE)
+    return _cache
@@ -0,0 +1,95 @@
+"""Micro-benchmark of the Gemini reply parsers.
+
+Compares the free-text regex parser (parse_llm_output) with the structured JSON
+validator (parse_structured_output) on a corpus of representative replies, and
+reports the time per parse and the share of replies that fail: parsed as
+"Error Parsing LLM Output" or with a rating outside the fixed categories (each
+of which costs a retry, a lost evaluation or a mislabelled one).
+
+    python bench_parse.py [--iterations 2000] [--from-cache]
+
+--from-cache adds the raw replies stored in the local LLM cache to the corpus.
+"""
+import argparse
+import contextlib
+import io
+import json
+import sqlite3
+import time
+from LLM import parse_llm_output, parse_structured_output, VALID_RATINGS
+from llm_cache import LLM_CACHE_PATH
+
+TEXT_REPLIES = [
+    # Well-formed
+    "Claim(s) Detected: Regeringen sänker bensinskatten med två kronor.\nRating: Likely True\n"
+    "Reasoning: SVT och DN bekräftar förslaget i budgeten.\nTruthfulness Score: 8",
+    # Markdown emphasis and a step-by-step preamble
+    "Låt oss tänka steg för steg.\n\n**Claim(s) Detected:** Arbetslösheten är 12 procent.\n**Rating:** Likely False\n"
+    "**Reasoning:** SCB anger 8,5 procent.\n**Truthfulness Score:** 2/10",
+    # No-claim reply
+    "Claim(s) Detected: Inga verifierbara påståenden hittades.\nRating: Inga verifierbara påståenden hittades.\n"
+    "Reasoning: Innehållet uttrycker en åsikt.\nTruthfulness Score: N/A",
+    # Values on the line after their labels
+    "Claim(s) Detected:\nSverige går med i Nato 2024.\nRating:\nLikely True\nReasoning:\nRegeringen.se bekräftar.\n"
+    "Truthfulness Score:\n9",
+    # Truncated reply (safety stop / token limit)
+    "Claim(s) Detected: Priset på el har fördubblats.\nRating: Misleading\nReason",
+    # Swedish labels instead of the requested English ones
+    "Påstående: Skatten höjs.\nBedömning: Troligen sant\nMotivering: Enligt regeringen.\nPoäng: 7",
+]
+
+JSON_REPLIES = [
+    json.dumps({"claims_detected": "Regeringen sänker bensinskatten med två kronor.", "rating": "Likely True",
+                "reasoning": "SVT och DN bekräftar förslaget i budgeten.", "truthfulness_score": 8}, ensure_ascii=False),
+    json.dumps({"claims_detected": "Inga verifierbara påståenden hittades", "rating": "Inga verifierbara påståenden hittades",
+                "reasoning": "Innehållet uttrycker en åsikt.", "truthfulness_score": None}, ensure_ascii=False),
+    "```json\n" + json.dumps({"claims_detected": "Arbetslösheten är 12 procent.", "rating": "Likely False",
+                              "reasoning": "SCB anger 8,5 procent.", "truthfulness_score": 2.5}, ensure_ascii=False) + "\n```",
+    # Truncated JSON: falls back to the text parser
+    '{"claims_detected": "Priset på el har fördubblats.", "rating": "Misleading", "reas',
+]
+
+
+def load_cached_replies(path=LLM_CACHE_PATH):
+    try:
+        conn = sqlite3.connect(path)
+        rows = conn.execute("SELECT value FROM llm_responses").fetchall()
+        conn.close()
+    except sqlite3.Error as e:
+        print(f"Could not read the LLM cache at {path}: {e}")
+        return []
+    return [json.loads(value)["raw_output"] for (value,) in rows]
+
+
+def bench(name, parser, replies, iterations):
+    with contextlib.redirect_stdout(io.StringIO()):  # The parsers log every field they extract
+        failures = sum(parser(reply)["rating"] not in VALID_RATINGS for reply in replies)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for reply in replies:
+                parser(reply)
+        elapsed = time.perf_counter() - started
+    per_parse_us = elapsed / (iterations * len(replies)) * 1e6
+    print(f"{name:<28} replies={len(replies):<4} {per_parse_us:8.1f} us/parse  "
+          f"failures={failures}/{len(replies)} ({failures / len(replies):.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the Gemini reply parsers.')
+    parser.add_argument('--iterations', type=int, default=2000, help='Passes over the corpus per parser')
+    parser.add_argument('--from-cache', action='store_true', help='Also parse the raw replies stored in the LLM cache')
+    args = parser.parse_args()
+
+    text_replies = list(TEXT_REPLIES)
+    json_replies = list(JSON_REPLIES)
+    if args.from_cache:
+        for reply in load_cached_replies():
+            (json_replies if reply.lstrip().startswith(("{", "```")) else text_replies).append(reply)
+
+    bench("regex (text replies)", parse_llm_output, text_replies, args.iterations)
+    bench("structured (JSON replies)", parse_structured_output, json_replies, args.iterations)
+    bench("structured (text replies)", parse_structured_output, text_replies, max(1, args.iterations // 10))
+
+
+if __name__ == "__main__":
+    main()
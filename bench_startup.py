@@ -0,0 +1,60 @@
+"""Cold-start benchmark of claim_verifier.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the cumulative import time per top-level package, plus the wall-clock
+time of `python claim_verifier.py --help` (interpreter start, imports and
+argument parsing, but no network or database work).
+
+    python bench_startup.py [--module claim_verifier] [--runs 5] [--top 15]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+
+def import_times(module):
+    """Returns {top-level package: self import time in ms} for one cold import."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               capture_output=True, text=True, check=True)
+    totals = defaultdict(float)
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|", 2)
+        totals[name.strip().split(".")[0]] += int(self_us) / 1000
+    return totals
+
+
+def wall_time(command, runs):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure claim_verifier cold-start time.')
+    parser.add_argument('--module', default='claim_verifier', help='Module whose import is measured')
+    parser.add_argument('--runs', type=int, default=5, help='Cold runs to average')
+    parser.add_argument('--top', type=int, default=15, help='Packages listed, slowest first')
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    packages = {name for run in runs for name in run}
+    medians = {name: statistics.median(run.get(name, 0.0) for run in runs) for name in packages}
+    total = statistics.median(sum(run.values()) for run in runs)
+    print(f"import {args.module}: {total:.0f} ms total (median of {args.runs} cold runs)")
+    for name, milliseconds in sorted(medians.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<28} {milliseconds:8.1f} ms")
+
+    timings = wall_time([sys.executable, "claim_verifier.py", "--help"], args.runs)
+    print(f"claim_verifier.py --help: median {statistics.median(timings):.0f} ms, min {min(timings):.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+
+class DiskCache:
+    """Small persistent key/value cache backed by one SQLite table.
+
+    Values are stored as JSON with an expiry time. Reads refresh `last_access`
+    so that, once `max_entries` is exceeded, the least recently used rows are
+    evicted first. Safe to share between the pipeline's worker threads.
+    """
+
+    def __init__(self, path, table="cache", max_entries=10000, default_ttl=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table}(last_access)")
+        self._conn.commit()
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+            if row is None or (row[1] is not None and row[1] < now):
+                if row is not None:
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return default
+            self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, default=str), expires_at, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _evict(self):
+        self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),))
+        if self.max_entries:
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(f"""
+                    DELETE FROM {self.table} WHERE key IN (
+                        SELECT key FROM {self.table} ORDER BY last_access ASC LIMIT ?
+                    )
+                """, (count - self.max_entries,))
+
+    def stats(self):
+        with self._lock:
+            (size,) = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total) if total else 0.0
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": hit_rate, "entries": size}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
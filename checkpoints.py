@@ -0,0 +1,27 @@
+import os
+import threading
+from cache import DiskCache, CACHE_DIR
+
+# Ingestion high-water marks (newest item seen per source), kept next to the
+# caches so incremental fetches survive restarts. Entries never expire and are
+# never evicted: losing one only means the next run falls back to a full fetch.
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", os.path.join(CACHE_DIR, "checkpoints.sqlite3"))
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def _get_store():
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DiskCache(CHECKPOINT_PATH, table="checkpoints", max_entries=None)
+    return _store
+
+
+def get_checkpoint(name, default=None):
+    return _get_store().get(name, default)
+
+
+def set_checkpoint(name, value):
+    _get_store().set(name, value)
@@ -0,0 +1,77 @@
+import re
+
+# A sentence ends at . ! ? or … followed by whitespace and an uppercase letter,
+# digit or opening quote/bracket (Swedish capitals included), or at a blank line.
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?…])\s+(?=[A-ZÅÄÖÉ0-9"«»”(\[])|\n\s*\n')
+
+
+class SentenceChunker:
+    """Splits text into chunks of at most `chunk_size` characters on sentence
+    boundaries, repeating up to `chunk_overlap` characters of trailing sentences
+    at the start of the next chunk.
+
+    Chunks are produced lazily, so callers that only need the first few chunks
+    of a long article never pay for splitting the rest.
+    """
+
+    def __init__(self, chunk_size=2000, chunk_overlap=100):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def _sentences(self, text):
+        start = 0
+        for boundary in _SENTENCE_BOUNDARY.finditer(text):
+            sentence = text[start:boundary.start()].strip()
+            start = boundary.end()
+            if sentence:
+                yield from self._hard_split(sentence)
+        sentence = text[start:].strip()
+        if sentence:
+            yield from self._hard_split(sentence)
+
+    def _hard_split(self, sentence):
+        # Sentences longer than a whole chunk are cut at the last space that fits.
+        while len(sentence) > self.chunk_size:
+            cut = sentence.rfind(" ", 0, self.chunk_size)
+            if cut <= 0:
+                cut = self.chunk_size
+            yield sentence[:cut].strip()
+            sentence = sentence[cut:].strip()
+        if sentence:
+            yield sentence
+
+    def iter_chunks(self, text, max_chunks=None):
+        if not text or max_chunks == 0:
+            return
+        current, length, emitted = [], 0, 0
+        for sentence in self._sentences(text):
+            if current and length + 1 + len(sentence) > self.chunk_size:
+                yield " ".join(current)
+                emitted += 1
+                if max_chunks is not None and emitted >= max_chunks:
+                    return
+                # Carry trailing sentences that fit in the overlap into the next chunk
+                overlap, overlap_length = [], 0
+                for previous in reversed(current):
+                    if overlap_length + len(previous) + 1 > self.chunk_overlap:
+                        break
+                    overlap.insert(0, previous)
+                    overlap_length += len(previous) + 1
+                if overlap_length + len(sentence) > self.chunk_size:
+                    overlap, overlap_length = [], 0
+                current, length = overlap, max(0, overlap_length - 1)
+            length += len(sentence) + (1 if current else 0)
+            current.append(sentence)
+        if current:
+            yield " ".join(current)
+
+
+# Shared by all article extractions instead of building a splitter per article.
+DEFAULT_CHUNKER = SentenceChunker(chunk_size=2000, chunk_overlap=100)
+
+
+def iter_chunks(text, max_chunks=None, chunker=DEFAULT_CHUNKER):
+    """Yields sentence-aligned chunks of `text`, stopping after `max_chunks`."""
+    return chunker.iter_chunks(text, max_chunks=max_chunks)
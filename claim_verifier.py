@@ -2,29 +2,83 @@ import os
 import sys
 import argparse
 import psycopg2
-import hashlib
 from datetime import datetime, timezone, timedelta
 from dotenv import load_dotenv
-import google.generativeai as genai
-from tavily import TavilyClient
-from newsapi import search_newsapi
-from searchweb import search_web_tavily
-from fetchresponse import fetch_tweets_requests, fetch_reddit_claims_for_llm
-from LLM import evaluate_claim_with_llm
-from DB import get_db_connection, store_verification_data
-import random
-import time
 
+# Load .env before importing project modules: many read their settings
+# (CACHE_DIR, PREFILTER_*, NEAR_DUP_*, JOB_*, HTTP_*, ...) at import time.
 load_dotenv()
 
-# Parse command-line arguments
-parser = argparse.ArgumentParser(description='Verify claims from Reddit, Twitter, or manually entered claims.')
-parser.add_argument('--claim', type=str, help='Manually enter a claim to verify')
-parser.add_argument('--skip-reddit', action='store_true', help='Skip fetching from Reddit')
-parser.add_argument('--skip-twitter', action='store_true', help='Skip fetching from Twitter')
-parser.add_argument('--source-url', type=str, help='Source URL for manually entered claim')
-parser.add_argument('--author', type=str, default='manual_input', help='Author for manually entered claim')
-args = parser.parse_args()
+from newsapi import search_newsapi
+from searchweb import search_web_tavily
+from fetchresponse import fetch_tweets_requests, fetch_reddit_claims_for_llm, save_reddit_checkpoint, save_tweet_checkpoint
+from LLM import (evaluate_claim_with_llm, evaluate_claims_with_llm, get_gemini_model, print_prompt_token_stats,
+                 NO_CLAIMS_PHRASE, VALID_RATINGS)
+from DB import (DatabasePool, compute_claim_hash, fetch_evaluated_claim_keys, fetch_stored_claim_texts,
+                has_unique_keys, is_no_claim_evaluation, migrate_unique_keys, BatchWriter)
+from job_queue import (ensure_job_table, enqueue_jobs, claim_jobs, renew_leases, complete_jobs, fail_jobs,
+                       job_queue_counts, JOB_LEASE_SECONDS)
+from pipeline import Stage, Pipeline
+from rerank import rerank_results
+from run_journal import get_run_journal
+from no_claim_cache import find_no_claim_verdict, record_no_claim_verdict
+from prefilter import (get_prefilter, train_prefilter, PREFILTER_THRESHOLD, PREFILTER_PLATFORMS,
+                       PREFILTER_MODEL_PATH)
+from near_duplicates import get_near_duplicate_index, minhash_signature, NEAR_DUP_THRESHOLD
+from search_cache import print_search_cache_stats
+from llm_cache import print_llm_cache_stats
+from ratelimit import print_rate_limit_stats
+from transport import print_http_stats, close_sessions
+import signal
+import socket
+import threading
+import time
+import traceback
+
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(description='Verify claims from Reddit, Twitter, or manually entered claims.')
+    parser.add_argument('--claim', type=str, help='Manually enter a claim to verify')
+    parser.add_argument('--skip-reddit', action='store_true', help='Skip fetching from Reddit')
+    parser.add_argument('--skip-twitter', action='store_true', help='Skip fetching from Twitter')
+    parser.add_argument('--source-url', type=str, help='Source URL for manually entered claim')
+    parser.add_argument('--author', type=str, default='manual_input', help='Author for manually entered claim')
+    parser.add_argument('--extract-links', action='store_true', default=os.getenv("EXTRACT_LINKS", "").lower() in ("1", "true", "yes"), help='Extract linked article content instead of using Reddit post titles')
+    parser.add_argument('--fetch-workers', type=int, default=int(os.getenv("FETCH_WORKERS", "4")), help='Concurrent Reddit/Twitter fetch tasks')
+    parser.add_argument('--search-workers', type=int, default=int(os.getenv("SEARCH_WORKERS", "4")), help='Concurrent evidence searches')
+    parser.add_argument('--llm-workers', type=int, default=int(os.getenv("LLM_WORKERS", "4")), help='Concurrent Gemini evaluations')
+    parser.add_argument('--llm-batch-size', type=int, default=int(os.getenv("LLM_BATCH_SIZE", "1")), help='Claims packed into one Gemini request (1 disables batching)')
+    parser.add_argument('--write-batch-size', type=int, default=int(os.getenv("DB_WRITE_BATCH_SIZE", "50")), help='Results written to the database per batch')
+    parser.add_argument('--write-flush-interval', type=float, default=float(os.getenv("DB_WRITE_FLUSH_INTERVAL", "5")), help='Max seconds a result waits before being written')
+    parser.add_argument('--db-pool-size', type=int, default=int(os.getenv("DB_POOL_SIZE", "5")), help='Max concurrent database connections')
+    parser.add_argument('--queue-size', type=int, default=int(os.getenv("PIPELINE_QUEUE_SIZE", "20")), help='Max claims buffered between pipeline stages')
+    parser.add_argument('--incremental', action='store_true', default=os.getenv("INCREMENTAL_FETCH", "").lower() in ("1", "true", "yes"), help='Only fetch Reddit posts and tweets newer than the last processed run')
+    parser.add_argument('--combined-listing', action='store_true', default=os.getenv("REDDIT_COMBINED_LISTING", "").lower() in ("1", "true", "yes"), help='Read all subreddits through one combined Reddit listing')
+    parser.add_argument('--max-tweets', type=int, default=int(os.getenv("X_MAX_TWEETS", "10")), help='Max tweets fetched per run')
+    parser.add_argument('--tweet-pages', type=int, default=int(os.getenv("X_MAX_PAGES", "1")), help='Max X search result pages requested per run')
+    parser.add_argument('--near-dup-threshold', type=float, default=NEAR_DUP_THRESHOLD, help='Similarity above which a near-duplicate claim reuses a stored evaluation')
+    parser.add_argument('--service', action='store_true', help='Stay resident and poll Reddit and X on their intervals until SIGTERM (implies --incremental)')
+    parser.add_argument('--reddit-interval', type=float, default=float(os.getenv("REDDIT_POLL_INTERVAL", "300")), help='Seconds between Reddit polls in service mode')
+    parser.add_argument('--prefilter-threshold', type=float, default=PREFILTER_THRESHOLD, help='Probability of "no claim" above which a post is skipped before search and Gemini')
+    parser.add_argument('--no-prefilter', action='store_true', help='Send every post to search and Gemini')
+    parser.add_argument('--train-prefilter', action='store_true', help='Train the pre-filter classifier on stored and journaled evaluations, then exit')
+    parser.add_argument('--migrate-db', action='store_true', help='Merge duplicate rows and create the unique indexes batched writes rely on (concurrently), then exit')
+    parser.add_argument('--resume', nargs='?', const='latest', metavar='RUN_ID', help='Finish an interrupted run from its journal (the latest unfinished run by default) without repeating searches or LLM calls')
+    parser.add_argument('--enqueue', action='store_true', help='Producer: fetch and dedup claims, then add them to the Postgres job queue instead of verifying them')
+    parser.add_argument('--worker', action='store_true', help='Verifier worker: lease claim jobs from the Postgres job queue until SIGTERM')
+    parser.add_argument('--queue-batch-size', type=int, default=int(os.getenv("JOB_CLAIM_BATCH", "20")), help='Claim jobs a worker leases at a time')
+    parser.add_argument('--queue-poll-interval', type=float, default=float(os.getenv("JOB_POLL_INTERVAL", "10")), help='Seconds an idle worker waits before polling the job queue again')
+    parser.add_argument('--lease-seconds', type=int, default=JOB_LEASE_SECONDS, help='How long a leased job stays reserved without a renewal')
+    parser.add_argument('--twitter-interval', type=float, default=float(os.getenv("X_POLL_INTERVAL", "900")), help='Seconds between X polls in service mode')
+    return parser
+
+
+# Parsed command-line arguments; set by main()
+args = None
+# Journal of the current run (None when disabled or in job queue modes); set by main()
+run_journal = None
+# Local triage of posts without a claim (None when disabled); set by main()
+claim_prefilter = None
 
 # Database (Supabase Pooler details)
 DB_HOST = os.getenv("DB_HOST")
@@ -41,465 +95,907 @@ TAVILY_API_KEY = os.getenv("TAVILY_API_KEY") # <--- Get Tavily Key
 LLM_API_KEY = os.getenv("GOOGLE_API_KEY")
 GEMINI_MODEL_NAME = os.getenv("GEMINI_MODEL_NAME", "gemini-1.5-flash")
 
-# Commenting out Twitter token requirement since we're only using Reddit
-if not all([DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, TAVILY_API_KEY, LLM_API_KEY, NEWSAPI_KEY]):
-    print("ERROR: Missing essential configuration in .env file (DB, Tavily, LLM). Exiting.")
-    sys.exit(1)
+RELIABLE_SVENSKA_POLITIK_DOMAINS = [
+    # Swedish News & Government
+    "svt.se",
+    "sr.se",
+    "dn.se",
+    "svd.se",
+    "riksdagen.se",
+    "regeringen.se",
+    "scb.se",
+    "faktiskt.se",
+    "tillvaxtverket.se",
+    "msb.se",
+    "folkhalsomyndigheten.se",
+
+    # International News & Fact-Checking
+    "apnews.com",
+    "reuters.com",
+    "bbc.com",
+    "nytimes.com",
+    "theguardian.com",
+    "politifact.com",
+    "factcheck.org",
+    "snopes.com",
+    "fullfact.org",
+
+    # Scientific and Academic Sources
+    "nature.com",
+    "sciencemag.org",
+    "nejm.org",
+    "thelancet.com",
+    "pubmed.ncbi.nlm.nih.gov",
+    "who.int",
+    "ecdc.europa.eu",
+    "un.org",
+    "europa.eu"
+]
+
+MAX_CLAIM_LENGTH = 2000
+MAX_SEARCH_QUERY_LENGTH = 200
+# External calls avoided for every claim that never reaches the search/LLM stages
+CALLS_PER_CLAIM = {'tavily': 1, 'newsapi': 1, 'gemini': 1}
+
+run_stats = {'claims_fetched': 0, 'claims_prefiltered': 0, 'claims_known_no_claim': 0, 'claims_deduplicated': 0,
+             'claims_near_duplicate': 0, 'claims_enqueued': 0,
+             'jobs_completed': 0, 'jobs_retried': 0, 'jobs_dead': 0}
+run_stats_lock = threading.Lock()
+
+
+# --- Claim job construction ---
+# A job is a plain dict carrying everything the later stages need:
+# the claim text, the search query, and the Sources/Claims rows to store.
+
+def _post_timestamp(item):
+    return datetime.fromisoformat(item['created_at']) if item.get('created_at') else datetime.now(timezone.utc)
+
+
+def _make_job(label, claim_text, search_query, source_data, extraction_method, search_api_used, exclude_url=None,
+              max_length=MAX_CLAIM_LENGTH):
+    """Builds a claim job; fetched text is cut to `max_length` (None keeps it whole)."""
+    if max_length is not None:
+        claim_text = claim_text[:max_length]
+    return {
+        'label': label,
+        'claim_text': claim_text,
+        'claim_hash': compute_claim_hash(claim_text),
+        'search_query': search_query.strip()[:MAX_SEARCH_QUERY_LENGTH],
+        'exclude_url': exclude_url,
+        'source_data': source_data,
+        'claim_data': {
+            'claim_text': claim_text,
+            'extraction_method': extraction_method,
+            'date_extracted': datetime.now(timezone.utc)
+        },
+        'search_api_used': search_api_used
+    }
+
+
+def jobs_from_manual_claim(claim_text, source_url, author):
+    source_data = {
+        'platform': 'Manual Input',
+        'source_url': source_url,
+        'author_id': author,
+        'author_username': author,
+        'post_timestamp': datetime.now(timezone.utc),
+        'fetch_timestamp': datetime.now(timezone.utc)
+    }
+    search_query = claim_text.strip().split('\n\n', 1)[0].split('\n', 1)[0]
+    # Stored and hashed exactly as entered; only fetched text is capped
+    return [_make_job('manual claim', claim_text, search_query, source_data,
+                      'manual_input', 'tavily_search_api,newsapi', max_length=None)]
+
+
+def jobs_from_reddit_post(post):
+    """Turns one fetched Reddit post into claim jobs: one per article chunk when
+    the linked article was extracted, otherwise one for the post itself."""
+    jobs = []
+    if post.get('link_content'):
+        article_title = post.get('link_title', 'Unknown Article')
+        article_url = post.get('link_url', '')
+        article_chunks = post.get('link_chunks') or [post['link_content']]
+        source_data = {
+            'platform': "Article via Reddit",
+            'source_url': article_url,
+            'author_id': post.get('author', 'unknown'),  # Reddit user who shared it
+            'author_username': post.get('author', 'unknown'),
+            'post_timestamp': _post_timestamp(post),
+            'fetch_timestamp': datetime.now(timezone.utc)
+        }
+        for chunk_index, chunk_content in enumerate(article_chunks):
+            if not chunk_content.strip():
+                print(f"Skipping empty chunk {chunk_index} of {article_url}")
+                continue
+            claim_text = chunk_content[:MAX_CLAIM_LENGTH]
+            # Use the article title + first sentence as the search query for better results
+            first_sentence = claim_text.split('.')[0] if '.' in claim_text else claim_text[:100]
+            jobs.append(_make_job(
+                f"{article_url} (chunk {chunk_index + 1}/{len(article_chunks)})",
+                claim_text, f"{article_title}: {first_sentence}", source_data,
+                f'linked_article_content_chunk_{chunk_index + 1}',
+                "article_via_reddit,tavily_search_api,newsapi",
+                exclude_url=article_url  # Avoid circular reasoning from the source article itself
+            ))
+        return jobs
+
+    # Combine title and post content for a more complete claim
+    post_title = post.get('title', '')
+    post_content = post.get('snippet', '')
+    if post_content and len(post_content) > 10:  # Ensure there's meaningful content
+        claim_text = f"{post_title}\n\n{post_content}"
+    else:
+        claim_text = post_title
+
+    if not claim_text.strip():
+        print(f"Skipping empty Reddit post: {post['url']}")
+        return jobs
+
+    source_data = {
+        'platform': 'Reddit',
+        'source_url': post['url'],
+        'author_id': post.get('author', 'unknown'),
+        'author_username': post.get('author', 'unknown'),
+        'post_timestamp': _post_timestamp(post),
+        'fetch_timestamp': datetime.now(timezone.utc)
+    }
+    jobs.append(_make_job(post['url'], claim_text, post_title, source_data,
+                          'reddit_post_content', "reddit_post,tavily_search_api,newsapi"))
+    return jobs
+
+
+def jobs_from_tweet(tweet):
+    claim_text = tweet.get('text', '')
+    if not claim_text.strip():
+        print(f"Skipping empty Twitter post: {tweet['source_url']}")
+        return []
+    source_data = {
+        'platform': 'Twitter/X',
+        'source_url': tweet['source_url'],
+        'author_id': tweet.get('author_id', 'unknown'),
+        'author_username': tweet.get('author_username', 'unknown'),
+        'post_timestamp': _post_timestamp(tweet),
+        'fetch_timestamp': datetime.now(timezone.utc)
+    }
+    search_query = claim_text.split('#', 1)[0]  # Remove hashtags for searching
+    return [_make_job(tweet['source_url'], claim_text, search_query, source_data,
+                      'twitter_post_content', "twitter_post,tavily_search_api,newsapi")]
+
+
+# --- Fetch tasks (input of the fetch stage) ---
+
+# Reddit listings and X searches fetched this run, as (subreddit or query,
+# [(post, source URLs of its jobs)]); their checkpoints are only advanced after
+# the pipeline has finished, and never past a post whose claims failed.
+fetched_reddit_listings = []
+fetched_tweet_searches = []
+fetched_sources_lock = threading.Lock()
+
+
+def _source_urls_by_post(jobs_by_post):
+    return [(post, {job['source_data']['source_url'] for job in jobs}) for post, jobs in jobs_by_post]
+
+
+def _checkpointable_posts(posts, failed_urls, order_key):
+    """Returns the posts the checkpoint may advance over: all of them, or only
+    those older than the oldest post with a claim that failed, so the next run
+    fetches that post again."""
+    failed = [order_key(post) for post, source_urls in posts if source_urls & failed_urls]
+    if not failed:
+        return [post for post, _ in posts]
+    oldest_failed = min(failed)
+    return [post for post, _ in posts if order_key(post) < oldest_failed]
+
+
+def reddit_fetch_task(subreddit, max_posts, max_days):
+    def task():
+        print(f"\n=== Fetching posts from r/{subreddit} ===")
+        reddit_posts = fetch_reddit_claims_for_llm(
+            max_results=max_posts,
+            client_id=os.getenv("REDDIT_CLIENT_ID"),
+            client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
+            subreddit=subreddit,
+            max_days=max_days,
+            extract_links=args.extract_links,  # By default use Reddit post titles instead of article content
+            incremental=args.incremental
+        )
+        if reddit_posts:
+            print(f"Successfully fetched {len(reddit_posts)} posts from r/{subreddit}")
+        else:
+            print(f"No posts fetched from r/{subreddit}")
+        jobs_by_post = [(post, jobs_from_reddit_post(post)) for post in reddit_posts]
+        if args.incremental:
+            with fetched_sources_lock:
+                fetched_reddit_listings.append((subreddit, _source_urls_by_post(jobs_by_post)))
+        return [job for _, jobs in jobs_by_post for job in jobs]
+    return task
+
+
+def twitter_fetch_task(query, max_tweets):
+    def task():
+        print(f"\n=== Fetching tweets with search query: {query} ===")
+        tweets = fetch_tweets_requests(query, max_tweets, TEST_BEARER_TOKEN,
+                                       incremental=args.incremental, max_pages=args.tweet_pages)
+        if tweets:
+            print(f"Successfully fetched {len(tweets)} tweets.")
+        else:
+            print("No tweets fetched. Continuing with Reddit posts only.")
+        jobs_by_tweet = [(tweet, jobs_from_tweet(tweet)) for tweet in tweets]
+        if args.incremental:
+            with fetched_sources_lock:
+                fetched_tweet_searches.append((query, _source_urls_by_post(jobs_by_tweet)))
+        return [job for _, jobs in jobs_by_tweet for job in jobs]
+    return task
+
+
+# --- Pipeline stages ---
+
+def _journal(jobs, stage):
+    if run_journal is not None:
+        run_journal.record(jobs, stage)
+
+
+def _journal_evaluated(jobs):
+    """Journals usable verdicts only, so a resumed run retries failed evaluations."""
+    _journal([job for job in jobs if job['evaluation_data']['truthfulness_rating'] not in UNREUSABLE_RATINGS],
+             'evaluated')
+
+
+# Jobs handed to the BatchWriter, keyed by (source_url, claim_hash), until the
+# writer reports them written; entries left after a flush failed to store.
+awaiting_write = {}
+awaiting_write_lock = threading.Lock()
+
+
+def _results_written(records):
+    """BatchWriter callback: the written results' claims reached 'stored'."""
+    keys = [(source_data['source_url'], compute_claim_hash(claim_data['claim_text']))
+            for source_data, claim_data, _, _ in records]
+    with awaiting_write_lock:
+        for key in keys:
+            for job in awaiting_write.pop(key, []):
+                job['stored'] = True
+    if run_journal is not None:
+        run_journal.mark_stored(keys)
+
+
+def fetch_stage(task):
+    return task()
+
+
+def triage_stage(jobs):
+    """Drops posts the local pre-filter is confident contain no verifiable
+    claim, before the database, search or Gemini are involved."""
+    if claim_prefilter is None:
+        return jobs
+    # Resumed jobs already paid for their search; keep them
+    kept = [job for job in jobs if 'search_results' in job or not claim_prefilter.should_skip(job)]
+    with run_stats_lock:
+        run_stats['claims_prefiltered'] += len(jobs) - len(kept)
+    return kept
+
+
+def make_dedup_stage(db_pool):
+    """Drops jobs already classified as containing no claim (local record) and
+    jobs whose (source, claim) already has an evaluation by the current model
+    (one bulk lookup per fetched batch), before any paid API is called."""
+    def dedup_stage(jobs):
+        known_no_claim = 0
+        unknown_jobs = []
+        for job in jobs:
+            if 'evaluation_data' not in job and find_no_claim_verdict(GEMINI_MODEL_NAME, job['claim_hash']):
+                job['already_evaluated'] = True
+                known_no_claim += 1
+            else:
+                unknown_jobs.append(job)
+        keys = [(job['source_data']['source_url'], job['claim_hash']) for job in unknown_jobs]
+        already_evaluated = db_pool.run(fetch_evaluated_claim_keys, keys, GEMINI_MODEL_NAME)
+        fresh_jobs = []
+        for job, key in zip(unknown_jobs, keys):
+            if key in already_evaluated:
+                job['already_evaluated'] = True  # Lets a queue worker complete the job
+            else:
+                fresh_jobs.append(job)
+        skipped = len(unknown_jobs) - len(fresh_jobs)
+        with run_stats_lock:
+            run_stats['claims_fetched'] += len(jobs)
+            run_stats['claims_known_no_claim'] += known_no_claim
+            run_stats['claims_deduplicated'] += skipped
+        if known_no_claim:
+            print(f"Pre-flight dedup: skipping {known_no_claim}/{len(jobs)} claims already judged to contain no claim.")
+        if skipped:
+            print(f"Pre-flight dedup: skipping {skipped}/{len(jobs)} already evaluated claims.")
+        _journal(fresh_jobs, 'fetched')
+        return fresh_jobs
+    return dedup_stage
+
+
+# Ratings that mean the LLM produced no usable verdict; these are never reused
+UNREUSABLE_RATINGS = ("Error Parsing LLM Output", "LLM Error")
+
+
+def _reusable_result(job):
+    evaluation_data = job['evaluation_data']
+    if evaluation_data['truthfulness_rating'] in UNREUSABLE_RATINGS:
+        return None
+    return {
+        'evaluation': {key: evaluation_data.get(key) for key in (
+            'search_api_used', 'search_query_used', 'truthfulness_rating', 'truthfulness_score',
+            'llm_reasoning', 'claims_detected')},
+        'search_results': job['search_results']
+    }
+
+
+def _submit(writer, job):
+    if is_no_claim_evaluation(job['evaluation_data']) and job['search_results']:
+        # Not written to Postgres; remembered so later runs skip the post. Without
+        # search results the "Cannot Verify" is not Gemini's verdict (e.g. a search
+        # outage), so that post is evaluated again next run.
+        record_no_claim_verdict(GEMINI_MODEL_NAME, job['claim_hash'], job['evaluation_data'],
+                                job['source_data']['source_url'])
+    with awaiting_write_lock:
+        awaiting_write.setdefault((job['source_data']['source_url'], job['claim_hash']), []).append(job)
+    writer.submit(job['source_data'], job['claim_data'], job['evaluation_data'], job['search_results'])
+
+
+def _reuse_result(job, result, matched_hash):
+    """Gives a near-duplicate job the stored evaluation and evidence of `matched_hash`."""
+    job['search_results'] = [
+        evidence for evidence in result['search_results']
+        if not job['exclude_url'] or evidence.get('url') != job['exclude_url']
+    ]
+    job['evaluation_data'] = dict(
+        result['evaluation'],
+        evaluation_timestamp=datetime.now(timezone.utc),
+        llm_model_used=GEMINI_MODEL_NAME,
+        evaluation_status='Completed'
+    )
+    job['near_duplicate_of'] = matched_hash
+    _journal([job], 'evaluated')
+    with run_stats_lock:
+        run_stats['claims_near_duplicate'] += 1
+    return job
+
+
+def make_near_dup_stage(index, writer):
+    """Reuses the stored evaluation of a near-duplicate claim, or parks the job
+    behind a near-duplicate that is already being evaluated in this run."""
+    def near_dup_stage(job):
+        if index is None or job.get('near_duplicate_checked') or 'evaluation_data' in job:
+            return job
+        job['near_duplicate_checked'] = True
+        job['minhash'] = minhash_signature(job['claim_text'])
+        if job['minhash'] is None:
+            return job
+        decision, matched_hash, similarity, result = index.assign(job, job['minhash'])
+        if decision == "reused":
+            print(f"Near-duplicate ({similarity:.2f}) of an evaluated claim, reusing its evaluation: {job['label']}")
+            _reuse_result(job, result, matched_hash)
+            _submit(writer, job)
+            return None
+        if decision == "grouped":
+            print(f"Near-duplicate ({similarity:.2f}) of a claim in this run, waiting for its evaluation: {job['label']}")
+            return None
+        return job
+    return near_dup_stage
+
+
+def print_saved_calls():
+    skipped = (run_stats['claims_prefiltered'] + run_stats['claims_known_no_claim'] + run_stats['claims_deduplicated']
+               + run_stats['claims_near_duplicate'])
+    saved = ", ".join(f"{provider}={count * skipped}" for provider, count in CALLS_PER_CLAIM.items())
+    print(f"Pre-filter skipped {run_stats['claims_prefiltered']}/{run_stats['claims_fetched'] + run_stats['claims_prefiltered']} "
+          f"posts, known no-claim posts skipped {run_stats['claims_known_no_claim']}, "
+          f"pre-flight dedup skipped {run_stats['claims_deduplicated']}/{run_stats['claims_fetched']} claims, "
+          f"near-duplicates reused {run_stats['claims_near_duplicate']}; external calls saved: {saved}")
+
+
+def search_stage(job):
+    if 'search_results' in job:
+        return job  # Resumed from the run journal
+    print(f"Searching evidence for {job['label']} using query: {job['search_query']}")
+    # Provider quotas are enforced by the shared rate limiter inside the search functions
+    tavily_results = search_web_tavily(job['search_query'], max_results=5, include_domains=RELIABLE_SVENSKA_POLITIK_DOMAINS, tavily_key=TAVILY_API_KEY)
+    newsapi_results = search_newsapi(job['search_query'], max_results=5, language='sv', NEWSAPI_KEY=NEWSAPI_KEY)
+    # Keep only the most relevant unique results (scored into relevance_score) for the prompt and Evidence rows
+    job['search_results'] = rerank_results(job['claim_text'], [
+        result for result in tavily_results + newsapi_results
+        if not job['exclude_url'] or result.get('url') != job['exclude_url']
+    ])
+    _journal([job], 'searched')
+    return job
+
+
+def _evaluation_metadata(job):
+    source_data = job['source_data']
+    return {
+        'platform': source_data['platform'],
+        'post_date': source_data['post_timestamp'].isoformat() if source_data.get('post_timestamp') else None
+    }
+
+
+def _attach_evaluation(job, evaluation):
+    job['evaluation_data'] = {
+        'evaluation_timestamp': datetime.now(timezone.utc),
+        'llm_model_used': GEMINI_MODEL_NAME,
+        'search_api_used': job['search_api_used'],
+        'search_query_used': job['search_query'],
+        'truthfulness_rating': evaluation['rating'],
+        'truthfulness_score': evaluation.get('truthfulness_score'),
+        'llm_reasoning': evaluation['reasoning'],
+        'claims_detected': evaluation.get('claims_detected'),
+        'evaluation_status': 'Completed'
+    }
+    return job
+
+
+def evaluate_stage(job):
+    if 'evaluation_data' in job:
+        return job  # Resumed from the run journal
+    evaluation = evaluate_claim_with_llm(
+        job['claim_text'], job['search_results'], llm_model=get_gemini_model(GEMINI_MODEL_NAME, LLM_API_KEY),
+        metadata=_evaluation_metadata(job)
+    )
+    _attach_evaluation(job, evaluation)
+    _journal_evaluated([job])
+    return job
+
+
+def evaluate_batch_stage(jobs):
+    pending = [job for job in jobs if 'evaluation_data' not in job]
+    if pending:
+        evaluations = evaluate_claims_with_llm([
+            {'claim_text': job['claim_text'], 'search_results': job['search_results'], 'metadata': _evaluation_metadata(job)}
+            for job in pending
+        ], get_gemini_model(GEMINI_MODEL_NAME, LLM_API_KEY))
+        for job, evaluation in zip(pending, evaluations):
+            _attach_evaluation(job, evaluation)
+        _journal_evaluated(pending)
+    return jobs
+
+
+def make_store_stage(writer, near_dup_index=None, store_errors=True):
+    """Hands results to the write-behind BatchWriter so storage never blocks evaluation,
+    along with the results of near-duplicates that were waiting for this claim.
+    With `store_errors=False` (queue workers) a failed evaluation is not stored
+    but dropped, so its job is retried."""
+    def store_stage(job):
+        failed = job['evaluation_data']['truthfulness_rating'] in UNREUSABLE_RATINGS
+        if failed and not store_errors:
+            job['queue_error'] = job['evaluation_data']['llm_reasoning'] or job['evaluation_data']['truthfulness_rating']
+            if near_dup_index is not None and job.get('minhash'):
+                near_dup_index.release(job)
+            return None
+        _submit(writer, job)
+        if near_dup_index is not None and job.get('minhash'):
+            result = _reusable_result(job)
+            if result is None:
+                near_dup_index.release(job)
+                return job
+            for follower in near_dup_index.complete(job, job['minhash'], result):
+                _reuse_result(follower, result, job['claim_hash'])
+                _submit(writer, follower)
+        return job
+    return store_stage
+
+
+def make_enqueue_stage(db_pool):
+    """Adds a batch of deduplicated claims to the Postgres job queue."""
+    def enqueue_stage(jobs):
+        inserted = db_pool.run(enqueue_jobs, jobs)
+        with run_stats_lock:
+            run_stats['claims_enqueued'] += inserted
+        print(f"Enqueued {inserted}/{len(jobs)} claims ({len(jobs) - inserted} already queued).")
+        return jobs
+    return enqueue_stage
+
+
+def build_producer_pipeline(db_pool):
+    """Fetch -> triage -> dedup -> job queue; verification is left to queue workers."""
+    return Pipeline([
+        Stage("fetch", fetch_stage, workers=args.fetch_workers, queue_size=args.queue_size),
+        Stage("triage", triage_stage, workers=args.fetch_workers, queue_size=args.queue_size),
+        Stage("dedup", make_dedup_stage(db_pool), workers=args.fetch_workers, queue_size=args.queue_size, fan_out=True),
+        Stage("enqueue", make_enqueue_stage(db_pool), workers=1, queue_size=args.queue_size,
+              batch_size=args.write_batch_size),
+    ])
+
+
+def evaluation_stages(writer, near_dup_index=None):
+    """Evidence search -> LLM evaluation -> persistence, the tail of build_pipeline."""
+    return [
+        Stage("search", search_stage, workers=args.search_workers, queue_size=args.queue_size),
+        Stage("evaluate", evaluate_batch_stage if args.llm_batch_size > 1 else evaluate_stage,
+              workers=args.llm_workers, queue_size=args.queue_size, batch_size=args.llm_batch_size),
+        Stage("store", make_store_stage(writer, near_dup_index, store_errors=not args.worker), workers=1,
+              queue_size=args.queue_size),
+    ]
 
-try:
-    genai.configure(api_key=LLM_API_KEY)
-    llm_model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-    print("Google Gemini model initialized.")
-except Exception as e:
-    print(f"ERROR: Failed to initialize Google Gemini model: {e}")
-    sys.exit(1)
-    
 
-# --- Main Execution Logic ---
-if __name__ == "__main__":
-    print("Starting Claim Verification Process...")
-    db_conn = get_db_connection(DB_HOST=DB_HOST, DB_PORT=DB_PORT, DB_NAME=DB_NAME, DB_USER=DB_USER, DB_PASSWORD=DB_PASSWORD) # Get DB connection here
-
-    RELIABLE_SVENSKA_POLITIK_DOMAINS = [
-        # Swedish News & Government
-        "svt.se",
-        "sr.se",
-        "dn.se",
-        "svd.se",
-        "riksdagen.se",
-        "regeringen.se",
-        "scb.se",
-        "faktiskt.se",
-        "tillvaxtverket.se",
-        "msb.se",
-        "folkhalsomyndigheten.se",
-
-        # International News & Fact-Checking
-        "apnews.com",
-        "reuters.com",
-        "bbc.com",
-        "nytimes.com",
-        "theguardian.com",
-        "politifact.com",
-        "factcheck.org",
-        "snopes.com",
-        "fullfact.org",
-
-        # Scientific and Academic Sources
-        "nature.com",
-        "sciencemag.org",
-        "nejm.org",
-        "thelancet.com",
-        "pubmed.ncbi.nlm.nih.gov",
-        "who.int",
-        "ecdc.europa.eu",
-        "un.org",
-        "europa.eu"
-    ]
+def build_pipeline(db_pool, writer, near_dup_index=None):
+    """Fetch -> triage -> dedup -> near-duplicate reuse -> evidence search -> LLM evaluation -> persistence.
+    Queue workers skip triage: their producer already triaged every job, and a
+    job dropped here would be retried and dead-lettered instead of completed."""
+    stages = [Stage("fetch", fetch_stage, workers=args.fetch_workers, queue_size=args.queue_size)]
+    if not args.worker:
+        stages.append(Stage("triage", triage_stage, workers=args.fetch_workers, queue_size=args.queue_size))
+    return Pipeline(stages + [
+        Stage("dedup", make_dedup_stage(db_pool), workers=args.fetch_workers, queue_size=args.queue_size, fan_out=True),
+        Stage("near_dup", make_near_dup_stage(near_dup_index, writer), workers=1, queue_size=args.queue_size),
+    ] + evaluation_stages(writer, near_dup_index))
 
 
-    twitter_search_query = '#svpol'
+def _warm_up_gemini():
+    try:
+        get_gemini_model(GEMINI_MODEL_NAME, LLM_API_KEY)
+        print("Google Gemini model initialized.")
+    except Exception as e:
+        print(f"ERROR: Failed to initialize Google Gemini model: {e}")
 
-    subreddits_to_scan = ["svenskpolitik", "Sverige", "sweden"]
-    
-    max_posts_per_subreddit = 20
-    max_days_reddit = 7    
 
-    # Process manually entered claim if provided
-    if args.claim:
-        print("\n=== Processing manually entered claim ===")
-        claim_text = args.claim
-        source_url = args.source_url if args.source_url else 'manual_input'
-        author = args.author
-
-        # Search for evidence
-        search_query = claim_text.strip().split('\n\n', 1)[0].split('\n', 1)[0].strip()
-        tavily_results = search_web_tavily(search_query, max_results=5, include_domains=RELIABLE_SVENSKA_POLITIK_DOMAINS, tavily_key=TAVILY_API_KEY)
-        time.sleep(1)
-        newsapi_results = search_newsapi(search_query, max_results=5, language='sv', NEWSAPI_KEY=NEWSAPI_KEY)
-        time.sleep(1)
-        search_results = tavily_results + newsapi_results
-
-        # Evaluate claim
-        evaluation = evaluate_claim_with_llm(
-            claim_text, search_results, llm_model=llm_model,
-            metadata={
-                'platform': 'Manual Input',
-                'post_date': datetime.now(timezone.utc).isoformat()
-            }
-        )
+# --- Main Execution Logic ---
 
-        # Prepare data for storage
-        source_data = {
-            'platform': 'Manual Input',
-            'source_url': source_url,
-            'author_id': author,
-            'author_username': author,
-            'post_timestamp': datetime.now(timezone.utc),
-            'fetch_timestamp': datetime.now(timezone.utc)
-        }
+TWITTER_SEARCH_QUERY = '#svpol'
+SUBREDDITS_TO_SCAN = ["svenskpolitik", "Sverige", "sweden"]
+MAX_POSTS_PER_SUBREDDIT = 20
+MAX_DAYS_REDDIT = 7
 
-        claim_data = {
-            'claim_text': claim_text,
-            'extraction_method': 'manual_input',
-            'date_extracted': datetime.now(timezone.utc)
-        }
 
-        evaluation_data = {
-            'evaluation_timestamp': datetime.now(timezone.utc),
-            'llm_model_used': GEMINI_MODEL_NAME,
-            'search_api_used': 'tavily_search_api,newsapi',
-            'search_query_used': search_query,
-            'truthfulness_rating': evaluation['rating'],
-            'truthfulness_score': evaluation.get('truthfulness_score'),
-            'llm_reasoning': evaluation['reasoning'],
-            'claims_detected': evaluation.get('claims_detected'),
-            'evaluation_status': 'Completed'
-        }
+def reddit_fetch_tasks():
+    if args.combined_listing:
+        return [reddit_fetch_task("+".join(SUBREDDITS_TO_SCAN),
+                                  MAX_POSTS_PER_SUBREDDIT * len(SUBREDDITS_TO_SCAN), MAX_DAYS_REDDIT)]
+    return [reddit_fetch_task(subreddit, MAX_POSTS_PER_SUBREDDIT, MAX_DAYS_REDDIT) for subreddit in SUBREDDITS_TO_SCAN]
 
-        # Store data in database
-        store_verification_data(db_conn, source_data, claim_data, evaluation_data, search_results, GEMINI_MODEL_NAME)
-        
-        # Close the database connection and exit
-        if db_conn:
-            db_conn.close()
-            print("Database connection closed.")
-        
-        print("Manual claim verification completed.")
-        sys.exit(0)  # Exit after processing manual claim
-    
-    # We'll store all fetched posts here
-    all_reddit_posts = []
-    
-    # Fetch posts from each subreddit, but ONLY if not skipped and no manual claim was provided
-    if not args.skip_reddit:
-        for subreddit in subreddits_to_scan:
-            print(f"\n=== Fetching posts from r/{subreddit} ===")
-            reddit_posts = fetch_reddit_claims_for_llm(
-                max_results=max_posts_per_subreddit, 
-                client_id=os.getenv("REDDIT_CLIENT_ID"), 
-                client_secret=os.getenv("REDDIT_CLIENT_SECRET"), 
-                subreddit=subreddit,
-                max_days=max_days_reddit,
-                extract_links=False  # Skip article content extraction, use Reddit post titles instead
-            )
-                
-            if reddit_posts:
-                print(f"Successfully fetched {len(reddit_posts)} posts from r/{subreddit}")
-                all_reddit_posts.extend(reddit_posts)
-            else:
-                print(f"No posts fetched from r/{subreddit}")
-    else:
-        print("Reddit fetching skipped based on command-line argument.")
-    
-    # --- Check if we got any Reddit posts ---
-    if not all_reddit_posts and not args.claim:
-        print("No Reddit posts fetched from any subreddit and no manual claim provided. Exiting.")
-        if db_conn:
-            db_conn.close()
-        sys.exit(0)
+
+def twitter_fetch_tasks():
+    return [twitter_fetch_task(TWITTER_SEARCH_QUERY, args.max_tweets)]
+
+
+def run_verification(db_pool, writer, near_dup_index, fetch_tasks, run_id=None):
+    """Runs the fetch tasks through the pipeline (or into the job queue with
+    --enqueue), waits until every result is written and only then advances the
+    fetch checkpoints. The run is journaled under a new id, or under `run_id`
+    when resuming, and marked finished once everything is written.
+    Returns (pipeline, processed jobs)."""
+    if run_journal is not None:
+        print(f"Run journal: {run_journal.begin(run_id)}")
+    if args.enqueue:
+        pipeline = build_producer_pipeline(db_pool)
     else:
-        print(f"Successfully fetched a total of {len(all_reddit_posts)} Reddit posts for processing.")
-
-    # --- Configure Twitter search ---
-    twitter_search_query = '#svpol'
-    max_tweets_to_fetch = 10
-    
-    # Fetch tweets if not skipped via command-line argument
-    tweets = []
+        pipeline = build_pipeline(db_pool, writer, near_dup_index)
+    processed_jobs = pipeline.run(fetch_tasks)
+    orphans = near_dup_index.drain_orphans() if near_dup_index else []
+    if orphans:
+        # Their representative failed, so they are evaluated on their own. They
+        # were already fetched, triaged and deduplicated, so they go straight to
+        # search and their stats are added to the main pipeline's.
+        print(f"\nEvaluating {len(orphans)} near-duplicates whose representative claim failed...")
+        orphan_pipeline = Pipeline(evaluation_stages(writer, near_dup_index))
+        processed_jobs += orphan_pipeline.run(orphans)
+        pipeline.merge(orphan_pipeline)
+    writer.flush()
+    # Claims dropped by a stage error or never written keep their post's checkpoint back
+    failed_urls = {job['source_data']['source_url'] for _, item in pipeline.failures
+                   for job in (item if isinstance(item, list) else [item]) if isinstance(job, dict)}
+    with awaiting_write_lock:
+        if awaiting_write:
+            print(f"WARNING: {len(awaiting_write)} results could not be written to the database.")
+        failed_urls.update(source_url for source_url, _ in awaiting_write)
+        awaiting_write.clear()
+    with fetched_sources_lock:
+        listings, searches = list(fetched_reddit_listings), list(fetched_tweet_searches)
+        fetched_reddit_listings.clear()
+        fetched_tweet_searches.clear()
+    for subreddit, reddit_posts in listings:
+        save_reddit_checkpoint(subreddit, _checkpointable_posts(reddit_posts, failed_urls,
+                                                                lambda post: post["created_utc"]))
+    for query, tweets in searches:
+        save_tweet_checkpoint(query, _checkpointable_posts(tweets, failed_urls,
+                                                           lambda tweet: int(tweet.get("id") or 0)))
+    if failed_urls and (listings or searches):
+        print(f"Checkpoints held back before {len(failed_urls)} sources whose claims failed; "
+              f"they are fetched again next run.")
+    if run_journal is not None:
+        run_journal.finish()
+    return pipeline, processed_jobs
+
+
+def _shutdown_on_signal():
+    """Returns an Event set by the first SIGTERM/SIGINT; a second one exits at once."""
+    shutdown = threading.Event()
+
+    def request_shutdown(signum, frame):
+        print(f"\nReceived signal {signum}; finishing the current cycle before shutting down (repeat to force).")
+        signal.signal(signum, signal.SIG_DFL)
+        shutdown.set()
+
+    signal.signal(signal.SIGTERM, request_shutdown)
+    signal.signal(signal.SIGINT, request_shutdown)
+    return shutdown
+
+
+def run_service(db_pool, writer, near_dup_index):
+    """Polls each source on its own interval until SIGTERM/SIGINT. The database
+    pool, writer, caches, HTTP sessions and Gemini client stay warm across
+    cycles; a signal lets the running cycle finish and flush before exiting."""
+    shutdown = _shutdown_on_signal()
+
+    sources = []  # (name, poll interval, task factory)
+    if not args.skip_reddit:
+        sources.append(("reddit", args.reddit_interval, reddit_fetch_tasks))
     if not args.skip_twitter and TEST_BEARER_TOKEN:
-        print(f"\n=== Fetching tweets with search query: {twitter_search_query} ===")
-        tweets = fetch_tweets_requests(twitter_search_query, max_tweets_to_fetch, TEST_BEARER_TOKEN)
-        if tweets:
-            print(f"Successfully fetched {len(tweets)} tweets.")
-        else:
-            print("No tweets fetched. Continuing with Reddit posts only.")
+        sources.append(("twitter", args.twitter_interval, twitter_fetch_tasks))
+    if not sources:
+        print("No sources to poll. Exiting.")
+        return
+
+    next_due = {name: 0.0 for name, _, _ in sources}
+    cycle = 0
+    while not shutdown.is_set():
+        now = time.monotonic()
+        due = [source for source in sources if next_due[source[0]] <= now]
+        if due:
+            cycle += 1
+            print(f"\n=== Service cycle {cycle}: polling {', '.join(name for name, _, _ in due)} ===")
+            for name, interval, _ in due:
+                next_due[name] = now + interval
+            try:
+                pipeline, processed_jobs = run_verification(
+                    db_pool, writer, near_dup_index, [task for _, _, make_tasks in due for task in make_tasks()])
+                pipeline.print_stats()
+                print(f"Cycle {cycle} processed {len(processed_jobs)} claims.")
+            except Exception as e:
+                print(f"ERROR: Service cycle {cycle} failed: {e}")
+                traceback.print_exc()
+        shutdown.wait(max(0.0, min(next_due.values()) - time.monotonic()))
+    print(f"Service stopped after {cycle} cycles.")
+
+
+def _keep_leases(db_pool, worker_id, job_ids, done):
+    """Renews the worker's leases every third of the lease period until `done` is set."""
+    while not done.wait(args.lease_seconds / 3):
+        try:
+            lost = db_pool.run(renew_leases, job_ids, worker_id, args.lease_seconds)
+        except psycopg2.Error as e:
+            print(f"WARNING: Could not renew job leases: {e}")
+            continue
+        if lost:
+            print(f"WARNING: Lost the lease on {len(lost)} jobs; another worker may process them again.")
+
+
+def _settle_jobs(db_pool, worker_id, jobs, error=None):
+    """Completes the jobs whose result the BatchWriter reported written (or
+    that already had one) and returns every other job, including those whose
+    write failed, to the queue for a retry or dead-lettering."""
+    done = [job['queue_job_id'] for job in jobs if job.get('stored') or job.get('already_evaluated')]
+    failures = {
+        job['queue_job_id']: error or job.get('queue_error') or ("Result could not be written to the database" if 'evaluation_data' in job
+                                   else "Dropped by the verification pipeline (see worker log)")
+        for job in jobs if not (job.get('stored') or job.get('already_evaluated'))
+    }
+    completed = db_pool.run(complete_jobs, done, worker_id)
+    dead = db_pool.run(fail_jobs, failures, worker_id)
+    with run_stats_lock:
+        run_stats['jobs_completed'] += completed
+        run_stats['jobs_retried'] += len(failures) - dead
+        run_stats['jobs_dead'] += dead
+    print(f"Jobs: {completed} completed, {len(failures) - dead} returned for retry, {dead} dead-lettered.")
+
+
+def run_queue_worker(db_pool, writer, near_dup_index):
+    """Leases claim jobs from the Postgres queue and verifies them until
+    SIGTERM/SIGINT. Jobs are completed only after their results are written;
+    a worker that dies leaves its leases to expire and be claimed elsewhere."""
+    shutdown = _shutdown_on_signal()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    print(f"Queue worker {worker_id} started.")
+    while not shutdown.is_set():
+        try:
+            jobs = db_pool.run(claim_jobs, worker_id, args.queue_batch_size, args.lease_seconds)
+        except psycopg2.Error as e:
+            print(f"ERROR: Could not lease jobs from the queue: {e}")
+            jobs = []
+        if not jobs:
+            shutdown.wait(args.queue_poll_interval)
+            continue
+        print(f"\n=== Leased {len(jobs)} claim jobs ===")
+        leases_done = threading.Event()
+        keeper = threading.Thread(target=_keep_leases, name="lease-keeper", daemon=True,
+                                  args=(db_pool, worker_id, [job['queue_job_id'] for job in jobs], leases_done))
+        keeper.start()
+        error = None
+        try:
+            run_verification(db_pool, writer, near_dup_index, [lambda: jobs])
+        except Exception as e:
+            error = f"Verification failed: {e}"
+            print(f"ERROR: {error}")
+            traceback.print_exc()
+        finally:
+            leases_done.set()
+            keeper.join()
+        try:
+            _settle_jobs(db_pool, worker_id, jobs, error)
+        except psycopg2.Error as e:
+            print(f"ERROR: Could not record job outcomes; their leases will expire and be retried: {e}")
+    print(f"Queue worker {worker_id} stopped.")
+
+
+def train_prefilter_model(db_pool):
+    """Trains the pre-filter on journaled verdicts (both classes) and on the
+    claims stored in Postgres (which all contained a claim). Returns an exit code.
+
+    Only an explicit no-claim verdict counts as a post without a claim; verdicts
+    reached without any search results, unparsed replies and posts seen more
+    than once (by claim hash) are left out."""
+    examples = {}
+    journal = get_run_journal()
+    if journal is not None:
+        for job in journal.evaluated_jobs():
+            if job['source_data']['platform'] not in PREFILTER_PLATFORMS or not job.get('search_results'):
+                continue
+            evaluation_data = job['evaluation_data']
+            no_claim = evaluation_data['truthfulness_rating'] == NO_CLAIMS_PHRASE
+            if not no_claim and (evaluation_data['truthfulness_rating'] not in VALID_RATINGS
+                                 or is_no_claim_evaluation(evaluation_data)):
+                continue
+            examples.setdefault(job['claim_hash'], (job['claim_text'], no_claim))
+    for text in db_pool.run(fetch_stored_claim_texts, PREFILTER_PLATFORMS):
+        examples.setdefault(compute_claim_hash(text), (text, False))
+    examples = list(examples.values())
+    no_claims = sum(1 for _, no_claim in examples if no_claim)
+    print(f"Training the pre-filter on {len(examples)} posts ({no_claims} without a verifiable claim)...")
+    model = train_prefilter(examples)
+    if model is None:
+        print("Not enough examples of both classes yet; the pre-filter keeps using its heuristics.")
+        return 1
+    model.save(PREFILTER_MODEL_PATH)
+    print(f"Pre-filter model saved to {PREFILTER_MODEL_PATH} (training accuracy {model.meta['training_accuracy']:.1%}).")
+    return 0
+
+
+def print_run_stats(db_pool):
+    print_saved_calls()
+    if args.enqueue or args.worker:
+        print(f"Job queue: enqueued={run_stats['claims_enqueued']} completed={run_stats['jobs_completed']} "
+              f"retried={run_stats['jobs_retried']} dead={run_stats['jobs_dead']}; "
+              f"queue now {db_pool.run(job_queue_counts)}")
+    print_search_cache_stats()
+    print_llm_cache_stats()
+    print_prompt_token_stats()
+    print_rate_limit_stats()
+    print_http_stats()
+    db_pool.print_stats()
+
+
+def main(argv=None):
+    """Runs one verification pass, the polling service with --service, or a
+    job queue worker with --worker; returns the process exit code."""
+    global args, run_journal, claim_prefilter
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    if args.service and args.claim:
+        parser.error("--service cannot be combined with --claim")
+    if args.worker and (args.enqueue or args.service or args.claim):
+        parser.error("--worker cannot be combined with --enqueue, --service or --claim")
+    if args.resume and (args.enqueue or args.worker or args.service or args.claim):
+        parser.error("--resume cannot be combined with --enqueue, --worker, --service or --claim")
+    args.incremental = args.incremental or args.service
+
+    # Commenting out Twitter token requirement since we're only using Reddit
+    if not all([DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, TAVILY_API_KEY, LLM_API_KEY, NEWSAPI_KEY]):
+        print("ERROR: Missing essential configuration in .env file (DB, Tavily, LLM). Exiting.")
+        return 1
+
+    print("Starting Claim Verification Process...")
+    # Import the Gemini SDK and build the model in the background while the
+    # database connects and claims are fetched and searched.
+    if not (args.enqueue or args.train_prefilter or args.migrate_db):
+        threading.Thread(target=_warm_up_gemini, name="gemini-warmup", daemon=True).start()
+    try:
+        db_pool = DatabasePool(DB_HOST=DB_HOST, DB_PORT=DB_PORT, DB_NAME=DB_NAME, DB_USER=DB_USER, DB_PASSWORD=DB_PASSWORD,
+                               maxconn=args.db_pool_size, statement_timeout_ms=int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000")))
+    except psycopg2.Error as e:
+        print(f"ERROR: Unable to connect to the database: {e}")
+        return 1
+
+    if args.train_prefilter:
+        exit_code = train_prefilter_model(db_pool)
+        db_pool.close()
+        return exit_code
+    if args.migrate_db:
+        exit_code = 0 if db_pool.run(migrate_unique_keys) else 1
+        db_pool.close()
+        return exit_code
+
+    resident = args.service or args.worker
+    # Queued jobs are already durable; the journal covers runs verified in this process
+    run_journal = None if args.enqueue or args.worker else get_run_journal()
+    claim_prefilter = None if args.no_prefilter else get_prefilter(args.prefilter_threshold)
+    if claim_prefilter:
+        print(f"Pre-filter: {claim_prefilter.scorer}, threshold {claim_prefilter.threshold}")
+    if args.enqueue or args.worker:
+        try:
+            db_pool.run(ensure_job_table)
+        except psycopg2.Error as e:
+            print(f"ERROR: Unable to create the job queue table: {e}")
+            db_pool.close()
+            return 1
+
+    fetch_tasks = []
+    resume_run_id = None
+    if resident:
+        pass  # Sources are polled by run_service, jobs leased by run_queue_worker
+    elif args.resume:
+        resume_run_id = run_journal.latest_unfinished_run() if run_journal and args.resume == 'latest' else args.resume
+        if run_journal is None or not resume_run_id or not run_journal.run_exists(resume_run_id):
+            print("No interrupted run to resume (or the run journal is disabled). Exiting.")
+            db_pool.close()
+            return 0
+        resumed_jobs = run_journal.pending_jobs(resume_run_id)
+        print(f"\n=== Resuming run {resume_run_id}: {len(resumed_jobs)} unfinished claims "
+              f"(by stage: {run_journal.stage_counts(resume_run_id)}) ===")
+        fetch_tasks.append(lambda: resumed_jobs)
+    elif args.claim:
+        # Process manually entered claim only
+        print("\n=== Processing manually entered claim ===")
+        source_url = args.source_url if args.source_url else 'manual_input'
+        manual_jobs = jobs_from_manual_claim(args.claim, source_url, args.author)
+        fetch_tasks.append(lambda: manual_jobs)
     else:
-        if args.skip_twitter:
+        if not args.skip_reddit:
+            fetch_tasks.extend(reddit_fetch_tasks())
+        else:
+            print("Reddit fetching skipped based on command-line argument.")
+
+        if not args.skip_twitter and TEST_BEARER_TOKEN:
+            fetch_tasks.extend(twitter_fetch_tasks())
+        elif args.skip_twitter:
             print("Twitter fetching skipped based on command-line argument.")
-        elif not TEST_BEARER_TOKEN:
+        else:
             print("Twitter API token not found. Skipping Twitter fetching.")
 
-    # --- Check only for Reddit posts ---
-    if not all_reddit_posts and not args.claim:
-        print("No Reddit posts fetched matching the criteria and no manual claim provided.")
-        if db_conn:
-            db_conn.close()
-        sys.exit(0)
-    else:
-        print(f"Successfully fetched {len(all_reddit_posts)} Reddit posts for processing.")
-
-    # --- Process Reddit posts with linked articles as claims ---
-    processed_count = 0
-    for post in all_reddit_posts:
-        print(f"\n=== Processing Reddit post {processed_count + 1}/{len(all_reddit_posts)}: {post['url']} ===")
-        
-        # Check if the post has a linked article
-        if 'link_content' in post and post['link_content']:
-            # Use the article content as the claim source instead of Reddit post title
-            article_title = post.get('link_title', 'Unknown Article')
-            article_url = post.get('link_url', '')
-            article_domain = post.get('link_domain', '')
-            
-            print(f"Processing linked article: {article_title} from {article_domain}")
-            
-            # Extract claims from article content using LangChain chunks
-            if 'link_chunks' in post and post['link_chunks']:
-                article_chunks = post['link_chunks']
-            else:
-                # If no chunks, use the main content
-                article_chunks = [post['link_content']]
-            
-            # Process each chunk of the article as a separate claim
-            for chunk_index, chunk_content in enumerate(article_chunks):
-                # Limit chunk size for processing
-                claim_text = chunk_content[:2000] if len(chunk_content) > 2000 else chunk_content
-                
-                if not claim_text.strip():
-                    print(f"Skipping empty chunk {chunk_index}")
-                    continue
-                    
-                print(f"Processing article chunk {chunk_index+1}/{len(article_chunks)}")
-                
-                # Search for evidence
-                # Use the article title + first sentence as the search query for better results
-                first_sentence = claim_text.split('.')[0] if '.' in claim_text else claim_text[:100]
-                search_query = f"{article_title}: {first_sentence}".strip()
-                
-                # Limit search query length
-                if len(search_query) > 200:
-                    search_query = search_query[:200]
-                    
-                print(f"Using search query: {search_query}")
-                
-                tavily_results = search_web_tavily(search_query, max_results=5, include_domains=RELIABLE_SVENSKA_POLITIK_DOMAINS, tavily_key=TAVILY_API_KEY)
-                time.sleep(1)
-                
-                newsapi_results = search_newsapi(search_query, max_results=5, language='sv', NEWSAPI_KEY=NEWSAPI_KEY)
-                time.sleep(1)
-                
-                # Create the evidence list, excluding the source article itself to avoid circular reasoning
-                search_results = []
-                for result in tavily_results + newsapi_results:
-                    # Skip if this is the same article we're analyzing
-                    if result.get('url') == article_url:
-                        continue
-                    search_results.append(result)
-                
-                # Remove Reddit post as context evidence - only use the linked article content as the claim
-                # and external evidence for evaluation
-                
-                # Evaluate claim
-                evaluation = evaluate_claim_with_llm(
-                    claim_text, search_results, llm_model=llm_model,
-                    metadata={
-                        'platform': source_data['platform'],
-                        'post_date': source_data['post_timestamp'].isoformat() if 'post_timestamp' in source_data else None
-                    }
-                )
-                
-                # Prepare data for storage
-                source_data = {
-                    'platform': f"Article via Reddit",
-                    'source_url': article_url,
-                    'author_id': post.get('author', 'unknown'),  # Reddit user who shared it
-                    'author_username': post.get('author', 'unknown'),
-                    'post_timestamp': datetime.fromisoformat(post['created_at']) if 'created_at' in post else datetime.now(timezone.utc),
-                    'fetch_timestamp': datetime.now(timezone.utc)
-                }
-                
-                claim_data = {
-                    'claim_text': claim_text,
-                    'extraction_method': f'linked_article_content_chunk_{chunk_index+1}',
-                    'date_extracted': datetime.now(timezone.utc)
-                }
-                
-                # Include information about the evidence sources in the evaluation data
-                evidence_sources = "article_via_reddit,tavily_search_api,newsapi"
-                
-                evaluation_data = {
-                    'evaluation_timestamp': datetime.now(timezone.utc),
-                    'llm_model_used': GEMINI_MODEL_NAME,
-                    'search_api_used': evidence_sources,
-                    'search_query_used': search_query,
-                    'truthfulness_rating': evaluation['rating'],
-                    'truthfulness_score': evaluation.get('truthfulness_score'),
-                    'llm_reasoning': evaluation['reasoning'],
-                    'evaluation_status': 'Completed'
-                }
-                
-                # Store data in database
-                store_verification_data(db_conn, source_data, claim_data, evaluation_data, search_results, GEMINI_MODEL_NAME)
-                
-                # Add a small delay between processing chunks
-                time.sleep(2)
-                
+    if not fetch_tasks and not resident:
+        print("Nothing to fetch and no manual claim provided. Exiting.")
+        db_pool.close()
+        return 0
+
+    batched = db_pool.run(has_unique_keys)
+    if not batched:
+        print("WARNING: The unique keys for batched storage are missing; writing results one by one. "
+              "Run with --migrate-db once to create them.")
+    writer = BatchWriter(db_pool, GEMINI_MODEL_NAME, batch_size=args.write_batch_size,
+                         flush_interval=args.write_flush_interval, on_written=_results_written, batched=batched)
+    near_dup_index = get_near_duplicate_index(GEMINI_MODEL_NAME, threshold=args.near_dup_threshold)
+    try:
+        if args.worker:
+            run_queue_worker(db_pool, writer, near_dup_index)
+        elif args.service:
+            run_service(db_pool, writer, near_dup_index)
         else:
-            # Process the Reddit post itself as a claim if it has no linked article
-            print(f"Processing Reddit post as claim (no article link): {post['title']}")
-            
-            # Combine title and post content for a more complete claim
-            post_title = post.get('title', '')
-            post_content = post.get('snippet', '')
-            
-            # Use both title and content if available, or just title
-            if post_content and len(post_content) > 10:  # Ensure there's meaningful content
-                claim_text = f"{post_title}\n\n{post_content}"
-            else:
-                claim_text = post_title
-                
-            # Limit claim size for processing
-            claim_text = claim_text[:2000] if len(claim_text) > 2000 else claim_text
-            
-            # Skip if there's no meaningful claim
-            if not claim_text.strip():
-                print(f"Skipping empty Reddit post: {post['url']}")
-                continue
-                
-            source_data = {
-                'platform': 'Reddit',
-                'source_url': post['url'],
-                'author_id': post.get('author', 'unknown'),
-                'author_username': post.get('author', 'unknown'),
-                'post_timestamp': datetime.fromisoformat(post['created_at']) if 'created_at' in post else datetime.now(timezone.utc),
-                'fetch_timestamp': datetime.now(timezone.utc)
-            }
-            
-            # Search for evidence
-            search_query = post_title.strip()
-            
-            # Limit search query length
-            if len(search_query) > 200:
-                search_query = search_query[:200]
-                
-            print(f"Using search query: {search_query}")
-            
-            tavily_results = search_web_tavily(search_query, max_results=5, include_domains=RELIABLE_SVENSKA_POLITIK_DOMAINS, tavily_key=TAVILY_API_KEY)
-            time.sleep(1)
-            
-            newsapi_results = search_newsapi(search_query, max_results=5, language='sv', NEWSAPI_KEY=NEWSAPI_KEY)
-            time.sleep(1)
-            
-            # Combine search results
-            search_results = tavily_results + newsapi_results
-            
-            # Evaluate claim
-            evaluation = evaluate_claim_with_llm(
-                claim_text, search_results, llm_model=llm_model,
-                metadata={
-                    'platform': source_data['platform'],
-                    'post_date': source_data['post_timestamp'].isoformat() if 'post_timestamp' in source_data else None
-                }
-            )
-            
-            
-            claim_data = {
-                'claim_text': claim_text,
-                'extraction_method': 'reddit_post_content',
-                'date_extracted': datetime.now(timezone.utc)
-            }
-            
-            evidence_sources = "reddit_post,tavily_search_api,newsapi"
-            
-            evaluation_data = {
-                'evaluation_timestamp': datetime.now(timezone.utc),
-                'llm_model_used': GEMINI_MODEL_NAME,
-                'search_api_used': evidence_sources,
-                'search_query_used': search_query,
-                'truthfulness_rating': evaluation['rating'],
-                'truthfulness_score': evaluation.get('truthfulness_score'),
-                'llm_reasoning': evaluation['reasoning'],
-                'evaluation_status': 'Completed'
-            }
-            
-            # Store data in database
-            store_verification_data(db_conn, source_data, claim_data, evaluation_data, search_results, GEMINI_MODEL_NAME)
-
-        processed_count += 1
-
-    print(f"\nProcessed a total of {processed_count} Reddit posts.")
-
-    # --- Process Twitter posts as claims ---
-    if tweets:
-        print("\n=== Processing Twitter/X posts ===")
-        for i, tweet in enumerate(tweets):
-            print(f"\nProcessing Twitter post {i + 1}/{len(tweets)}: {tweet['source_url']}")
-            
-            claim_text = tweet.get('text', '')
-            
-            # Skip if there's no meaningful content
-            if not claim_text.strip():
-                print(f"Skipping empty Twitter post: {tweet['source_url']}")
-                continue
-                
-            # Limit claim size for processing
-            claim_text = claim_text[:2000] if len(claim_text) > 2000 else claim_text
-            
-            # Search for evidence
-            search_query = claim_text.split('#', 1)[0].strip()  # Remove hashtags for searching
-            
-            # Limit search query length
-            if len(search_query) > 200:
-                search_query = search_query[:200]
-                
-            print(f"Using search query: {search_query}")
-            
-            tavily_results = search_web_tavily(search_query, max_results=5, include_domains=RELIABLE_SVENSKA_POLITIK_DOMAINS, tavily_key=TAVILY_API_KEY)
-            time.sleep(1)
-            
-            newsapi_results = search_newsapi(search_query, max_results=5, language='sv', NEWSAPI_KEY=NEWSAPI_KEY)
-            time.sleep(1)
-            
-            # Combine search results
-            search_results = tavily_results + newsapi_results
-
-                        # Prepare data for storage
-            source_data = {
-                'platform': 'Twitter/X',
-                'source_url': tweet['source_url'],
-                'author_id': tweet.get('author_id', 'unknown'),
-                'author_username': tweet.get('author_username', 'unknown'),
-                'post_timestamp': datetime.fromisoformat(tweet['created_at']) if 'created_at' in tweet else datetime.now(timezone.utc),
-                'fetch_timestamp': datetime.now(timezone.utc)
-            }
-            
-            # Evaluate claim
-            evaluation = evaluate_claim_with_llm(
-                claim_text, search_results, llm_model=llm_model,
-                metadata={
-                    'platform': source_data['platform'],
-                    'post_date': source_data['post_timestamp'].isoformat() if 'post_timestamp' in source_data else None
-                }
-            )
-            
-
-            
-            claim_data = {
-                'claim_text': claim_text,
-                'extraction_method': 'twitter_post_content',
-                'date_extracted': datetime.now(timezone.utc)
-            }
-            
-            evidence_sources = "twitter_post,tavily_search_api,newsapi"
-            
-            evaluation_data = {
-                'evaluation_timestamp': datetime.now(timezone.utc),
-                'llm_model_used': GEMINI_MODEL_NAME,
-                'search_api_used': evidence_sources,
-                'search_query_used': search_query,
-                'truthfulness_rating': evaluation['rating'],
-                'truthfulness_score': evaluation.get('truthfulness_score'),
-                'llm_reasoning': evaluation['reasoning'],
-                'claims_detected': evaluation.get('claims_detected'),
-                'evaluation_status': 'Completed'
-            }
-            
-            # Store data in database
-            store_verification_data(db_conn, source_data, claim_data, evaluation_data, search_results, GEMINI_MODEL_NAME)
+            pipeline, processed_jobs = run_verification(db_pool, writer, near_dup_index, fetch_tasks, resume_run_id)
+    finally:
+        writer.close()  # Flush pending results before the pool is closed
+    if not resident:
+        pipeline.print_stats()
+    print_run_stats(db_pool)
+    if not resident:
+        print(f"\nProcessed a total of {len(processed_jobs)} claims.")
 
     # --- Cleanup ---
-    if db_conn:
-        db_conn.close()
-        print("Database connection closed.")
+    close_sessions()
+    if near_dup_index:
+        near_dup_index.close()
+    if run_journal:
+        run_journal.close()
+    if claim_prefilter:
+        claim_prefilter.close()
+    db_pool.close()
+    print("Database connections closed.")
+
+    print("Claim Verification Process Finished.")
+    return 0
 
-    print("Claim Verification Process Finished.")
\ No newline at end of file
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,162 @@
 import os
 import requests
 import json
-import praw
 from urllib.parse import urlparse
 from datetime import datetime, timedelta
 import traceback
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from ratelimit import get_rate_limiter
+import transport
 
-# Add LangChain imports
-from langchain.document_loaders import WebBaseLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from chunking import iter_chunks
+from html_extract import extract_text_streaming, ARTICLE_MAX_CHUNKS
+from article_cache import get_article_cache, canonicalize_url, ARTICLE_CACHE_FRESH_SECONDS
+from checkpoints import get_checkpoint, set_checkpoint
+from x_user_cache import get_x_user_cache
 
-def fetch_tweets_requests(query, max_results=1, bearer_token=str(os.getenv("TEST_BEARER_TOKEN"))):
-    """Fetches recent tweets matching the query using X API v2 and the Requests library."""
+# Article extraction runs in a shared thread pool so slow hosts overlap instead of
+# adding up. Each host gets at most ARTICLE_PER_DOMAIN_CONCURRENCY simultaneous
+# fetches on top of its token bucket in the rate limiter.
+ARTICLE_WORKERS = int(os.getenv("ARTICLE_WORKERS", "8"))
+ARTICLE_PER_DOMAIN_CONCURRENCY = int(os.getenv("ARTICLE_PER_DOMAIN_CONCURRENCY", "2"))
+ARTICLE_DEADLINE_SECONDS = float(os.getenv("ARTICLE_DEADLINE_SECONDS", "60"))
+
+_article_executor = None
+_domain_semaphores = {}
+_article_lock = threading.Lock()
+
+def _get_article_executor():
+    global _article_executor
+    with _article_lock:
+        if _article_executor is None:
+            _article_executor = ThreadPoolExecutor(max_workers=ARTICLE_WORKERS, thread_name_prefix="article")
+        return _article_executor
+
+def _extract_politely(url):
+    domain = urlparse(url).netloc
+    with _article_lock:
+        semaphore = _domain_semaphores.setdefault(domain, threading.BoundedSemaphore(ARTICLE_PER_DOMAIN_CONCURRENCY))
+    with semaphore:
+        return extract_article_content(url)
+
+def submit_article_extraction(url):
+    """Starts extract_article_content(url) in the background and returns a Future."""
+    return _get_article_executor().submit(_extract_politely, url)
+
+def _apply_article_data(result, article_data):
+    if article_data["success"]:
+        result["link_content"] = article_data["text"]
+
+        # Add additional content from LangChain if available
+        if "chunks" in article_data and article_data["chunks"]:
+            result["link_chunks"] = article_data["chunks"]
+        if "full_text" in article_data:
+            result["link_full_text"] = article_data["full_text"]
+
+        if article_data["authors"]:
+            result["link_authors"] = article_data["authors"]
+    else:
+        result["link_error"] = article_data["error"]
+
+def _report_x_throttle(response):
+    """X API signals throttling with 429 and an epoch x-rate-limit-reset header."""
+    if response.status_code != 429:
+        return
+    reset = response.headers.get("x-rate-limit-reset")
+    retry_after = max(0.0, float(reset) - time.time()) if reset and reset.isdigit() else None
+    get_rate_limiter().report_throttled("x_api", retry_after)
+
+X_USER_LOOKUP_BATCH = 100  # Max IDs per /2/users request
+X_SINCE_ID_MAX_AGE = timedelta(days=6, hours=12)  # Recent search rejects since_id older than 7 days
+
+def _tweet_checkpoint_name(query):
+    return f"x:{query}"
+
+# Pagination state of the last incremental search per query, consumed by
+# save_tweet_checkpoint(): the since_id/until_id window requested, how many
+# tweets were returned, the oldest of them and whether older pages were left.
+_tweet_searches = {}
+_tweet_searches_lock = threading.Lock()
+
+def save_tweet_checkpoint(query, tweets):
+    """Stores the newest tweet ID of a query as its `since_id` for the next run.
+    Call once the tweets have been processed so a failed run fetches them again.
+
+    When the search stopped on max_pages/max_results with older pages left, the
+    stored `since_id` stays where it was and `until_id` marks the oldest tweet
+    fetched; the next runs fetch that gap first and only then move `since_id`
+    up to the newest tweet seen (`newest_id`)."""
+    with _tweet_searches_lock:
+        search = _tweet_searches.pop(query, None) or {}
+    name = _tweet_checkpoint_name(query)
+    previous = get_checkpoint(name)
+    if search.get("until_id") and previous and previous.get("until_id"):
+        if len(tweets) < search["fetched"]:
+            return  # A claim in the gap failed; fetch the same window again
+        if search["more"] and search["oldest_id"]:
+            set_checkpoint(name, dict(previous, until_id=search["oldest_id"]))
+        else:
+            set_checkpoint(name, {"since_id": previous["newest_id"], "created_at": previous["newest_created_at"]})
+        return
+
+    newest = max((tweet for tweet in tweets if tweet.get("id")), key=lambda tweet: int(tweet["id"]), default=None)
+    if newest is None:
+        return
+    if search.get("more") and search.get("since_id") and previous:
+        print(f"Tweets for '{query}' older than {search['oldest_id']} were not fetched; they are fetched next run.")
+        set_checkpoint(name, {"since_id": previous["since_id"], "created_at": previous["created_at"],
+                              "until_id": search["oldest_id"], "newest_id": newest["id"],
+                              "newest_created_at": newest.get("created_at")})
+    elif previous is None or int(newest["id"]) > int(previous["since_id"]):
+        set_checkpoint(name, {"since_id": newest["id"], "created_at": newest.get("created_at")})
+
+def _usable_since_id(checkpoint):
+    if not checkpoint or not checkpoint.get("created_at"):
+        return None
+    created_at = datetime.fromisoformat(checkpoint["created_at"].replace("Z", "+00:00")).replace(tzinfo=None)
+    if datetime.utcnow() - created_at > X_SINCE_ID_MAX_AGE:
+        return None
+    return checkpoint["since_id"]
+
+def _lookup_x_usernames(user_ids, headers, users_url):
+    """Resolves author IDs to usernames, from the persistent cache where possible
+    and otherwise with /2/users requests of up to X_USER_LOOKUP_BATCH IDs."""
+    user_cache = get_x_user_cache()
+    user_dict = {}
+    missing_user_ids = []
+    for user_id in dict.fromkeys(user_ids):
+        username = user_cache.get(user_id) if user_cache else None
+        if username:
+            user_dict[user_id] = username
+        else:
+            missing_user_ids.append(user_id)
+
+    if missing_user_ids:
+        print(f"Fetching usernames for {len(missing_user_ids)} users")
+    for start in range(0, len(missing_user_ids), X_USER_LOOKUP_BATCH):
+        batch = missing_user_ids[start:start + X_USER_LOOKUP_BATCH]
+        get_rate_limiter().acquire("x_api")
+        user_response = transport.get(users_url, headers=headers, params={"ids": ",".join(batch)})
+        _report_x_throttle(user_response)
+        if user_response.status_code != 200:
+            print(f"WARNING: User lookup failed with status {user_response.status_code}")
+            continue
+        for user in user_response.json().get("data", []):
+            user_dict[user["id"]] = user.get("username", "unknown")
+            if user_cache and user.get("username"):
+                user_cache.set(user["id"], user["username"])
+    return user_dict
+
+def fetch_tweets_requests(query, max_results=1, bearer_token=str(os.getenv("TEST_BEARER_TOKEN")), incremental=False, max_pages=1):
+    """Fetches recent tweets matching the query using X API v2 and the Requests library.
+
+    Follows `next_token` for up to `max_pages` pages until `max_results` tweets are
+    collected. With `incremental`, only tweets newer than the query's stored
+    `since_id` (or the gap an earlier run left unread) are requested; see
+    save_tweet_checkpoint().
+    """
     print(f"Fetching up to {max_results} tweets via Requests for query: '{query}'")
     tweets_data = []
     search_url = "https://api.twitter.com/2/tweets/search/recent"
@@ -27,53 +172,79 @@ def fetch_tweets_requests(query, max_results=1, bearer_token=str(os.getenv("TEST
     }
 
     full_query = f"{query} -is:retweet -is:reply lang:sv"
-    actual_max_results = max(10, min(100, max_results))
     params = {
         'query': full_query,
-        'max_results': actual_max_results,
         'tweet.fields': 'created_at,author_id',
         'expansions': 'author_id' 
     }
+    checkpoint = get_checkpoint(_tweet_checkpoint_name(query)) if incremental else None
+    since_id = _usable_since_id(checkpoint)
+    until_id = checkpoint.get("until_id") if since_id else None
+    if until_id:
+        params['since_id'], params['until_id'] = since_id, until_id
+        print(f"Fetching tweets between {since_id} and {until_id} left over from an earlier run")
+    elif since_id:
+        params['since_id'] = since_id
+        print(f"Fetching tweets newer than {since_id}")
+    with _tweet_searches_lock:
+        _tweet_searches.pop(query, None)
 
     print(f"Requesting URL: {search_url} with query: '{full_query}'")
 
     try:
-        response = requests.get(search_url, headers=headers, params=params)
-        response.raise_for_status()
-        json_response = response.json()
-        
+        tweets = []
         # Create a dictionary mapping user IDs to usernames
         user_dict = {}
-        
-        # Extract user information from the includes section (if available)
-        if 'includes' in json_response and 'users' in json_response['includes']:
-            for user in json_response['includes']['users']:
-                user_dict[user['id']] = user.get('username', 'unknown')
-        
-        if 'data' in json_response and json_response['data']:
-            print(f"Found {len(json_response['data'])} tweets.")
-            
+        next_token = None
+        for page in range(max(1, max_pages)):
+            params['max_results'] = max(10, min(100, max_results - len(tweets)))
+            if next_token:
+                params['next_token'] = next_token
+            get_rate_limiter().acquire("x_api")
+            response = transport.get(search_url, headers=headers, params=params)
+            _report_x_throttle(response)
+            response.raise_for_status()
+            json_response = response.json()
+
+            # Extract user information from the includes section (if available)
+            if 'includes' in json_response and 'users' in json_response['includes']:
+                user_cache = get_x_user_cache()
+                for user in json_response['includes']['users']:
+                    user_dict[user['id']] = user.get('username', 'unknown')
+                    if user_cache and user.get('username'):
+                        user_cache.set(user['id'], user['username'])
+
+            if 'data' in json_response and json_response['data']:
+                tweets.extend(json_response['data'])
+            elif not ('meta' in json_response and json_response['meta'].get('result_count', 0) == 0):
+                print(f"WARNING: Unexpected response format: {json_response}")
+                if not tweets:
+                    return []
+                break
+
+            next_token = json_response.get('meta', {}).get('next_token')
+            if not next_token or len(tweets) >= max_results:
+                break
+
+        more = bool(next_token) or len(tweets) > max_results
+        tweets = tweets[:max_results]
+        if incremental:
+            with _tweet_searches_lock:
+                _tweet_searches[query] = {
+                    "since_id": since_id, "until_id": until_id, "fetched": len(tweets), "more": more,
+                    "oldest_id": min((tweet['id'] for tweet in tweets), key=int, default=None)
+                }
+        if tweets:
+            print(f"Found {len(tweets)} tweets in {page + 1} page(s).")
+
             # Get any missing user information
-            missing_user_ids = []
-            for tweet in json_response['data']:
-                author_id = tweet.get('author_id')
-                if author_id and author_id not in user_dict:
-                    missing_user_ids.append(author_id)
-            
-            # If we have any missing user IDs, fetch their info
+            missing_user_ids = [tweet['author_id'] for tweet in tweets
+                                if tweet.get('author_id') and tweet['author_id'] not in user_dict]
             if missing_user_ids:
-                print(f"Fetching usernames for {len(missing_user_ids)} users")
-                user_lookup_url = f"{users_url}?ids={','.join(missing_user_ids)}"
-                user_response = requests.get(user_lookup_url, headers=headers)
-                
-                if user_response.status_code == 200:
-                    user_data = user_response.json()
-                    if 'data' in user_data:
-                        for user in user_data['data']:
-                            user_dict[user['id']] = user.get('username', 'unknown')
+                user_dict.update(_lookup_x_usernames(missing_user_ids, headers, users_url))
             
             # Process tweets with user information
-            for tweet in json_response['data']:
+            for tweet in tweets:
                 author_id = tweet.get('author_id')
                 # Get username from our dictionary or use 'unknown'
                 author_username = user_dict.get(author_id, 'unknown')
@@ -88,11 +259,8 @@ def fetch_tweets_requests(query, max_results=1, bearer_token=str(os.getenv("TEST
                     "source_url": source_url,
                     "platform": "Twitter/X"
                 })
-        elif 'meta' in json_response and json_response['meta'].get('result_count', 0) == 0:
-            print("No tweets found matching the query.")
         else:
-            print(f"WARNING: Unexpected response format: {json_response}")
-            return []
+            print("No tweets found matching the query.")
     except requests.exceptions.HTTPError as http_err:
         print(f"ERROR: HTTP error occurred during tweet fetching: {http_err}")
         print(f"Response status code: {http_err.response.status_code}")
@@ -116,93 +284,129 @@ def fetch_tweets_requests(query, max_results=1, bearer_token=str(os.getenv("TEST
 
     return tweets_data
 
+ARTICLE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+def _build_article(title, full_text):
+    """Splits extracted text into the article dict used by the Reddit pipeline."""
+    if not full_text:
+        return {"success": False, "error": "No content extracted"}
+
+    # Only the chunks we return are ever split; the rest of the text is not touched
+    chunks = list(iter_chunks(full_text, max_chunks=ARTICLE_MAX_CHUNKS))
+
+    return {
+        "success": True,
+        "title": title or "Unknown Title",
+        "text": chunks[0] if chunks else "No content extracted",  # Summary text: first chunk
+        "authors": [],
+        "full_text": full_text,  # Already capped at ARTICLE_MAX_CHARS by the extractor
+        "chunks": chunks  # Up to ARTICLE_MAX_CHUNKS chunks for additional context
+    }
+
 def extract_article_content(url):
-    """Extract article content using LangChain's document loaders"""
+    """Extract article content with the streaming, byte-capped HTML extractor,
+    reusing the stored extraction for the canonical URL.
+
+    Fresh entries are returned without any request. Older entries are revalidated
+    with a conditional GET (ETag / Last-Modified) and reused on 304 Not Modified.
+    """
+    cache = get_article_cache()
+    cache_key = canonicalize_url(url)
+    cached = cache.get(cache_key) if cache else None
+    if cached and time.time() - cached['fetched_at'] < ARTICLE_CACHE_FRESH_SECONDS:
+        print(f"Article cache hit for {url}")
+        return cached['article']
+
+    headers = dict(ARTICLE_HEADERS)
+    if cached:
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
     try:
-        print(f"Extracting content from {url} using LangChain...")
-        
-        # Configure the WebBaseLoader with timeout and headers
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        loader = WebBaseLoader(
-            web_paths=[url],
-            header_template=headers,
-            requests_per_second=1,
-            timeout=15,
-            respect_robots_txt=True
-        )
-        
-        # Load and process the document
-        docs = loader.load()
-        
-        if not docs:
-            print(f"No content extracted from {url}")
-            return {"success": False, "error": "No content extracted"}
-            
-        # Get the title from the metadata if available
-        title = docs[0].metadata.get('title', 'Unknown Title')
-        
-        # Get the full text content
-        full_text = docs[0].page_content
-        
-        # Create a text splitter for better handling of large documents
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=2000,
-            chunk_overlap=100
-        )
-        
-        # Split the text into manageable chunks
-        chunks = text_splitter.split_text(full_text)
-        
-        # Create summary text (use first chunk for simplicity)
-        text_content = chunks[0] if chunks else "No content extracted"
-        
-        return {
-            "success": True,
-            "title": title,
-            "text": text_content,
-            "authors": [],
-            "full_text": full_text[:10000] if len(full_text) > 10000 else full_text,  # Include full text but limit size
-            "chunks": chunks[:3]  # Include up to 3 chunks for additional context
-        }
+        print(f"Extracting content from {url}...")
+        get_rate_limiter().acquire(f"article:{urlparse(url).netloc}")
+        response = transport.get(url, session_name="articles", headers=headers, timeout=(transport.HTTP_CONNECT_TIMEOUT, 15), stream=True)
+        if response.status_code == 304 and cached:
+            response.close()
+            print(f"Article not modified since last fetch; reusing stored extraction for {url}")
+            cached['fetched_at'] = time.time()
+            cache.set(cache_key, cached)
+            return cached['article']
+        if response.status_code >= 400:
+            response.close()
+        response.raise_for_status()
+        title, full_text, bytes_read = extract_text_streaming(response)
+        print(f"Extracted {len(full_text)} characters from {bytes_read} bytes of {url}")
+        article = _build_article(title, full_text)
     except Exception as e:
-        print(f"Failed to extract content from {url} with LangChain: {e}")
-        # Fall back to basic extraction if LangChain fails
-        try:
-            # Simple fallback using requests
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            
-            # Try to extract title from HTML
-            import re
-            title_match = re.search(r'<title>(.*?)</title>', response.text, re.IGNORECASE)
-            title = title_match.group(1) if title_match else "Unknown Title"
-            
-            # Get some text content (simplified)
-            # Remove HTML tags and get some content
-            text_content = re.sub(r'<[^>]+>', ' ', response.text)
-            text_content = re.sub(r'\s+', ' ', text_content).strip()
-            
-            # Take a reasonable portion
-            text_content = text_content[:2000] + "..." if len(text_content) > 2000 else text_content
-            
-            return {
-                "success": True,
-                "title": title,
-                "text": text_content,
-                "authors": []
-            }
-        except Exception as fallback_error:
-            print(f"Fallback extraction also failed: {fallback_error}")
-            return {"success": False, "error": str(e)}
+        print(f"Failed to extract content from {url}: {e}")
+        return {"success": False, "error": str(e)}
+
+    if cache is not None and article["success"]:
+        cache.set(cache_key, {
+            'article': article,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'fetched_at': time.time()
+        })
+    return article
+
 
+REDDIT_PAGE_LIMIT = 100  # Reddit never returns more than 100 items per listing page
 
-def fetch_reddit_claims_for_llm(max_results=10, client_id=None, client_secret=None, subreddit="svenskpolitik", extract_links=True, max_days=7):
-    """Fetches recent Reddit posts from specified subreddit and formats them for LLM evaluation."""
+def _reddit_checkpoint_name(subreddit):
+    # "svenskpolitik+Sverige+sweden" and "sweden+svenskpolitik+sverige" are the same listing
+    return "reddit:" + "+".join(sorted(name.lower() for name in subreddit.split("+")))
+
+def _fetch_reddit_delta(reddit, subreddit, checkpoint, limit):
+    """Returns submissions newer than the checkpoint, oldest first, using one
+    listing page anchored with `before`."""
+    get_rate_limiter().acquire("reddit")
+    submissions = list(reddit.get(f"/r/{subreddit}/new", params={"before": checkpoint["fullname"], "limit": limit}))
+    if not submissions and _reddit_anchor_gone(reddit, checkpoint["fullname"]):
+        # `before` silently returns nothing when the anchor post left the
+        # listing, so fall back to the plain listing and the stored timestamp.
+        get_rate_limiter().acquire("reddit")
+        submissions = [submission for submission in reddit.subreddit(subreddit).new(limit=limit)
+                       if submission.created_utc > checkpoint["created_utc"]]
+    return sorted(submissions, key=lambda submission: submission.created_utc)
+
+def _reddit_anchor_gone(reddit, fullname):
+    """True when the checkpoint post was removed or deleted, checked with one
+    lightweight /api/info lookup instead of a second listing page."""
+    get_rate_limiter().acquire("reddit")
+    anchor = next(iter(reddit.info(fullnames=[fullname])), None)
+    return anchor is None or getattr(anchor, "removed_by_category", None) is not None
+
+def reddit_checkpoint_from_posts(posts):
+    """Returns the high-water mark (newest fullname and timestamp) of fetched posts."""
+    newest = max((post for post in posts if post.get("fullname")), key=lambda post: post["created_utc"], default=None)
+    if newest is None:
+        return None
+    return {"fullname": newest["fullname"], "created_utc": newest["created_utc"]}
+
+def save_reddit_checkpoint(subreddit, posts):
+    """Advances the stored high-water mark of a listing. Call once the posts
+    have been processed so a failed run fetches them again."""
+    checkpoint = reddit_checkpoint_from_posts(posts)
+    if checkpoint is None:
+        return
+    name = _reddit_checkpoint_name(subreddit)
+    previous = get_checkpoint(name)
+    if previous is None or checkpoint["created_utc"] >= previous["created_utc"]:
+        set_checkpoint(name, checkpoint)
+
+def fetch_reddit_claims_for_llm(max_results=10, client_id=None, client_secret=None, subreddit="svenskpolitik", extract_links=True, max_days=7, incremental=False):
+    """Fetches recent Reddit posts from specified subreddit and formats them for LLM evaluation.
+
+    `subreddit` may combine several subreddits ("svenskpolitik+Sverige+sweden") into
+    one listing. With `incremental`, only posts newer than the listing's stored
+    checkpoint are fetched; see save_reddit_checkpoint().
+    """
     import praw
     from urllib.parse import urlparse
     print(f"Fetching up to {max_results} Reddit posts from the last {max_days} days in r/{subreddit}")
@@ -217,14 +421,23 @@ def fetch_reddit_claims_for_llm(max_results=10, client_id=None, client_secret=No
         return []
 
     reddit_results = []
+    pending_articles = []  # (result, future) pairs extracted while the listing is read
+    deadline = time.monotonic() + ARTICLE_DEADLINE_SECONDS
     # Calculate cutoff timestamp for posts
     cutoff_time = datetime.utcnow() - timedelta(days=max_days)
 
     try:
         reddit = praw.Reddit(client_id=client_id, client_secret=client_secret, user_agent=user_agent)
         
-        # Fetch new posts
-        search_results = reddit.subreddit(subreddit).new(limit=max_results * 2)  # Fetch more to account for filtering
+        checkpoint = get_checkpoint(_reddit_checkpoint_name(subreddit)) if incremental else None
+        limit = min(max_results * 2, REDDIT_PAGE_LIMIT)  # Fetch more to account for filtering
+        if checkpoint:
+            print(f"Fetching r/{subreddit} posts newer than {checkpoint['fullname']}")
+            search_results = _fetch_reddit_delta(reddit, subreddit, checkpoint, limit)
+        else:
+            # Fetch new posts
+            get_rate_limiter().acquire("reddit")
+            search_results = reddit.subreddit(subreddit).new(limit=limit)
         
         count = 0
         for submission in search_results:
@@ -241,11 +454,14 @@ def fetch_reddit_claims_for_llm(max_results=10, client_id=None, client_secret=No
                 "snippet": submission.selftext[:300] + "..." if submission.selftext else "(No content)",
                 "created_at": created_time.isoformat(),
                 "author": str(submission.author),
-                "score": submission.score
+                "score": submission.score,
+                "fullname": submission.fullname,
+                "created_utc": submission.created_utc,
+                "subreddit": submission.subreddit.display_name
             }
             
             # Check if the submission has a link (URL posts)
-            if hasattr(submission, 'url') and submission.url and not submission.url.startswith(f"https://www.reddit.com/r/{subreddit}"):
+            if hasattr(submission, 'url') and submission.url and not submission.url.startswith(f"https://www.reddit.com/r/{result['subreddit']}"):
                 domain = urlparse(submission.url).netloc
                 print(f"Found link in post: {submission.url} (domain: {domain})")
                 
@@ -259,21 +475,7 @@ def fetch_reddit_claims_for_llm(max_results=10, client_id=None, client_secret=No
                 # Only extract content if explicitly requested
                 if extract_links:
                     print(f"Content extraction is enabled. Extracting from: {submission.url}")
-                    article_data = extract_article_content(submission.url)
-                    
-                    if article_data["success"]:
-                        result["link_content"] = article_data["text"]
-                        
-                        # Add additional content from LangChain if available
-                        if "chunks" in article_data and article_data["chunks"]:
-                            result["link_chunks"] = article_data["chunks"]
-                        if "full_text" in article_data:
-                            result["link_full_text"] = article_data["full_text"]
-                            
-                        if article_data["authors"]:
-                            result["link_authors"] = article_data["authors"]
-                    else:
-                        result["link_error"] = article_data["error"]
+                    pending_articles.append((result, submit_article_extraction(submission.url)))
                 else:
                     print(f"Content extraction is disabled. Using post title for link: {submission.title}")
                 
@@ -284,6 +486,17 @@ def fetch_reddit_claims_for_llm(max_results=10, client_id=None, client_secret=No
             if count >= max_results:
                 break
 
+        if pending_articles:
+            print(f"Waiting for {len(pending_articles)} article extractions...")
+            wait([future for _, future in pending_articles], timeout=max(0.0, deadline - time.monotonic()))
+            for result, future in pending_articles:
+                if future.done() and not future.exception():
+                    _apply_article_data(result, future.result())
+                else:
+                    future.cancel()
+                    error = future.exception() if future.done() else None
+                    result["link_error"] = str(error) if error else f"Extraction exceeded the {ARTICLE_DEADLINE_SECONDS:.0f}s deadline"
+
         print(f"Found {len(reddit_results)} recent Reddit posts from the last {max_days} days.")
 
     except Exception as e:
@@ -0,0 +1,108 @@
+import codecs
+import os
+import re
+from html.parser import HTMLParser
+from chunking import DEFAULT_CHUNKER
+
+# Hard limits per article: never download more than ARTICLE_MAX_BYTES of HTML and
+# stop parsing once ARTICLE_MAX_CHARS of body text has been collected. Only the
+# first ARTICLE_MAX_CHUNKS chunks are used, so by default the text stops where
+# the last of them would end.
+ARTICLE_MAX_BYTES = int(os.getenv("ARTICLE_MAX_BYTES", str(1536 * 1024)))
+ARTICLE_MAX_CHUNKS = int(os.getenv("ARTICLE_MAX_CHUNKS", "3"))
+ARTICLE_MAX_CHARS = int(os.getenv("ARTICLE_MAX_CHARS", str(DEFAULT_CHUNKER.chunk_size * ARTICLE_MAX_CHUNKS)))
+STREAM_CHUNK_BYTES = 16 * 1024
+
+# Content inside these elements is never article text.
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "nav", "header", "footer", "aside", "form", "button", "select"}
+# Elements that end a line, so sentences from separate blocks are not glued together.
+BLOCK_TAGS = {"p", "div", "br", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6", "article", "section",
+              "blockquote", "pre", "tr", "table", "figcaption", "main"}
+
+_WHITESPACE = re.compile(r"[ \t\r\f\v]+")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+class ArticleTextParser(HTMLParser):
+    """Incremental HTML-to-text parser that keeps the <title> and visible body
+    text, skips boilerplate elements and reports when it has collected enough."""
+
+    def __init__(self, max_chars=ARTICLE_MAX_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.title = None
+        self._title_parts = None
+        self._skip_depth = 0
+        self._parts = []
+        self._length = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "title" and self.title is None:
+            self._title_parts = []
+        elif tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag == "title" and self._title_parts is not None:
+            self.title = " ".join("".join(self._title_parts).split()) or None
+            self._title_parts = None
+        elif tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in BLOCK_TAGS:
+            self._parts.append("\n")
+
+    def handle_data(self, data):
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+        elif not self._skip_depth and data.strip():
+            self._parts.append(data)
+            self._length += len(data)
+
+    @property
+    def done(self):
+        return self._length >= self.max_chars and self._title_parts is None
+
+    def text(self):
+        text = _WHITESPACE.sub(" ", "".join(self._parts))
+        text = _BLANK_LINES.sub("\n\n", "\n".join(line.strip() for line in text.split("\n")))
+        return text.strip()[:self.max_chars]
+
+
+def _response_encoding(response):
+    # requests falls back to ISO-8859-1 for text/html without a charset, which
+    # garbles Swedish pages; assume UTF-8 unless the server says otherwise.
+    content_type = response.headers.get("Content-Type", "")
+    if "charset=" in content_type.lower() and response.encoding:
+        return response.encoding
+    return "utf-8"
+
+
+def extract_text_streaming(response, max_bytes=ARTICLE_MAX_BYTES, max_chars=ARTICLE_MAX_CHARS):
+    """Parses a streamed (stream=True) response incrementally.
+
+    Stops reading as soon as the title and `max_chars` of body text are collected,
+    or after `max_bytes` of HTML, so memory and CPU stay bounded however large the
+    page is. Returns (title, text, bytes_read).
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(_response_encoding(response))(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    parser = ArticleTextParser(max_chars=max_chars)
+    bytes_read = 0
+    try:
+        for chunk in response.iter_content(chunk_size=STREAM_CHUNK_BYTES):
+            if not chunk:
+                continue
+            chunk = chunk[:max_bytes - bytes_read]
+            bytes_read += len(chunk)
+            parser.feed(decoder.decode(chunk))
+            if parser.done or bytes_read >= max_bytes:
+                break
+        else:
+            parser.feed(decoder.decode(b"", final=True))
+    finally:
+        response.close()
+    return parser.title, parser.text(), bytes_read
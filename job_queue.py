@@ -0,0 +1,223 @@
+import json
+import os
+from psycopg2.extras import execute_values, Json
+from datetime import datetime
+
+# Durable claim queue in the shared Postgres database. Producers enqueue claim
+# jobs after fetching and pre-flight dedup; verifier workers on any node lease
+# them with SELECT ... FOR UPDATE SKIP LOCKED, so two workers never hold the same
+# job. A job whose lease runs out (its worker crashed or hung) becomes claimable
+# again; one that keeps failing is dead-lettered with its last error.
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", "600"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+JOB_RETRY_DELAY = float(os.getenv("JOB_RETRY_DELAY", "60"))  # Seconds before the first retry, doubled per attempt
+JOB_RETRY_DELAY_MAX = float(os.getenv("JOB_RETRY_DELAY_MAX", "3600"))
+
+# Job fields a worker needs; the rest of a job dict is rebuilt by the pipeline
+_PAYLOAD_FIELDS = ('label', 'claim_text', 'claim_hash', 'search_query', 'exclude_url',
+                   'source_data', 'claim_data', 'search_api_used')
+# Datetime values inside source_data / claim_data, stored as ISO strings
+_DATETIME_FIELDS = {'source_data': ('post_timestamp', 'fetch_timestamp'), 'claim_data': ('date_extracted',)}
+
+
+def ensure_job_table(conn):
+    """Creates the ClaimJobs table and its claim index if they do not exist yet."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS ClaimJobs (
+                job_id BIGSERIAL PRIMARY KEY,
+                source_url TEXT NOT NULL,
+                claim_hash TEXT NOT NULL,
+                payload JSONB NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                available_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                leased_by TEXT,
+                lease_expires_at TIMESTAMPTZ,
+                last_error TEXT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                UNIQUE (source_url, claim_hash)
+            )
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS claimjobs_claimable_idx
+            ON ClaimJobs (available_at, job_id) WHERE status IN ('pending', 'leased')
+        """)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def _dumps(payload):
+    return json.dumps(payload, default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+
+
+def _encode_payload(job):
+    return Json({field: job.get(field) for field in _PAYLOAD_FIELDS}, dumps=_dumps)
+
+
+def _decode_payload(payload):
+    job = dict(payload)
+    for section, fields in _DATETIME_FIELDS.items():
+        job[section] = dict(job.get(section) or {})
+        for field in fields:
+            if job[section].get(field):
+                job[section][field] = datetime.fromisoformat(job[section][field])
+    return job
+
+
+def enqueue_jobs(conn, jobs, max_attempts=JOB_MAX_ATTEMPTS):
+    """Adds claim jobs to the queue in one statement. A (source_url, claim_hash)
+    pair that is already queued, done or dead-lettered is not added again.
+    Returns the number of jobs inserted."""
+    if not jobs:
+        return 0
+    cursor = conn.cursor()
+    try:
+        rows = {(job['source_data']['source_url'], job['claim_hash']): job for job in jobs}
+        inserted = execute_values(cursor, """
+            INSERT INTO ClaimJobs (source_url, claim_hash, payload, max_attempts)
+            VALUES %s ON CONFLICT (source_url, claim_hash) DO NOTHING RETURNING job_id
+        """, [(source_url, claim_hash, _encode_payload(job), max_attempts)
+              for (source_url, claim_hash), job in rows.items()], fetch=True)
+        conn.commit()
+        return len(inserted)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def claim_jobs(conn, worker_id, limit, lease_seconds=JOB_LEASE_SECONDS):
+    """Leases up to `limit` due jobs to `worker_id` and returns them as job dicts
+    carrying 'queue_job_id' and 'queue_attempt'. Pending jobs and jobs whose lease
+    expired are claimable; rows locked by another worker's claim are skipped.
+    Expired leases that already used their last attempt are dead-lettered."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            UPDATE ClaimJobs
+            SET status = 'dead', leased_by = NULL, lease_expires_at = NULL, updated_at = now(),
+                last_error = COALESCE(last_error || '; ', '') || 'lease expired on final attempt'
+            WHERE status = 'leased' AND lease_expires_at < now() AND attempts >= max_attempts
+        """)
+        cursor.execute("""
+            WITH due AS (
+                SELECT job_id FROM ClaimJobs
+                WHERE (status = 'pending' AND available_at <= now())
+                   OR (status = 'leased' AND lease_expires_at < now())
+                ORDER BY available_at, job_id
+                LIMIT %s
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE ClaimJobs j
+            SET status = 'leased', leased_by = %s, attempts = j.attempts + 1,
+                lease_expires_at = now() + make_interval(secs => %s), updated_at = now()
+            FROM due WHERE j.job_id = due.job_id
+            RETURNING j.job_id, j.attempts, j.payload
+        """, (limit, worker_id, lease_seconds))
+        rows = cursor.fetchall()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    jobs = []
+    for job_id, attempts, payload in rows:
+        job = _decode_payload(payload)
+        job['queue_job_id'] = job_id
+        job['queue_attempt'] = attempts
+        jobs.append(job)
+    return jobs
+
+
+def renew_leases(conn, job_ids, worker_id, lease_seconds=JOB_LEASE_SECONDS):
+    """Extends the leases `worker_id` still holds; returns the ids it lost."""
+    if not job_ids:
+        return set()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            UPDATE ClaimJobs SET lease_expires_at = now() + make_interval(secs => %s), updated_at = now()
+            WHERE job_id = ANY(%s) AND status = 'leased' AND leased_by = %s
+            RETURNING job_id
+        """, (lease_seconds, list(job_ids), worker_id))
+        renewed = {job_id for (job_id,) in cursor.fetchall()}
+        conn.commit()
+        return set(job_ids) - renewed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def complete_jobs(conn, job_ids, worker_id):
+    """Marks jobs done. Only leases still held by `worker_id` are completed, so a
+    worker whose lease expired cannot overwrite the job's new owner."""
+    if not job_ids:
+        return 0
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            UPDATE ClaimJobs
+            SET status = 'done', leased_by = NULL, lease_expires_at = NULL, last_error = NULL, updated_at = now()
+            WHERE job_id = ANY(%s) AND status = 'leased' AND leased_by = %s
+        """, (list(job_ids), worker_id))
+        completed = cursor.rowcount
+        conn.commit()
+        return completed
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def fail_jobs(conn, failures, worker_id, retry_delay=JOB_RETRY_DELAY, max_delay=JOB_RETRY_DELAY_MAX):
+    """Returns failed jobs to the queue with exponential backoff, or dead-letters
+    the ones that used their last attempt. `failures` maps job_id -> error text.
+    Returns the number of jobs dead-lettered."""
+    if not failures:
+        return 0
+    cursor = conn.cursor()
+    try:
+        job_ids = list(failures)
+        cursor.execute("""
+            UPDATE ClaimJobs j
+            SET status = CASE WHEN j.attempts >= j.max_attempts THEN 'dead' ELSE 'pending' END,
+                available_at = now() + make_interval(secs => LEAST(%s * power(2, j.attempts - 1), %s)),
+                leased_by = NULL, lease_expires_at = NULL, last_error = f.error, updated_at = now()
+            FROM unnest(%s::bigint[], %s::text[]) AS f (job_id, error)
+            WHERE j.job_id = f.job_id AND j.status = 'leased' AND j.leased_by = %s
+            RETURNING j.status
+        """, (float(retry_delay), float(max_delay), job_ids,
+              [str(failures[job_id])[:2000] for job_id in job_ids], worker_id))
+        dead = sum(1 for (status,) in cursor.fetchall() if status == 'dead')
+        conn.commit()
+        return dead
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def job_queue_counts(conn):
+    """Returns {status: number of jobs}."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT status, count(*) FROM ClaimJobs GROUP BY status")
+        counts = dict(cursor.fetchall())
+        conn.commit()
+        return counts
+    finally:
+        cursor.close()
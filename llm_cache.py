@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from cache import DiskCache, CACHE_DIR
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_cache.sqlite3"))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "50000"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(30 * 24 * 3600)))
+LLM_CACHE_DISABLED = os.getenv("LLM_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+
+def llm_cache_key(model_name, prompt_version, claim_text, search_results):
+    """Content address of an evaluation: identical model, prompt version, claim
+    and evidence snippets always produce the same key."""
+    evidence = [
+        [result.get('url'), result.get('title'), result.get('snippet')]
+        for result in search_results or []
+    ]
+    key_material = json.dumps([model_name, prompt_version, claim_text, evidence], ensure_ascii=False)
+    return hashlib.sha256(key_material.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Two-tier cache for LLM evaluations: an in-memory LRU in front of a
+    persistent DiskCache. Entries hold the raw model output and parsed fields."""
+
+    def __init__(self, path=LLM_CACHE_PATH, memory_entries=LLM_CACHE_MEMORY_ENTRIES,
+                 max_entries=LLM_CACHE_MAX_ENTRIES, ttl=LLM_CACHE_TTL, disabled=LLM_CACHE_DISABLED):
+        self.disabled = disabled
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk = None if disabled else DiskCache(path, table="llm_responses", max_entries=max_entries, default_ttl=ttl)
+
+    def get(self, key):
+        if self.disabled:
+            return None
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+        entry = self.disk.get(key)
+        if entry is not None:
+            self._remember(key, entry)
+        return entry
+
+    def set(self, key, entry):
+        if self.disabled:
+            return
+        self._remember(key, entry)
+        self.disk.set(key, entry)
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def stats(self):
+        if self.disabled:
+            return {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        disk_stats = self.disk.stats()
+        return {"memory_hits": self.memory_hits, "disk_hits": disk_stats["hits"],
+                "misses": disk_stats["misses"], "entries": disk_stats["entries"]}
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Returns the process-wide LLM response cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMResponseCache()
+    return _cache
+
+
+def print_llm_cache_stats():
+    stats = get_llm_cache().stats()
+    print(f"LLM cache: memory_hits={stats['memory_hits']} disk_hits={stats['disk_hits']} misses={stats['misses']}")
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from cache import CACHE_DIR
+
+# MinHash/LSH index of claims that already have an evaluation, so a reworded
+# cross-post, tweet or article chunk of the same news item reuses that verdict
+# instead of paying for its own search and Gemini call.
+NEAR_DUP_INDEX_PATH = os.getenv("NEAR_DUP_INDEX_PATH", os.path.join(CACHE_DIR, "near_duplicates.sqlite3"))
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))  # Estimated Jaccard similarity needed to reuse
+NEAR_DUP_MAX_AGE = int(os.getenv("NEAR_DUP_MAX_AGE", str(30 * 24 * 3600)))  # Verdicts on older news are not reused
+NEAR_DUP_MIN_CHARS = int(os.getenv("NEAR_DUP_MIN_CHARS", "40"))  # Shorter texts share too few shingles to compare
+NEAR_DUP_DISABLED = os.getenv("NEAR_DUP_DISABLED", "").lower() in ("1", "true", "yes")
+
+SHINGLE_SIZE = 5  # Characters per shingle
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16  # 16 bands of 4 rows: ~0.5 similarity is where claims start becoming candidates
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)  # Fixed seed: signatures are persisted and must stay comparable across runs
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME)) for _ in range(NUM_PERMUTATIONS)]
+_ROWS_PER_BAND = NUM_PERMUTATIONS // LSH_BANDS
+
+_URL = re.compile(r"https?://\S+")
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_claim_text(text):
+    """Lowercases and strips URLs, hashtag/mention markers and punctuation."""
+    text = _URL.sub(" ", text.lower())
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def minhash_signature(text):
+    """Returns the MinHash signature of the normalized text's character shingles,
+    or None when the text is too short for a meaningful comparison."""
+    normalized = normalize_claim_text(text)
+    if len(normalized) < NEAR_DUP_MIN_CHARS:
+        return None
+    hashes = {
+        int.from_bytes(hashlib.blake2b(normalized[i:i + SHINGLE_SIZE].encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(len(normalized) - SHINGLE_SIZE + 1)
+    }
+    return tuple(min((a * value + b) % _MERSENNE_PRIME for value in hashes) for a, b in _PERMUTATIONS)
+
+
+def estimate_similarity(signature, other):
+    return sum(1 for x, y in zip(signature, other) if x == y) / NUM_PERMUTATIONS
+
+
+def _band_keys(signature):
+    return [(band, hash(signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND])) for band in range(LSH_BANDS)]
+
+
+class NearDuplicateIndex:
+    """LSH index over the MinHash signatures of evaluated claims.
+
+    Stored entries (claim signature plus the evaluation and evidence to reuse)
+    live in SQLite and their signatures are loaded into memory at startup.
+    During a run, each new claim is registered as pending; near-duplicates that
+    arrive before it is evaluated are parked as its followers and resolved when
+    it completes. Every decision is written to the `decisions` table for audit.
+    """
+
+    def __init__(self, path, model, threshold=NEAR_DUP_THRESHOLD, max_age=NEAR_DUP_MAX_AGE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.model = model
+        self.threshold = threshold
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._signatures = {}  # claim_hash -> signature, stored and pending
+        self._buckets = {}     # band key -> set of claim_hash
+        self._pending = {}     # claim_hash -> follower jobs, for claims evaluated this run
+        self._orphans = []     # followers whose representative produced no reusable result
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                claim_hash TEXT NOT NULL,
+                model TEXT NOT NULL,
+                source_url TEXT,
+                signature TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (claim_hash, model)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS decisions (
+                decided_at REAL NOT NULL,
+                claim_hash TEXT NOT NULL,
+                source_url TEXT,
+                decision TEXT NOT NULL,
+                matched_claim_hash TEXT,
+                similarity REAL,
+                threshold REAL NOT NULL,
+                model TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS decisions_claim_hash ON decisions(claim_hash)")
+        self._load()
+
+    def _load(self):
+        cutoff = time.time() - self.max_age
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE created_at < ?", (cutoff,))
+            self._conn.execute("DELETE FROM decisions WHERE decided_at < ?", (cutoff,))
+            self._conn.commit()
+            rows = self._conn.execute("SELECT claim_hash, signature FROM entries WHERE model = ?", (self.model,)).fetchall()
+            for claim_hash, signature in rows:
+                self._insert(claim_hash, tuple(json.loads(signature)))
+        print(f"Near-duplicate index loaded with {len(rows)} evaluated claims.")
+
+    def _insert(self, claim_hash, signature):
+        self._signatures[claim_hash] = signature
+        for key in _band_keys(signature):
+            self._buckets.setdefault(key, set()).add(claim_hash)
+
+    def _remove(self, claim_hash):
+        signature = self._signatures.pop(claim_hash, None)
+        if signature is not None:
+            for key in _band_keys(signature):
+                self._buckets.get(key, set()).discard(claim_hash)
+
+    def _best_match(self, signature):
+        candidates = set()
+        for key in _band_keys(signature):
+            candidates |= self._buckets.get(key, set())
+        best_hash, best_similarity = None, 0.0
+        for candidate in candidates:
+            similarity = estimate_similarity(signature, self._signatures[candidate])
+            if similarity > best_similarity:
+                best_hash, best_similarity = candidate, similarity
+        return best_hash, best_similarity
+
+    def _record(self, claim_hash, source_url, decision, matched_hash, similarity):
+        self._conn.execute(
+            "INSERT INTO decisions (decided_at, claim_hash, source_url, decision, matched_claim_hash, similarity, threshold, model) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (time.time(), claim_hash, source_url, decision, matched_hash, similarity, self.threshold, self.model)
+        )
+        self._conn.commit()
+
+    def assign(self, job, signature):
+        """Matches a claim against stored and pending claims.
+
+        Returns (decision, matched_claim_hash, similarity, result):
+        "reused" with the stored result to reuse, "grouped" when the job was parked
+        behind a pending near-duplicate, or "new" when the job must be evaluated
+        (it is then pending itself until complete() or release())."""
+        claim_hash, source_url = job['claim_hash'], job['source_data']['source_url']
+        with self._lock:
+            matched_hash, similarity = self._best_match(signature)
+            if matched_hash is not None and similarity >= self.threshold:
+                if matched_hash in self._pending:
+                    self._pending[matched_hash].append(job)
+                    self._record(claim_hash, source_url, "grouped", matched_hash, similarity)
+                    return "grouped", matched_hash, similarity, None
+                row = self._conn.execute("SELECT result FROM entries WHERE claim_hash = ? AND model = ?",
+                                         (matched_hash, self.model)).fetchone()
+                if row is not None:
+                    self._record(claim_hash, source_url, "reused", matched_hash, similarity)
+                    return "reused", matched_hash, similarity, json.loads(row[0])
+            if claim_hash not in self._pending:
+                self._pending[claim_hash] = []
+                self._insert(claim_hash, signature)
+            self._record(claim_hash, source_url, "new", matched_hash, similarity or None)
+            return "new", matched_hash, similarity, None
+
+    def complete(self, job, signature, result):
+        """Stores the evaluated claim for future runs and returns the followers
+        that can now reuse its result."""
+        with self._lock:
+            followers = self._pending.pop(job['claim_hash'], [])
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (claim_hash, model, source_url, signature, result, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job['claim_hash'], self.model, job['source_data']['source_url'], json.dumps(signature),
+                 json.dumps(result, default=str), time.time())
+            )
+            self._conn.commit()
+        return followers
+
+    def release(self, job):
+        """Drops a pending claim that produced no reusable result; its followers
+        become orphans that must be evaluated on their own."""
+        with self._lock:
+            self._orphans.extend(self._pending.pop(job['claim_hash'], []))
+            self._remove(job['claim_hash'])
+
+    def drain_orphans(self):
+        """Returns followers left without a result (including those whose
+        representative never reached storage) and clears all pending claims."""
+        with self._lock:
+            orphans = self._orphans
+            for claim_hash, followers in self._pending.items():
+                orphans.extend(followers)
+                self._remove(claim_hash)
+            self._pending, self._orphans = {}, []
+        return orphans
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index(model, threshold=NEAR_DUP_THRESHOLD):
+    """Returns the process-wide index for `model` (None when disabled)."""
+    global _index
+    if NEAR_DUP_DISABLED:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = NearDuplicateIndex(NEAR_DUP_INDEX_PATH, model, threshold=threshold)
+    return _index
@@ -1,8 +1,16 @@
 from datetime import datetime, timezone, timedelta
 import requests
 import json
+from search_cache import cached_search
+from ratelimit import get_rate_limiter
+import transport
 
 def search_newsapi(query, max_results=5, language='sv', NEWSAPI_KEY=str):
+    """NewsAPI search with results served from the local search cache when fresh."""
+    return cached_search("newsapi", query, max_results, None, language,
+                         lambda: _search_newsapi(query, max_results, language, NEWSAPI_KEY))
+
+def _search_newsapi(query, max_results=5, language='sv', NEWSAPI_KEY=str):
     """Searches for news articles using the NewsAPI /v2/everything endpoint."""
     print(f"Searching NewsAPI for: '{query}' (Lang: {language})")
     articles_data = []
@@ -32,8 +40,12 @@ def search_newsapi(query, max_results=5, language='sv', NEWSAPI_KEY=str):
 
     try:
         # --- Make the GET Request ---
-        response = requests.get(base_url, params=params)
+        get_rate_limiter().acquire("newsapi")
+        response = transport.get(base_url, params=params)
+        if response.status_code == 429:
+            get_rate_limiter().report_throttled("newsapi", response.headers.get("Retry-After"))
         response.raise_for_status() # Check for HTTP errors
+        get_rate_limiter().report_success("newsapi")
 
         # --- Parse JSON Response ---
         json_response = response.json()
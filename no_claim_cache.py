@@ -0,0 +1,53 @@
+import os
+import threading
+import time
+from cache import DiskCache, CACHE_DIR
+
+# Verdicts of "no verifiable claim" are never written to Postgres, so without
+# this record the same opinion post would be searched and evaluated again on
+# every run while it stays inside the fetch window. Entries are keyed by model
+# and claim hash; "Cannot Verify" verdicts expire sooner because evidence for
+# a real claim may still appear.
+NO_CLAIM_CACHE_PATH = os.getenv("NO_CLAIM_CACHE_PATH", os.path.join(CACHE_DIR, "no_claims.sqlite3"))
+NO_CLAIM_CACHE_MAX_ENTRIES = int(os.getenv("NO_CLAIM_CACHE_MAX_ENTRIES", "100000"))
+NO_CLAIM_CACHE_TTL = int(os.getenv("NO_CLAIM_CACHE_TTL", str(14 * 24 * 3600)))
+NO_CLAIM_CACHE_UNVERIFIABLE_TTL = int(os.getenv("NO_CLAIM_CACHE_UNVERIFIABLE_TTL", str(24 * 3600)))
+NO_CLAIM_CACHE_DISABLED = os.getenv("NO_CLAIM_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_no_claim_cache():
+    """Returns the process-wide no-claim verdict store (None when disabled)."""
+    global _cache
+    if NO_CLAIM_CACHE_DISABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(NO_CLAIM_CACHE_PATH, table="no_claims", max_entries=NO_CLAIM_CACHE_MAX_ENTRIES,
+                               default_ttl=NO_CLAIM_CACHE_TTL)
+    return _cache
+
+
+def no_claim_key(model_name, claim_hash):
+    return f"{model_name}:{claim_hash}"
+
+
+def find_no_claim_verdict(model_name, claim_hash):
+    """Returns the recorded no-claim verdict for the claim, or None."""
+    cache = get_no_claim_cache()
+    return cache.get(no_claim_key(model_name, claim_hash)) if cache else None
+
+
+def record_no_claim_verdict(model_name, claim_hash, evaluation_data, source_url=None):
+    cache = get_no_claim_cache()
+    if cache is None:
+        return
+    rating = evaluation_data['truthfulness_rating']
+    cache.set(no_claim_key(model_name, claim_hash), {
+        'rating': rating,
+        'reasoning': evaluation_data.get('llm_reasoning'),
+        'source_url': source_url,
+        'recorded_at': time.time()
+    }, ttl=NO_CLAIM_CACHE_UNVERIFIABLE_TTL if rating == "Cannot Verify" else None)
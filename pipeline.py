@@ -0,0 +1,188 @@
+import queue
+import threading
+import time
+import traceback
+
+_STOP = object()
+
+
+class Stage:
+    """A single pipeline step executed by a fixed number of worker threads.
+
+    `func` receives one item and returns the item to hand to the next stage,
+    or None to drop it. With `fan_out=True` the function returns an iterable
+    and every element is forwarded separately (e.g. one fetch task -> many claims).
+    With `batch_size > 1` the function receives a list of up to `batch_size` items,
+    collected for at most `batch_timeout` seconds, and returns a list of outputs.
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=10, fan_out=False, batch_size=1, batch_timeout=0.5):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self.fan_out = fan_out
+        self.batch_size = max(1, int(batch_size))
+        self.batch_timeout = batch_timeout
+        self.stats = {"processed": 0, "emitted": 0, "dropped": 0, "failed": 0, "busy_seconds": 0.0}
+        self._lock = threading.Lock()
+        self._active = 0
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self.stats[key] += amount
+
+
+class Pipeline:
+    """Runs items through a chain of stages connected by bounded queues.
+
+    Each stage has its own input queue (bounded by `queue_size`) and worker pool,
+    so a slow stage applies back-pressure upstream instead of buffering the whole run.
+    Items whose stage raised are dropped and kept in `failures` as (stage name, item).
+    """
+
+    def __init__(self, stages):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage.")
+        self.stages = stages
+        self.results = []
+        self.failures = []
+        self._results_lock = threading.Lock()
+
+    def run(self, items):
+        """Feeds `items` into the first stage and blocks until every stage has drained.
+        Returns the items emitted by the last stage."""
+        queues = [queue.Queue(maxsize=stage.queue_size) for stage in self.stages]
+        threads = []
+        started = time.monotonic()
+
+        for index, stage in enumerate(self.stages):
+            stage._active = stage.workers
+            for worker_number in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker,
+                    args=(index, queues),
+                    name=f"{stage.name}-{worker_number + 1}",
+                    daemon=True
+                )
+                thread.start()
+                threads.append(thread)
+
+        for item in items:
+            queues[0].put(item)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_STOP)
+
+        for thread in threads:
+            thread.join()
+
+        self.elapsed = time.monotonic() - started
+        return self.results
+
+    def _emit(self, index, queues, item):
+        if index + 1 < len(self.stages):
+            queues[index + 1].put(item)
+        else:
+            with self._results_lock:
+                self.results.append(item)
+
+    def _next_batch(self, stage, inbox):
+        """Blocks for one item, then gathers more until the batch is full or the
+        batch timeout expires. Returns (items, stop_seen)."""
+        item = inbox.get()
+        if item is _STOP:
+            return [], True
+        items = [item]
+        deadline = time.monotonic() + stage.batch_timeout
+        while len(items) < stage.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = inbox.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def _process(self, stage, index, queues, item):
+        output = stage.func(item)
+        stage._count("processed")
+        if output is None:
+            stage._count("dropped")
+        elif stage.fan_out:
+            for element in output:
+                stage._count("emitted")
+                self._emit(index, queues, element)
+        else:
+            stage._count("emitted")
+            self._emit(index, queues, output)
+
+    def _process_batch(self, stage, index, queues, items):
+        outputs = stage.func(items)
+        stage._count("processed", len(items))
+        for output in outputs:
+            if output is None:
+                stage._count("dropped")
+            else:
+                stage._count("emitted")
+                self._emit(index, queues, output)
+
+    def _worker(self, index, queues):
+        stage = self.stages[index]
+        inbox = queues[index]
+        stop = False
+        while not stop:
+            if stage.batch_size > 1:
+                work, stop = self._next_batch(stage, inbox)
+                if not work:
+                    break
+            else:
+                work = inbox.get()
+                if work is _STOP:
+                    break
+            started = time.monotonic()
+            try:
+                if stage.batch_size > 1:
+                    self._process_batch(stage, index, queues, work)
+                else:
+                    self._process(stage, index, queues, work)
+            except Exception as e:
+                failed = work if stage.batch_size > 1 else [work]
+                stage._count("failed", len(failed))
+                with self._results_lock:
+                    self.failures.extend((stage.name, item) for item in failed)
+                print(f"ERROR: Pipeline stage '{stage.name}' failed: {e}")
+                traceback.print_exc()
+            finally:
+                stage._count("busy_seconds", time.monotonic() - started)
+
+        # The last worker of a stage to finish shuts down the next stage.
+        with stage._lock:
+            stage._active -= 1
+            last_worker = stage._active == 0
+        if last_worker and index + 1 < len(self.stages):
+            for _ in range(self.stages[index + 1].workers):
+                queues[index + 1].put(_STOP)
+
+    def merge(self, other):
+        """Adds the stats, failures and run time of `other`, a follow-up run over
+        some of the same stages, to the stages of this pipeline with the same name."""
+        stages = {stage.name: stage for stage in self.stages}
+        for stage in other.stages:
+            if stage.name in stages:
+                for key, value in stage.stats.items():
+                    stages[stage.name]._count(key, value)
+        with self._results_lock:
+            self.failures.extend(other.failures)
+        self.elapsed = getattr(self, 'elapsed', 0.0) + getattr(other, 'elapsed', 0.0)
+
+    def print_stats(self):
+        print(f"\n=== Pipeline finished in {getattr(self, 'elapsed', 0.0):.1f}s ===")
+        for stage in self.stages:
+            s = stage.stats
+            print(f"{stage.name:<10} workers={stage.workers:<3} processed={s['processed']:<5} "
+                  f"emitted={s['emitted']:<5} dropped={s['dropped']:<5} failed={s['failed']:<5} "
+                  f"busy={s['busy_seconds']:.1f}s")
@@ -0,0 +1,223 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+import numpy as np
+from cache import CACHE_DIR
+
+# Local triage that runs before any search or Gemini call: posts that are
+# questions, opinions, calls to action or too short to carry a claim are
+# skipped. Scoring uses Swedish heuristics, or a small logistic regression over
+# hashed words plus the same heuristics once one has been trained on our own
+# evaluations (claim_verifier.py --train-prefilter).
+PREFILTER_MODEL_PATH = os.getenv("PREFILTER_MODEL_PATH", os.path.join(CACHE_DIR, "prefilter_model.npz"))
+PREFILTER_LOG_PATH = os.getenv("PREFILTER_LOG_PATH", os.path.join(CACHE_DIR, "prefilter.sqlite3"))
+PREFILTER_THRESHOLD = float(os.getenv("PREFILTER_THRESHOLD", "0.8"))  # Probability of "no claim" needed to skip
+PREFILTER_MIN_WORDS = int(os.getenv("PREFILTER_MIN_WORDS", "5"))
+PREFILTER_DISABLED = os.getenv("PREFILTER_DISABLED", "").lower() in ("1", "true", "yes")
+# Article chunks and manually entered claims are always verified
+PREFILTER_PLATFORMS = ("Reddit", "Twitter/X")
+PREFILTER_MIN_EXAMPLES = 30  # Per class, before a trained model replaces the heuristics
+
+HASH_FEATURES = 1 << 14
+LONG_TEXT_WORDS = 60
+
+_WORD = re.compile(r"\w+")
+_URL = re.compile(r"https?://\S+")
+_QUESTION_WORDS = {"vem", "vad", "varför", "hur", "när", "var", "vart", "varifrån", "vilken", "vilket", "vilka", "vems"}
+# Verb-first yes/no questions: "Är det bara jag som ...?", "Borde vi ...?"
+_QUESTION_VERBS = {"är", "har", "hade", "kan", "kommer", "ska", "skulle", "borde", "bör", "får", "finns", "fanns",
+                   "blir", "vill", "måste", "tycker", "tror", "vet", "gör", "går", "stämmer", "spelar", "håller"}
+_OPINION = re.compile(
+    r"\b(jag (tycker|tror|anser|känner|hatar|älskar|hoppas|undrar)|enligt mig|i mitt tycke|min åsikt|personligen|"
+    r"tycker ni|vad tycker|känns som|skäms|fy fan|så jävla|löjligt|pinsamt|sjukt|galet|skandal\w*|bäst|sämst|"
+    r"imo|imho)\b")
+_CALL_TO_ACTION = re.compile(
+    r"\b(skriv under|rösta (på|nej|ja|för|emot)|dela (gärna|detta|vidare)|sprid (detta|vidare|ordet)|gå med i|"
+    r"läs (mer|tråden)|följ (oss|mig)|anmäl dig|skänk|häng med|kom till)\b")
+_CLAIM_SIGNAL = re.compile(
+    r"\d|\b(enligt|procent|miljon\w*|miljard\w*|kronor|rapport\w*|statistik\w*|undersökning\w*|visar|säger|"
+    r"uppger|beslut\w*|röstade|dömd\w*|avgår|höjs|sänks)\b")
+
+HEURISTICS = ("question", "opinion", "call_to_action", "short", "long", "claim_signal")
+# Log-odds of "no claim" contributed by each heuristic when no model is trained.
+# A bare question, opinion or call to action clears the default threshold; a
+# very short post (p=0.73) needs one of those as well, since a headline-style
+# post can be short and still carry a claim. A number, a source or a reporting
+# verb pulls the score back below.
+HEURISTIC_BIAS = -1.5
+HEURISTIC_WEIGHTS = np.array([3.5, 3.0, 3.0, 2.5, -1.5, -3.5])
+
+
+def heuristic_flags(text):
+    """Returns the names of the HEURISTICS that apply to `text`."""
+    text = _URL.sub(" ", text or "")
+    lowered = text.lower()
+    words = _WORD.findall(lowered)
+    title = lowered.strip().split("\n", 1)[0]
+    title_words = _WORD.findall(title)
+    flags = []
+    if "?" in title and (title.rstrip().endswith("?") or
+                         (title_words and title_words[0] in _QUESTION_WORDS | _QUESTION_VERBS)):
+        flags.append("question")
+    if _OPINION.search(lowered):
+        flags.append("opinion")
+    if _CALL_TO_ACTION.search(lowered):
+        flags.append("call_to_action")
+    if len(words) < PREFILTER_MIN_WORDS:
+        flags.append("short")
+    elif len(words) > LONG_TEXT_WORDS:
+        flags.append("long")
+    if _CLAIM_SIGNAL.search(lowered):
+        flags.append("claim_signal")
+    return flags
+
+
+def _feature_indices(text, flags):
+    """Hashed unigram/bigram columns plus one column per heuristic flag."""
+    words = _WORD.findall(_URL.sub(" ", text or "").lower())
+    terms = words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+    columns = {zlib.crc32(term.encode("utf-8")) % HASH_FEATURES for term in terms}
+    columns.update(HASH_FEATURES + HEURISTICS.index(flag) for flag in flags)
+    return sorted(columns)
+
+
+def _sigmoid(values):
+    return 1.0 / (1.0 + np.exp(-np.clip(values, -30, 30)))
+
+
+class PrefilterModel:
+    """Logistic regression on binary hashed-word and heuristic features."""
+
+    def __init__(self, weights, bias, meta=None):
+        self.weights = weights
+        self.bias = bias
+        self.meta = meta or {}
+
+    def probability(self, text, flags):
+        return float(_sigmoid(self.bias + self.weights[_feature_indices(text, flags)].sum()))
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as f:
+            np.savez(f, weights=self.weights, bias=np.array([self.bias]), meta=np.array([json.dumps(self.meta)]))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["weights"], float(data["bias"][0]), json.loads(str(data["meta"][0])))
+
+
+def train_prefilter(examples, iterations=300, learning_rate=0.5, l2=1e-4):
+    """Fits a PrefilterModel on (text, is_no_claim) pairs with class-balanced
+    full-batch gradient descent. Returns None when either class has fewer than
+    PREFILTER_MIN_EXAMPLES examples."""
+    labels = np.array([1.0 if no_claim else 0.0 for _, no_claim in examples])
+    positives = int(labels.sum())
+    if positives < PREFILTER_MIN_EXAMPLES or len(labels) - positives < PREFILTER_MIN_EXAMPLES:
+        return None
+    rows, columns = [], []
+    for row, (text, _) in enumerate(examples):
+        indices = _feature_indices(text, heuristic_flags(text))
+        rows.extend([row] * len(indices))
+        columns.extend(indices)
+    rows, columns = np.array(rows), np.array(columns)
+    dimensions = HASH_FEATURES + len(HEURISTICS)
+    sample_weights = np.where(labels == 1.0, len(labels) / (2 * positives), len(labels) / (2 * (len(labels) - positives)))
+
+    weights = np.zeros(dimensions)
+    weights[HASH_FEATURES:] = HEURISTIC_WEIGHTS  # Start from the hand-tuned heuristics
+    bias = HEURISTIC_BIAS
+    for _ in range(iterations):
+        logits = bias + np.bincount(rows, weights=weights[columns], minlength=len(labels))
+        errors = (_sigmoid(logits) - labels) * sample_weights / len(labels)
+        weights -= learning_rate * (np.bincount(columns, weights=errors[rows], minlength=dimensions) + l2 * weights)
+        bias -= learning_rate * errors.sum()
+
+    predictions = _sigmoid(bias + np.bincount(rows, weights=weights[columns], minlength=len(labels))) >= 0.5
+    meta = {"trained_at": time.time(), "examples": len(labels), "no_claim_examples": positives,
+            "training_accuracy": round(float((predictions == (labels == 1.0)).mean()), 4)}
+    return PrefilterModel(weights, float(bias), meta)
+
+
+class ClaimPrefilter:
+    """Scores posts as "no verifiable claim" and records every skip decision
+    in the `skips` table of PREFILTER_LOG_PATH for audit and threshold tuning."""
+
+    def __init__(self, threshold=PREFILTER_THRESHOLD, model_path=PREFILTER_MODEL_PATH, log_path=PREFILTER_LOG_PATH):
+        self.threshold = threshold
+        self.model = PrefilterModel.load(model_path) if os.path.exists(model_path) else None
+        directory = os.path.dirname(log_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(log_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS skips (
+                decided_at REAL NOT NULL,
+                claim_hash TEXT NOT NULL,
+                source_url TEXT,
+                platform TEXT,
+                probability REAL NOT NULL,
+                threshold REAL NOT NULL,
+                scorer TEXT NOT NULL,
+                reasons TEXT NOT NULL,
+                excerpt TEXT
+            )
+        """)
+        self._conn.commit()
+
+    @property
+    def scorer(self):
+        return "model" if self.model is not None else "heuristics"
+
+    def score(self, text):
+        """Returns (probability that `text` contains no verifiable claim, heuristic flags)."""
+        flags = heuristic_flags(text)
+        if self.model is not None:
+            return self.model.probability(text, flags), flags
+        logit = HEURISTIC_BIAS + sum(HEURISTIC_WEIGHTS[HEURISTICS.index(flag)] for flag in flags)
+        return float(_sigmoid(logit)), flags
+
+    def should_skip(self, job):
+        """True when the job's post is confidently not a claim; the decision is logged."""
+        if job['source_data']['platform'] not in PREFILTER_PLATFORMS:
+            return False
+        probability, flags = self.score(job['claim_text'])
+        if probability < self.threshold:
+            return False
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO skips (decided_at, claim_hash, source_url, platform, probability, threshold, scorer, reasons, excerpt) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), job['claim_hash'], job['source_data']['source_url'], job['source_data']['platform'],
+                 probability, self.threshold, self.scorer, ",".join(flags), job['claim_text'][:200])
+            )
+            self._conn.commit()
+        print(f"Pre-filter: skipping {job['label']} (no claim p={probability:.2f}, {','.join(flags) or self.scorer})")
+        return True
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_prefilter = None
+_prefilter_lock = threading.Lock()
+
+
+def get_prefilter(threshold=PREFILTER_THRESHOLD):
+    """Returns the process-wide pre-filter (None when disabled)."""
+    global _prefilter
+    if PREFILTER_DISABLED:
+        return None
+    with _prefilter_lock:
+        if _prefilter is None:
+            _prefilter = ClaimPrefilter(threshold=threshold)
+    return _prefilter
@@ -0,0 +1,188 @@
+import os
+import re
+from string import Formatter
+
+# Bump whenever the prompt wording, output format or truncation budgets change so
+# cached evaluations produced by an older prompt are no longer reused.
+PROMPT_TEMPLATE_VERSION = "2"
+
+# Token budgets for the evidence part of a prompt (per claim): each snippet is cut
+# to PROMPT_MAX_SNIPPET_TOKENS and lower-ranked results are left out once the
+# section would exceed PROMPT_MAX_EVIDENCE_TOKENS.
+PROMPT_MAX_SNIPPET_TOKENS = int(os.getenv("PROMPT_MAX_SNIPPET_TOKENS", "200"))
+PROMPT_MAX_EVIDENCE_TOKENS = int(os.getenv("PROMPT_MAX_EVIDENCE_TOKENS", "1200"))
+
+CHARS_PER_TOKEN = 4  # Average word-piece length of Gemini's tokenizer on Swedish/English text
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+
+
+def _piece_tokens(piece):
+    return (len(piece) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def estimate_tokens(text):
+    """Fast local token estimate: every word costs one token per started four
+    characters and every punctuation mark one token."""
+    return sum(_piece_tokens(piece) for piece in _TOKEN_PIECES.findall(text or ""))
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Cuts `text` at the last word that fits in `max_tokens` estimated tokens."""
+    used = 0
+    for match in _TOKEN_PIECES.finditer(text):
+        used += _piece_tokens(match.group())
+        if used > max_tokens:
+            return text[:match.start()].rstrip() + " …"
+    return text
+
+
+class PromptTemplate:
+    """A str.format-style template parsed once into its static segments, whose
+    token estimate is computed up front, so rendering is a single join."""
+
+    def __init__(self, text):
+        self._segments = [(literal, field) for literal, field, _, _ in Formatter().parse(text)]
+        self.static_tokens = sum(estimate_tokens(literal) for literal, _ in self._segments)
+
+    def render(self, **fields):
+        """Returns (prompt, estimated token count)."""
+        values = {name: str(value) for name, value in fields.items()}
+        prompt = "".join(literal + (values[field] if field else "") for literal, field in self._segments)
+        return prompt, self.static_tokens + sum(estimate_tokens(value) for value in values.values())
+
+
+# Shared by the single-claim and batched prompts.
+EVALUATION_INSTRUCTIONS = """    Instructions:
+    1.  **Crucially, first determine if the 'Content to Evaluate' contains one or more *specific, verifiable factual claims*.**
+        * A factual claim is a statement asserting something that can potentially be proven true or false with objective evidence (e.g., data, statistics, historical records, scientific findings, quotes).
+        * It is **NOT** an opinion (e.g., "this is good/bad"), a question, a prediction about the future, a command, a vague statement, or subjective experience.
+        * **Example of a claim:** "Stockholm är Sveriges huvudstad." (Verifiable)
+        * **Example of NOT a claim:** "Jag tycker att sommaren är bäst." (Opinion), "Kommer det att regna?" (Question), "Alla borde läsa mer." (Recommendation/Vague)
+    2.  **If the content lacks *any* such verifiable factual claim:**
+        * Your response for 'Claim(s) Detected:' MUST be exactly: Inga verifierbara påståenden hittades.
+        * Your response for 'Rating:' MUST be exactly: Inga verifierbara påståenden hittades.
+        * Your response for 'Reasoning:' should briefly state why no verifiable claim was found (e.g., "Innehållet uttrycker en åsikt." or "Innehållet ställer en fråga.").
+        * Your response for 'Truthfulness Score:' should be N/A or left blank/null.
+        * **Do NOT proceed to evaluate using search results if no verifiable claim is identified.**
+    3.  **If, and *only* if, you identify one or more verifiable factual claims:**
+        * Clearly state the identified claim(s) in the 'Claim(s) Detected:' field.
+        * Evaluate their truthfulness based *only* on the provided search result snippets.
+        * When reviewing the snippets:
+            * Prioritize content from credible, authoritative, and neutral sources.
+            * Discount or be skeptical of sources that show bias, sensationalism, or lack supporting evidence.
+            * Consider any contradictory or conflicting information.
+        * Be cautious of misinformation patterns.
+        * Provide the appropriate rating, reasoning, and score based on your evaluation of the claim(s) against the evidence.
+"""
+
+CLAIM_PROMPT = PromptTemplate("""
+    Please act as a neutral and critical fact-checker. Your task is to evaluate the truthfulness of the following content, which may be a short social media post or tweet.
+    The original post and search results may be in Swedish, and your output should also be in Swedish. Let's think step by step.
+
+    {metadata}
+""" + EVALUATION_INSTRUCTIONS.replace("{", "{{").replace("}", "}}") + """    Content to Evaluate (Claim or Tweet):
+    \"{claim_text}\"
+
+    Search Results Snippets:
+    {snippets}
+    Based *strictly* on the instructions above and the provided snippets, provide:
+
+    Claim(s) Detected: [Summarize the identified factual claim(s), OR write *exactly* "Inga verifierbara påståenden hittades." if none were found.]
+    Rating: [Your chosen rating category (Likely True, Likely False, Misleading, Uncertain, Cannot Verify) OR *exactly* "Inga verifierbara påståenden hittades." if no claim was detected.]
+    Reasoning: [Your brief explanation based on the evaluation OR why no claim was found.]
+    Truthfulness Score: [0-10 OR N/A if no claim was detected.]
+    """)
+
+# Structured-output variant: same task, but the reply is one JSON object that
+# Gemini is constrained to (see LLM.EVALUATION_SCHEMA).
+CLAIM_JSON_PROMPT = PromptTemplate("""
+    Please act as a neutral and critical fact-checker. Your task is to evaluate the truthfulness of the following content, which may be a short social media post or tweet.
+    The original post and search results may be in Swedish, and your output should also be in Swedish. Let's think step by step.
+
+    {metadata}
+""" + EVALUATION_INSTRUCTIONS.replace("{", "{{").replace("}", "}}") + """    The fields 'Claim(s) Detected', 'Rating', 'Reasoning' and 'Truthfulness Score' above correspond to the JSON keys
+    "claims_detected", "rating", "reasoning" and "truthfulness_score" below.
+
+    Content to Evaluate (Claim or Tweet):
+    \"{claim_text}\"
+
+    Search Results Snippets:
+    {snippets}
+    Based *strictly* on the instructions above and the provided snippets, respond with ONLY a JSON object:
+    {{"claims_detected": "...", "rating": "...", "reasoning": "...", "truthfulness_score": 7}}
+    "claims_detected" summarizes the identified factual claim(s), or is exactly "Inga verifierbara påståenden hittades" if none were found.
+    "rating" must be one of Likely True, Likely False, Misleading, Uncertain, Cannot Verify, or exactly "Inga verifierbara påståenden hittades" if no claim was detected.
+    "reasoning" is your brief explanation based on the evaluation OR why no claim was found.
+    "truthfulness_score" must be a number from 0-10, or null if no claim was detected.
+    """)
+
+BATCH_PROMPT = PromptTemplate("""
+    Please act as a neutral and critical fact-checker. You will evaluate {count} separate items, each of which may be a short social media post, tweet or article excerpt.
+    Evaluate every item independently, using only the search result snippets listed under that same item.
+    The posts and search results may be in Swedish, and your output should also be in Swedish. Let's think step by step.
+
+""" + EVALUATION_INSTRUCTIONS.replace("{", "{{").replace("}", "}}") + """    The fields 'Claim(s) Detected', 'Rating', 'Reasoning' and 'Truthfulness Score' above correspond to the JSON keys
+    "claims_detected", "rating", "reasoning" and "truthfulness_score" below.
+    {items}
+    Respond with ONLY a JSON object, without markdown fences. Use the item numbers as string keys, one entry per item:
+    {{"1": {{"claims_detected": "...", "rating": "...", "reasoning": "...", "truthfulness_score": 7}}, "2": {{...}}}}
+    "rating" must be one of Likely True, Likely False, Misleading, Uncertain, Cannot Verify, or exactly "Inga verifierbara påståenden hittades" if no claim was detected.
+    "truthfulness_score" must be a number from 0-10, or null if no claim was detected.
+    """)
+
+BATCH_ITEM = PromptTemplate("""
+    === Item {index} ===
+    {metadata}
+    Content to Evaluate (Claim or Tweet):
+    \"{claim_text}\"
+
+    Search Results Snippets:
+    {snippets}
+    """)
+
+
+def format_metadata(metadata):
+    metadata_str = ""
+    if metadata:
+        platform = metadata.get('platform')
+        post_date = metadata.get('post_date')
+        if platform:
+            metadata_str += f"\nPlatform: {platform}"
+        if post_date:
+            metadata_str += f"\nPost Date: {post_date}"
+        if metadata_str:
+            metadata_str = f"\n[Metadata]{metadata_str}\n"
+    return metadata_str
+
+
+def format_snippets(search_results, snippet_tokens=PROMPT_MAX_SNIPPET_TOKENS, evidence_tokens=PROMPT_MAX_EVIDENCE_TOKENS):
+    """Numbered evidence list with every snippet cut to `snippet_tokens`. Results are
+    expected best-first; the tail is dropped once `evidence_tokens` is reached."""
+    parts, used = [], 0
+    for i, result in enumerate(search_results, 1):
+        snippet = truncate_to_tokens(str(result.get('snippet', 'N/A')), snippet_tokens)
+        entry = f"\n{i}. URL: {result.get('url', 'N/A')}\n   Title: {result.get('title', 'N/A')}\n   Snippet: {snippet}\n"
+        tokens = estimate_tokens(entry)
+        if parts and used + tokens > evidence_tokens:
+            break
+        parts.append(entry)
+        used += tokens
+    return "".join(parts)
+
+
+def build_claim_prompt(claim_text, search_results, metadata=None, structured=False):
+    """Returns (prompt, estimated tokens) for evaluating one claim, asking for a
+    JSON reply when `structured` and for labelled text lines otherwise."""
+    template = CLAIM_JSON_PROMPT if structured else CLAIM_PROMPT
+    return template.render(metadata=format_metadata(metadata), claim_text=claim_text,
+                           snippets=format_snippets(search_results))
+
+
+def build_batch_prompt(batch):
+    """Returns (prompt, estimated tokens) for evaluating several claims in one request."""
+    items = "".join(
+        BATCH_ITEM.render(index=index, metadata=format_metadata(item.get('metadata')), claim_text=item['claim_text'],
+                          snippets=format_snippets(item['search_results']))[0]
+        for index, item in enumerate(batch, 1)
+    )
+    return BATCH_PROMPT.render(count=len(batch), items=items)
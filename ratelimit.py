@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+def _env_float(name, default):
+    return float(os.getenv(name, str(default)))
+
+
+# Requests per second and burst size per provider. Override with e.g.
+# RATE_LIMIT_TAVILY=2 / RATE_LIMIT_TAVILY_BURST=4.
+DEFAULT_LIMITS = {
+    "tavily": (2.0, 2),
+    "newsapi": (1.0, 2),
+    "gemini": (1.0, 2),
+    "x_api": (0.5, 1),       # 450 recent-search requests / 15 min (app auth)
+    "reddit": (1.0, 2),      # 60 requests / min for OAuth clients
+    "article": (1.0, 1),     # Per article host, keyed as "article:<host>"
+}
+
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class TokenBucket:
+    """Token bucket with adaptive backoff.
+
+    `acquire()` blocks until a token is available. `throttled()` pauses the bucket
+    (honouring Retry-After when given) and halves the rate; `succeeded()` recovers
+    the rate gradually back to its configured value.
+    """
+
+    def __init__(self, rate, capacity):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.consecutive_throttles = 0
+        self.stats = {"acquired": 0, "waited_seconds": 0.0, "throttled": 0}
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    self.stats["acquired"] += 1
+                    self.stats["waited_seconds"] += waited
+                    return waited
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def throttled(self, retry_after=None):
+        with self._lock:
+            self.consecutive_throttles += 1
+            self.stats["throttled"] += 1
+            self.rate = max(self.base_rate / 16, self.rate / 2)
+            backoff = retry_after if retry_after is not None else min(MAX_BACKOFF_SECONDS, 2 ** self.consecutive_throttles)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + backoff)
+            self.tokens = 0.0
+            return backoff
+
+    def succeeded(self):
+        with self._lock:
+            self.consecutive_throttles = 0
+            if self.rate < self.base_rate:
+                self.rate = min(self.base_rate, self.rate + self.base_rate * 0.1)
+
+
+class RateLimiter:
+    """Registry of token buckets, one per provider (and one per article host)."""
+
+    def __init__(self, limits=None):
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, provider):
+        with self._lock:
+            bucket = self._buckets.get(provider)
+            if bucket is None:
+                kind = provider.split(":", 1)[0]
+                rate, burst = self.limits.get(kind, self.limits["article"])
+                env_name = f"RATE_LIMIT_{kind.upper()}"
+                bucket = TokenBucket(_env_float(env_name, rate), int(_env_float(f"{env_name}_BURST", burst)))
+                self._buckets[provider] = bucket
+            return bucket
+
+    def acquire(self, provider):
+        return self.bucket(provider).acquire()
+
+    def report_throttled(self, provider, retry_after=None):
+        backoff = self.bucket(provider).throttled(parse_retry_after(retry_after))
+        print(f"WARNING: {provider} is throttling requests; backing off for {backoff:.1f}s.")
+
+    def report_success(self, provider):
+        self.bucket(provider).succeeded()
+
+    def stats(self):
+        with self._lock:
+            return {provider: dict(bucket.stats, rate=bucket.rate) for provider, bucket in self._buckets.items()}
+
+
+def parse_retry_after(value):
+    """Parses a Retry-After header (seconds or HTTP date) into seconds."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_throttling_error(error):
+    """True for HTTP 429 / quota errors raised by requests, Tavily or the Gemini SDK."""
+    response = getattr(error, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    if type(error).__name__ in ("ResourceExhausted", "TooManyRequests", "UsageLimitExceededError"):
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "quota" in message
+
+
+_limiter = RateLimiter()
+
+
+def get_rate_limiter():
+    return _limiter
+
+
+def print_rate_limit_stats():
+    for provider, stats in sorted(_limiter.stats().items()):
+        print(f"Rate limit {provider:<20} requests={stats['acquired']:<5} waited={stats['waited_seconds']:.1f}s "
+              f"throttled={stats['throttled']} rate={stats['rate']:.2f}/s")
@@ -0,0 +1,109 @@
+import os
+import re
+import numpy as np
+from article_cache import canonicalize_url
+from prompts import estimate_tokens
+
+# Evidence reranking: scores each search result against the claim with BM25,
+# drops duplicate URLs/snippets and keeps the best results that fit the prompt.
+RERANK_TOP_K = int(os.getenv("RERANK_TOP_K", "6"))
+RERANK_TOKEN_BUDGET = int(os.getenv("RERANK_TOKEN_BUDGET", "1200"))  # Estimated tokens of title + snippet text kept
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+")
+
+SWEDISH_STOPWORDS = {
+    "och", "i", "att", "det", "som", "en", "på", "är", "av", "för", "med", "till", "den", "har", "de", "inte",
+    "om", "ett", "han", "men", "var", "jag", "sig", "från", "vi", "så", "kan", "man", "när", "år", "säger",
+    "hon", "under", "också", "efter", "eller", "nu", "sin", "där", "vid", "mot", "ska", "skulle", "kommer",
+    "ut", "få", "finns", "vara", "hade", "alla", "andra", "mycket", "än", "här", "då", "sedan", "över",
+    "bara", "blir", "upp", "även", "vad", "ha", "mer", "dessa", "dem", "detta", "denna", "sina", "sitt",
+    "vars", "vilka", "vilken", "vilket", "vem", "hur", "dig", "mig", "oss", "er", "ni", "du", "min", "din",
+    "the", "a", "an", "of", "to", "in", "and", "is", "for", "on", "that", "with", "as", "by", "at", "it", "be"
+}
+# Common Swedish inflection endings, longest first. Stripping them lets
+# "regeringen", "regeringens" and "regeringar" match the same stem.
+SWEDISH_SUFFIXES = ("heterna", "hetens", "arnas", "ernas", "ornas", "heten", "arna", "erna", "orna", "ande",
+                    "ende", "aste", "het", "are", "ast", "ens", "ets", "en", "ar", "er", "or", "et", "na", "a", "e", "s")
+MIN_STEM_LENGTH = 3
+
+
+def _stem(token):
+    for suffix in SWEDISH_SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= MIN_STEM_LENGTH:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text):
+    """Lowercased, stopword-free and lightly stemmed Swedish word tokens."""
+    return [_stem(token) for token in _TOKEN.findall((text or "").lower())
+            if token not in SWEDISH_STOPWORDS and (len(token) >= 2 or token.isdigit())]
+
+
+def _result_text(result):
+    return f"{result.get('title') or ''} {result.get('snippet') or ''}"
+
+
+def deduplicate_results(search_results):
+    """Drops results whose canonical URL or normalized snippet was already seen."""
+    seen_urls, seen_snippets, unique = set(), set(), []
+    for result in search_results:
+        url = canonicalize_url(result['url']) if result.get('url') else None
+        snippet = " ".join((result.get('snippet') or "").lower().split())
+        if (url and url in seen_urls) or (snippet and snippet in seen_snippets):
+            continue
+        if url:
+            seen_urls.add(url)
+        if snippet:
+            seen_snippets.add(snippet)
+        unique.append(result)
+    return unique
+
+
+def bm25_scores(query, documents):
+    """Scores each document against the query with Okapi BM25, normalized to 0-1
+    by the score a document containing every query term would get."""
+    query_terms = sorted(set(tokenize(query)))
+    if not documents or not query_terms:
+        return np.zeros(len(documents))
+    term_index = {term: column for column, term in enumerate(query_terms)}
+    term_frequencies = np.zeros((len(documents), len(query_terms)))
+    lengths = np.zeros(len(documents))
+    for row, document in enumerate(documents):
+        tokens = tokenize(document)
+        lengths[row] = len(tokens)
+        for token in tokens:
+            column = term_index.get(token)
+            if column is not None:
+                term_frequencies[row, column] += 1
+
+    document_frequency = (term_frequencies > 0).sum(axis=0)
+    idf = np.log(1 + (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / max(lengths.mean(), 1.0))
+    saturated = term_frequencies * (BM25_K1 + 1) / (term_frequencies + length_norm[:, None])
+    scores = saturated @ idf
+    ceiling = (idf[document_frequency > 0] * (BM25_K1 + 1)).sum()
+    return scores / ceiling if ceiling else scores
+
+
+def rerank_results(claim_text, search_results, top_k=RERANK_TOP_K, token_budget=RERANK_TOKEN_BUDGET):
+    """Returns the deduplicated results most relevant to the claim, best first,
+    each with a `relevance_score`, keeping at most `top_k` results within
+    `token_budget` estimated tokens. The best result is always kept."""
+    unique = deduplicate_results(search_results)
+    if not unique:
+        return []
+    scores = bm25_scores(claim_text, [_result_text(result) for result in unique])
+    ranked, used_tokens = [], 0
+    for position in np.argsort(-scores, kind="stable"):
+        result = unique[position]
+        tokens = estimate_tokens(_result_text(result))
+        if len(ranked) >= top_k:
+            break
+        if ranked and used_tokens + tokens > token_budget:
+            continue  # A shorter, lower-ranked result may still fit
+        ranked.append(dict(result, relevance_score=round(float(scores[position]), 4)))
+        used_tokens += tokens
+    return ranked
@@ -0,0 +1,192 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from cache import CACHE_DIR
+
+# Per-run journal of every claim's progress through the pipeline, with the
+# intermediate results (search results, evaluation) stored alongside. A run that
+# dies part-way can be resumed from each claim's last durable stage without
+# repeating its searches or Gemini call, and verdicts that are never written to
+# Postgres (no verifiable claim) are still on record here.
+RUN_JOURNAL_PATH = os.getenv("RUN_JOURNAL_PATH", os.path.join(CACHE_DIR, "run_journal.sqlite3"))
+RUN_JOURNAL_MAX_AGE = int(os.getenv("RUN_JOURNAL_MAX_AGE", str(14 * 24 * 3600)))  # Finished runs older than this are pruned
+RUN_JOURNAL_DISABLED = os.getenv("RUN_JOURNAL_DISABLED", "").lower() in ("1", "true", "yes")
+
+STAGES = ("fetched", "searched", "evaluated", "stored")
+_STAGE_RANK = {stage: rank for rank, stage in enumerate(STAGES)}
+
+# Datetime values inside a job, stored as ISO strings
+_DATETIME_FIELDS = {'source_data': ('post_timestamp', 'fetch_timestamp'), 'claim_data': ('date_extracted',),
+                    'evaluation_data': ('evaluation_timestamp',)}
+_TRANSIENT_FIELDS = ('minhash',)  # Recomputed when a journaled job is resumed
+
+
+def _encode_job(job):
+    return json.dumps({key: value for key, value in job.items() if key not in _TRANSIENT_FIELDS},
+                      default=lambda value: value.isoformat() if isinstance(value, datetime) else str(value))
+
+
+def _decode_job(text):
+    job = json.loads(text)
+    for section, fields in _DATETIME_FIELDS.items():
+        for field in fields:
+            if job.get(section) and job[section].get(field):
+                job[section][field] = datetime.fromisoformat(job[section][field])
+    return job
+
+
+class RunJournal:
+    """SQLite journal of verification runs.
+
+    `begin()` opens a new run or reopens an unfinished one; `record()` advances
+    claims to a stage and snapshots the job at that point (a claim never moves
+    back to an earlier stage); `mark_stored()` is called once results are
+    written; `finish()` closes the run. `pending_jobs()` returns the jobs of a
+    run that never reached 'stored', as they were at their last stage.
+    """
+
+    def __init__(self, path, max_age=RUN_JOURNAL_MAX_AGE):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.run_id = None
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL,
+                finished_at REAL,
+                description TEXT
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS claims (
+                run_id TEXT NOT NULL,
+                source_url TEXT NOT NULL,
+                claim_hash TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                stage_rank INTEGER NOT NULL,
+                job TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (run_id, source_url, claim_hash)
+            )
+        """)
+        cutoff = time.time() - max_age
+        self._conn.execute("DELETE FROM claims WHERE run_id IN (SELECT run_id FROM runs WHERE finished_at < ?)", (cutoff,))
+        self._conn.execute("DELETE FROM runs WHERE finished_at < ?", (cutoff,))
+        self._conn.commit()
+
+    def begin(self, run_id=None, description=None):
+        """Starts a new run, or continues `run_id`; returns the run id."""
+        with self._lock:
+            if run_id is None:
+                run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+                self._conn.execute("INSERT INTO runs (run_id, started_at, description) VALUES (?, ?, ?)",
+                                   (run_id, time.time(), description))
+            else:
+                self._conn.execute("UPDATE runs SET finished_at = NULL WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+            self.run_id = run_id
+        return run_id
+
+    def finish(self):
+        with self._lock:
+            if self.run_id is None:
+                return
+            self._conn.execute("UPDATE runs SET finished_at = ? WHERE run_id = ?", (time.time(), self.run_id))
+            self._conn.commit()
+            self.run_id = None
+
+    def latest_unfinished_run(self):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE finished_at IS NULL ORDER BY started_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def run_exists(self, run_id):
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM runs WHERE run_id = ?", (run_id,)).fetchone() is not None
+
+    def record(self, jobs, stage):
+        """Advances `jobs` of the current run to `stage` with a snapshot of each job."""
+        if self.run_id is None or not jobs:
+            return
+        now = time.time()
+        rows = [(self.run_id, job['source_data']['source_url'], job['claim_hash'], stage, _STAGE_RANK[stage],
+                 _encode_job(job), now) for job in jobs]
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO claims (run_id, source_url, claim_hash, stage, stage_rank, job, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (run_id, source_url, claim_hash) DO UPDATE SET
+                    stage = excluded.stage, stage_rank = excluded.stage_rank, job = excluded.job,
+                    updated_at = excluded.updated_at
+                WHERE excluded.stage_rank >= claims.stage_rank
+            """, rows)
+            self._conn.commit()
+
+    def mark_stored(self, keys):
+        """Moves the (source_url, claim_hash) pairs of the current run to 'stored',
+        keeping the snapshot taken at their previous stage."""
+        if self.run_id is None or not keys:
+            return
+        with self._lock:
+            self._conn.executemany("""
+                UPDATE claims SET stage = 'stored', stage_rank = ?, updated_at = ?
+                WHERE run_id = ? AND source_url = ? AND claim_hash = ?
+            """, [(_STAGE_RANK['stored'], time.time(), self.run_id, source_url, claim_hash)
+                  for source_url, claim_hash in keys])
+            self._conn.commit()
+
+    def pending_jobs(self, run_id):
+        """Returns the jobs of `run_id` that were not stored, each with its
+        'journal_stage' and the results gathered up to that stage."""
+        with self._lock:
+            rows = self._conn.execute("SELECT stage, job FROM claims WHERE run_id = ? AND stage != 'stored'",
+                                      (run_id,)).fetchall()
+        jobs = []
+        for stage, text in rows:
+            job = _decode_job(text)
+            job['journal_stage'] = stage
+            jobs.append(job)
+        return jobs
+
+    def evaluated_jobs(self):
+        """Yields every journaled job that carries an evaluation, across all runs
+        (including verdicts never written to Postgres)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT job FROM claims WHERE stage_rank >= ?",
+                                      (_STAGE_RANK['evaluated'],)).fetchall()
+        for (text,) in rows:
+            job = _decode_job(text)
+            if job.get('evaluation_data'):
+                yield job
+
+    def stage_counts(self, run_id):
+        with self._lock:
+            return dict(self._conn.execute("SELECT stage, COUNT(*) FROM claims WHERE run_id = ? GROUP BY stage",
+                                           (run_id,)).fetchall())
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_journal = None
+_journal_lock = threading.Lock()
+
+
+def get_run_journal():
+    """Returns the process-wide journal (None when disabled)."""
+    global _journal
+    if RUN_JOURNAL_DISABLED:
+        return None
+    with _journal_lock:
+        if _journal is None:
+            _journal = RunJournal(RUN_JOURNAL_PATH)
+    return _journal
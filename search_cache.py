@@ -0,0 +1,73 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from cache import DiskCache, CACHE_DIR
+
+SEARCH_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join(CACHE_DIR, "search_cache.sqlite3"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "20000"))
+SEARCH_CACHE_DISABLED = os.getenv("SEARCH_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+# Time-to-live in seconds per provider. News results change faster than the
+# curated Tavily domains, so NewsAPI entries expire sooner.
+SEARCH_CACHE_TTLS = {
+    "tavily": int(os.getenv("SEARCH_CACHE_TTL_TAVILY", str(24 * 3600))),
+    "newsapi": int(os.getenv("SEARCH_CACHE_TTL_NEWSAPI", str(6 * 3600))),
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache():
+    """Returns the process-wide evidence search cache (None when disabled)."""
+    global _cache
+    if SEARCH_CACHE_DISABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(SEARCH_CACHE_PATH, table="search_results", max_entries=SEARCH_CACHE_MAX_ENTRIES)
+    return _cache
+
+
+def normalize_query(query):
+    return re.sub(r"\s+", " ", (query or "").strip().lower())
+
+
+def search_cache_key(provider, query, max_results, include_domains=None, language=None):
+    key_material = json.dumps({
+        "provider": provider,
+        "query": normalize_query(query),
+        "max_results": max_results,
+        "domains": sorted(include_domains or []),
+        "language": language,
+    }, sort_keys=True)
+    return hashlib.sha256(key_material.encode()).hexdigest()
+
+
+def cached_search(provider, query, max_results, include_domains, language, search_func):
+    """Returns cached results for the query or calls `search_func()` and stores
+    its results. Empty result lists are not cached since the search functions
+    also return [] on errors."""
+    cache = get_search_cache()
+    if cache is None:
+        return search_func()
+    key = search_cache_key(provider, query, max_results, include_domains, language)
+    cached = cache.get(key)
+    if cached is not None:
+        print(f"Search cache hit ({provider}) for: '{query}'")
+        return cached
+    results = search_func()
+    if results:
+        cache.set(key, results, ttl=SEARCH_CACHE_TTLS.get(provider))
+    return results
+
+
+def print_search_cache_stats():
+    cache = get_search_cache()
+    if cache is None:
+        return
+    stats = cache.stats()
+    print(f"Search cache: hits={stats['hits']} misses={stats['misses']} "
+          f"hit_rate={stats['hit_rate']:.0%} entries={stats['entries']}")
@@ -1,36 +1,57 @@
-from tavily import TavilyClient # <--- Import TavilyClient
-import requests
-import os
-import sys
-# --- Updated Search Function ---
+import threading
+from search_cache import cached_search
+from ratelimit import get_rate_limiter, is_throttling_error
+from transport import get_session
+
+_tavily_clients = {}
+_tavily_clients_lock = threading.Lock()
+
+def get_tavily_client(tavily_key):
+    """Returns one TavilyClient per API key, reused across queries so the
+    underlying pooled session keeps its connection to api.tavily.com warm."""
+    with _tavily_clients_lock:
+        client = _tavily_clients.get(tavily_key)
+        if client is None:
+            from tavily import TavilyClient  # Imported on first search, not at startup
+            try:
+                client = TavilyClient(api_key=tavily_key, session=get_session("tavily"))
+            except TypeError:
+                # Older tavily-python releases do not accept a session
+                client = TavilyClient(api_key=tavily_key)
+            _tavily_clients[tavily_key] = client
+            print("Tavily Search Client initialized.")
+        return client
+
 def search_web_tavily(query, max_results=5, include_domains=None, tavily_key=str):
+    """Tavily search with results served from the local search cache when fresh."""
+    return cached_search("tavily", query, max_results, include_domains, None,
+                         lambda: _search_web_tavily(query, max_results, include_domains, tavily_key))
 
+# --- Updated Search Function ---
+def _search_web_tavily(query, max_results=5, include_domains=None, tavily_key=str):
+    """Performs a Tavily Search for the query."""
     try:
-        tavily_client = TavilyClient(api_key=tavily_key)
-        print("Tavily Search Client initialized.")
+        tavily_client = get_tavily_client(tavily_key)
     except Exception as e:
         print(f"ERROR: Failed to initialize Tavily client: {e}")
-        sys.exit(1)
-    """Performs a Tavily Search for the query."""
+        return []
     # Note: Tavily might not have explicit Swedish language *filtering* like Google's 'lr=lang_sv'.
     # It searches broadly. Results quality depends on the Swedish query terms and Tavily's index.
     print(f"Searching web (Tavily) for: '{query}'")
     results = []
     try:
-        # Use tavily_client.search method
         # search_depth can be 'basic' or 'advanced'. 'basic' is often sufficient.
-        search_params = tavily_client.search(
-            query=query,
-            search_depth="basic",
-            max_results=max_results
-            # include_domains=[], # Optional: restrict to specific domains
-            # exclude_domains=[] # Optional: exclude specific domains
-            )
+        search_params = {
+            'query': query,
+            'search_depth': "basic",
+            'max_results': max_results
+        }
         if include_domains:
             search_params['include_domains'] = include_domains
 
+        get_rate_limiter().acquire("tavily")
         response = tavily_client.search(**search_params)
-        
+        get_rate_limiter().report_success("tavily")
 
         # Parse the response (structure is typically {'results': [...]})
         if 'results' in response and response['results']:
@@ -46,5 +67,7 @@ def search_web_tavily(query, max_results=5, include_domains=None, tavily_key=str
 
     except Exception as e:
         print(f"ERROR: Tavily Search API call failed: {e}")
+        if is_throttling_error(e):
+            get_rate_limiter().report_throttled("tavily")
 
     return results
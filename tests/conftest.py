@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# The modules live at the repository root and several read their settings
+# (CACHE_DIR, PREFILTER_*, ...) at import time, so point the caches at a
+# scratch directory before any of them is imported.
+os.environ.setdefault("CACHE_DIR", tempfile.mkdtemp(prefix="desinformation-agent-tests-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
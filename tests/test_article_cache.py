@@ -0,0 +1,95 @@
+import time
+import pytest
+import fetchresponse
+from article_cache import canonicalize_url
+from cache import DiskCache
+
+
+@pytest.mark.parametrize("url, canonical", [
+    ("HTTPS://WWW.SVT.se/nyheter/inrikes/artikel/", "https://www.svt.se/nyheter/inrikes/artikel"),
+    ("https://svt.se:443/a?utm_source=reddit&b=2&a=1#kommentarer", "https://svt.se/a?a=1&b=2"),
+    ("http://svt.se:8080/a?fbclid=x", "http://svt.se:8080/a"),
+    ("https://svt.se", "https://svt.se/"),
+])
+def test_canonicalize_url(url, canonical):
+    assert canonicalize_url(url) == canonical
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b"", headers=None):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers or {}
+        self.encoding = None
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        yield self.body
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def close(self):
+        self.closed = True
+
+
+class NoLimits:
+    def acquire(self, provider):
+        return 0.0
+
+
+@pytest.fixture
+def article_cache(tmp_path, monkeypatch):
+    cache = DiskCache(str(tmp_path / "articles.sqlite3"), table="articles")
+    monkeypatch.setattr(fetchresponse, "get_article_cache", lambda: cache)
+    monkeypatch.setattr(fetchresponse, "get_rate_limiter", lambda: NoLimits())
+    return cache
+
+
+class FakeTransport:
+    def __init__(self):
+        self.sent = []
+        self.response = None
+
+    def get(self, url, headers=None, **kwargs):
+        self.sent.append((url, headers))
+        return self.response
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    fake = FakeTransport()
+    monkeypatch.setattr(fetchresponse.transport, "get", fake.get)
+    return fake
+
+
+def _stored(article_cache, url, age):
+    article = {"success": True, "title": "Lagrad", "text": "Lagrad text.", "chunks": ["Lagrad text."]}
+    article_cache.set(canonicalize_url(url), {'article': article, 'etag': '"v1"', 'last_modified': None,
+                                              'fetched_at': time.time() - age})
+    return article
+
+
+def test_fresh_entry_is_reused_without_a_request(article_cache, transport):
+    article = _stored(article_cache, "https://svt.se/a", age=10)
+    assert fetchresponse.extract_article_content("https://svt.se/a/?utm_source=x") == article
+    assert transport.sent == []
+
+
+def test_stale_entry_is_revalidated_and_reused_on_304(article_cache, transport):
+    article = _stored(article_cache, "https://svt.se/a", age=fetchresponse.ARTICLE_CACHE_FRESH_SECONDS + 10)
+    transport.response = FakeResponse(304)
+    assert fetchresponse.extract_article_content("https://svt.se/a") == article
+    assert transport.sent[0][1]['If-None-Match'] == '"v1"'
+    assert transport.response.closed
+    assert time.time() - article_cache.get("https://svt.se/a")['fetched_at'] < 5
+
+
+def test_changed_article_is_extracted_and_stored(article_cache, transport):
+    _stored(article_cache, "https://svt.se/a", age=fetchresponse.ARTICLE_CACHE_FRESH_SECONDS + 10)
+    body = b"<title>Ny</title><p>Regeringen har beslutat om nya regler.</p>"
+    transport.response = FakeResponse(200, body, {"ETag": '"v2"', "Content-Type": "text/html; charset=utf-8"})
+    article = fetchresponse.extract_article_content("https://svt.se/a")
+    assert article["success"] and article["title"] == "Ny"
+    assert article_cache.get("https://svt.se/a")['etag'] == '"v2"'
@@ -0,0 +1,40 @@
+import pytest
+from chunking import SentenceChunker, iter_chunks
+
+
+def test_short_text_is_one_chunk():
+    assert list(iter_chunks("En mening. En till.")) == ["En mening. En till."]
+    assert list(iter_chunks("")) == []
+    assert list(iter_chunks("Text.", max_chunks=0)) == []
+
+
+def test_chunks_respect_size_and_sentence_boundaries():
+    sentences = [f"Mening nummer {i} handlar om Åland." for i in range(40)]
+    chunker = SentenceChunker(chunk_size=120, chunk_overlap=40)
+    chunks = list(chunker.iter_chunks(" ".join(sentences)))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert all(chunk.endswith(".") for chunk in chunks)
+
+
+def test_trailing_sentences_overlap_into_the_next_chunk():
+    sentences = [f"Mening {i}." for i in range(30)]
+    chunks = list(SentenceChunker(chunk_size=50, chunk_overlap=20).iter_chunks(" ".join(sentences)))
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.split(". ")[0] + "." in previous
+
+
+def test_long_sentences_are_split_at_spaces():
+    chunks = list(SentenceChunker(chunk_size=20, chunk_overlap=5).iter_chunks("ord " * 30))
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert " ".join(chunks).split() == ["ord"] * 30
+
+
+def test_max_chunks_stops_early():
+    text = " ".join(f"Mening {i}." for i in range(100))
+    assert len(list(SentenceChunker(chunk_size=30, chunk_overlap=0).iter_chunks(text, max_chunks=2))) == 2
+
+
+def test_overlap_must_be_smaller_than_chunk():
+    with pytest.raises(ValueError):
+        SentenceChunker(chunk_size=10, chunk_overlap=10)
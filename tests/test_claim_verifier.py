@@ -0,0 +1,56 @@
+import claim_verifier
+from claim_verifier import _checkpointable_posts
+from DB import compute_claim_hash
+from LLM import NO_CLAIMS_PHRASE
+
+
+def _posts(*times):
+    return [({"created_utc": t}, {f"https://reddit.com/{t}"}) for t in times]
+
+
+def test_all_posts_are_checkpointable_without_failures():
+    posts = _posts(3, 1, 2)
+    assert _checkpointable_posts(posts, set(), lambda post: post["created_utc"]) == [post for post, _ in posts]
+
+
+def test_checkpoint_stops_before_the_oldest_failed_post():
+    posts = _posts(1, 2, 3, 4, 5)
+    kept = _checkpointable_posts(posts, {"https://reddit.com/4", "https://reddit.com/3"}, lambda post: post["created_utc"])
+    assert [post["created_utc"] for post in kept] == [1, 2]
+
+
+def test_a_failed_article_chunk_holds_back_its_post():
+    posts = [({"id": "10"}, {"https://reddit.com/10"}), ({"id": "11"}, {"https://reddit.com/11", "https://svt.se/a"})]
+    kept = _checkpointable_posts(posts, {"https://svt.se/a"}, lambda tweet: int(tweet["id"]))
+    assert kept == [{"id": "10"}]
+    assert _checkpointable_posts(_posts(1), {"https://reddit.com/1"}, lambda post: post["created_utc"]) == []
+
+
+def _journaled(text, rating, search_results=({"url": "https://svt.se/a"},)):
+    return {'claim_hash': compute_claim_hash(text), 'claim_text': text, 'source_data': {'platform': "Reddit"},
+            'evaluation_data': {'truthfulness_rating': rating, 'llm_reasoning': "r"},
+            'search_results': list(search_results)}
+
+
+def test_prefilter_training_labels_only_explicit_no_claim_verdicts(monkeypatch):
+    jobs = [
+        _journaled("Vad tycker ni?", NO_CLAIMS_PHRASE),
+        _journaled("Vad tycker ni?", NO_CLAIMS_PHRASE),
+        _journaled("Skatten höjs", "Cannot Verify"),
+        _journaled("Inga källor alls", "Cannot Verify", search_results=()),
+        _journaled("Trasigt svar", "Error Parsing LLM Output"),
+    ]
+
+    class Journal:
+        def evaluated_jobs(self):
+            return iter(jobs)
+
+    class Pool:
+        def run(self, func, *args):
+            return ["Skatten höjs", "Elpriset sjönk"]
+
+    trained = []
+    monkeypatch.setattr(claim_verifier, "get_run_journal", lambda: Journal())
+    monkeypatch.setattr(claim_verifier, "train_prefilter", lambda examples: trained.append(examples))
+    assert claim_verifier.train_prefilter_model(Pool()) == 1
+    assert sorted(trained[0]) == [("Elpriset sjönk", False), ("Skatten höjs", False), ("Vad tycker ni?", True)]
@@ -0,0 +1,243 @@
+import threading
+from datetime import datetime, timezone
+import psycopg2
+from psycopg2.errors import QueryCanceled
+import pytest
+import DB
+from DB import (BatchWriter, compute_claim_hash, has_unique_keys, migrate_unique_keys, store_verification_batch,
+                DEDUPLICATE_STATEMENTS)
+
+MODEL = "gemini-test"
+NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _record(url, claim_text, rating="Likely True", evidence=()):
+    return ({'platform': "Reddit", 'source_url': url, 'fetch_timestamp': NOW},
+            {'claim_text': claim_text, 'date_extracted': NOW},
+            {'evaluation_timestamp': NOW, 'truthfulness_rating': rating, 'llm_reasoning': "r", 'llm_model_used': MODEL},
+            [{'url': f"https://evidence.se/{e}", 'title': e, 'snippet': e} for e in evidence])
+
+
+class FakeCursor:
+    """Replays scripted results for cursor.execute() and execute_values() in call order."""
+
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+        self._last = None
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.statements.append((" ".join(sql.split()), params))
+        self._last = self.results.pop(0)
+
+    def fetchall(self):
+        return self._last
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    autocommit = False
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.committed = self.rolled_back = False
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.fixture
+def fake_execute_values(monkeypatch):
+    def execute_values(cursor, sql, rows, fetch=False):
+        cursor.statements.append((" ".join(sql.split()), rows))
+        return cursor.results.pop(0)
+    monkeypatch.setattr(DB, "execute_values", execute_values)
+
+
+def test_batch_skips_no_claim_records():
+    conn = FakeConnection(FakeCursor([]))
+    assert store_verification_batch(conn, [_record("u", "c", rating="Inga verifierbara påståenden hittades")], MODEL) == 0
+    assert conn._cursor.statements == []
+
+
+def test_batch_inserts_rows_and_attaches_evidence_to_its_evaluation(fake_execute_values):
+    first, second = compute_claim_hash("first"), compute_claim_hash("second")
+    cursor = FakeCursor([
+        [],                                          # SELECT Sources
+        [("u", 1)],                                  # INSERT Sources
+        [],                                          # SELECT Claims
+        [(1, first, 10), (1, second, 11)],           # INSERT Claims
+        [],                                          # SELECT Evaluations
+        [(11, MODEL, 101), (10, MODEL, 100)],        # INSERT Evaluations, in any order
+        None,                                        # INSERT Evidence
+    ])
+    conn = FakeConnection(cursor)
+    records = [_record("u", "first", evidence=["a", "b"]), _record("u", "second", evidence=["c"])]
+    assert store_verification_batch(conn, records, MODEL) == 2
+    assert conn.committed
+    statements = [sql for sql, _ in cursor.statements]
+    assert "ON CONFLICT (source_url) DO NOTHING" in statements[1]
+    assert "ON CONFLICT (source_id, claim_hash) DO NOTHING" in statements[3]
+    assert "ON CONFLICT (claim_id, llm_model_used) DO NOTHING" in statements[5]
+    evidence = {(row[0], row[2]) for row in cursor.statements[6][1]}
+    assert evidence == {(100, "a"), (100, "b"), (101, "c")}
+
+
+def test_batch_skips_claims_that_already_have_an_evaluation(fake_execute_values):
+    claim_hash = compute_claim_hash("known")
+    cursor = FakeCursor([[("u", 1)], [(1, claim_hash, 10)], [(10, MODEL)]])
+    conn = FakeConnection(cursor)
+    assert store_verification_batch(conn, [_record("u", "known", evidence=["a"])], MODEL) == 0
+    assert conn.committed and len(cursor.statements) == 3
+
+
+def test_batch_rolls_back_and_raises_on_database_errors():
+    class FailingCursor(FakeCursor):
+        def execute(self, sql, params=None):
+            raise psycopg2.OperationalError("connection lost")
+
+    conn = FakeConnection(FailingCursor([]))
+    with pytest.raises(psycopg2.OperationalError):
+        store_verification_batch(conn, [_record("u", "c")], MODEL)
+    assert conn.rolled_back
+
+
+def test_unique_keys_must_all_exist_and_be_valid():
+    conn = FakeConnection(FakeCursor([[("sources_source_url_key", True), ("claims_source_claim_hash_key", True),
+                                       ("evaluations_claim_model_key", False)]]))
+    assert not has_unique_keys(conn)
+    conn = FakeConnection(FakeCursor([[("sources_source_url_key", True), ("claims_source_claim_hash_key", True),
+                                       ("evaluations_claim_model_key", True)]]))
+    assert has_unique_keys(conn)
+
+
+def test_migration_merges_duplicates_then_builds_missing_indexes_concurrently():
+    class MigrationConnection(FakeConnection):
+        def commit(self):
+            self.committed = True
+            self.autocommit_when_committed = self.autocommit
+
+    cursor = FakeCursor([None] * len(DEDUPLICATE_STATEMENTS) +
+                        [[("sources_source_url_key", True), ("claims_source_claim_hash_key", False)]] + [None] * 3)
+    conn = MigrationConnection(cursor)
+    assert migrate_unique_keys(conn)
+    statements = [sql for sql, _ in cursor.statements]
+    assert statements[0].startswith("UPDATE Claims") and statements[5].startswith("DELETE FROM Evaluations")
+    assert conn.committed and not conn.autocommit_when_committed
+    assert statements[7:] == [
+        "DROP INDEX CONCURRENTLY IF EXISTS claims_source_claim_hash_key",
+        "CREATE UNIQUE INDEX CONCURRENTLY claims_source_claim_hash_key ON Claims (source_id, claim_hash)",
+        "CREATE UNIQUE INDEX CONCURRENTLY evaluations_claim_model_key ON Evaluations (claim_id, llm_model_used)",
+    ]
+    assert not conn.autocommit
+
+
+class FakePool:
+    """Fails every batched write; single-record writes fail for claims in `bad`."""
+
+    def __init__(self, bad=()):
+        self.bad = set(bad)
+        self.calls = []
+
+    def run(self, func, *args):
+        self.calls.append(func.__name__)
+        if func is store_verification_batch:
+            raise psycopg2.OperationalError("batch failed")
+        return args[1]['claim_text'] not in self.bad
+
+
+def test_writer_falls_back_to_single_records_and_reports_what_was_written():
+    written = []
+    pool = FakePool(bad={"two"})
+    writer = BatchWriter(pool, MODEL, batch_size=10, flush_interval=0.05, on_written=written.extend)
+    for text in ("one", "two", "three"):
+        writer.submit(*_record("u", text))
+    writer.flush()
+    writer.close()
+    assert pool.calls == ["store_verification_batch"] + ["store_verification_data"] * 3
+    assert [claim['claim_text'] for _, claim, _, _ in written] == ["one", "three"]
+    assert writer.stats["stored"] == 2 and writer.stats["failed"] == 1
+
+
+def test_writer_without_unique_keys_writes_records_one_by_one():
+    pool = FakePool()
+    writer = BatchWriter(pool, MODEL, batch_size=10, flush_interval=0.05, batched=False)
+    for text in ("one", "two"):
+        writer.submit(*_record("u", text))
+    writer.close()
+    assert pool.calls == ["store_verification_data"] * 2 and writer.stats["stored"] == 2
+
+
+def test_writer_flush_waits_for_the_batch():
+    stored = threading.Event()
+
+    class Pool:
+        def run(self, func, batch, model):
+            stored.set()
+            return len(batch)
+
+    writer = BatchWriter(Pool(), MODEL, batch_size=100, flush_interval=60)
+    writer.submit(*_record("u", "c"))
+    writer.flush()
+    assert stored.is_set() and writer.stats["batches"] == 1
+    writer.close()
+    with pytest.raises(RuntimeError):
+        writer.submit(*_record("u", "c"))
+
+
+class PooledCursor:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, params=None):
+        pass
+
+
+class PooledConnection:
+    closed = False
+    status = psycopg2.extensions.STATUS_READY
+
+    def __init__(self):
+        self.rolled_back = False
+
+    def cursor(self):
+        return PooledCursor()
+
+    def rollback(self):
+        self.rolled_back = True
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(DB.DatabasePool, "_connect", lambda self: PooledConnection())
+    return DB.DatabasePool("host", "6543", "db", "user", "password", minconn=1, maxconn=1)
+
+
+def test_statement_timeout_returns_the_connection_to_the_pool(pool):
+    with pytest.raises(QueryCanceled):
+        with pool.connection() as conn:
+            raise QueryCanceled("canceling statement due to statement timeout")
+    assert conn.rolled_back and not conn.closed
+    assert [idle for idle, _ in pool._idle] == [conn]
+
+
+def test_lost_connection_is_discarded(pool):
+    with pytest.raises(psycopg2.OperationalError):
+        with pool.connection() as conn:
+            raise psycopg2.OperationalError("server closed the connection unexpectedly")
+    assert conn.closed and pool._idle == []
@@ -0,0 +1,66 @@
+from chunking import DEFAULT_CHUNKER
+from html_extract import extract_text_streaming, ARTICLE_MAX_CHARS, ARTICLE_MAX_CHUNKS
+
+
+class FakeResponse:
+    def __init__(self, body, content_type="text/html", encoding=None, chunk_size=7):
+        self.body = body
+        self.headers = {"Content-Type": content_type}
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+        self.closed = False
+        self.chunks_read = 0
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), self.chunk_size):
+            self.chunks_read += 1
+            yield self.body[start:start + self.chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+PAGE = """<html><head><title> Regeringen
+höjer skatten </title><style>.x { color: red }</style></head>
+<body><nav>Meny</nav><header>Logga</header>
+<article><h1>Rubrik</h1><p>Första stycket om skatten.</p><p>Andra stycket, med åäö.</p>
+<script>var x = "hidden";</script></article><footer>Sidfot</footer></body></html>"""
+
+
+def test_extracts_title_and_visible_text():
+    response = FakeResponse(PAGE.encode("utf-8"))
+    title, text, bytes_read = extract_text_streaming(response)
+    assert title == "Regeringen höjer skatten"
+    assert text == "Rubrik\n\nFörsta stycket om skatten.\n\nAndra stycket, med åäö."
+    assert bytes_read == len(PAGE.encode("utf-8"))
+    assert response.closed
+
+
+def test_charset_from_the_content_type_is_used():
+    response = FakeResponse(PAGE.encode("iso-8859-1"), content_type="text/html; charset=ISO-8859-1",
+                            encoding="ISO-8859-1")
+    assert "åäö" in extract_text_streaming(response)[1]
+
+
+def test_missing_charset_defaults_to_utf8():
+    response = FakeResponse(PAGE.encode("utf-8"), encoding="ISO-8859-1")
+    assert "åäö" in extract_text_streaming(response)[1]
+
+
+def test_stops_after_max_chars():
+    body = ("<title>T</title>" + "<p>" + "ord " * 5000 + "</p>").encode("utf-8")
+    response = FakeResponse(body, chunk_size=100)
+    _, text, bytes_read = extract_text_streaming(response, max_chars=200)
+    assert len(text) <= 200
+    assert bytes_read < len(body)
+
+
+def test_stops_after_max_bytes():
+    body = ("<p>" + "ord " * 5000 + "</p>").encode("utf-8")
+    response = FakeResponse(body, chunk_size=64)
+    _, _, bytes_read = extract_text_streaming(response, max_bytes=500, max_chars=10 ** 6)
+    assert bytes_read == 500
+
+
+def test_default_text_cap_covers_the_chunks_that_are_used():
+    assert ARTICLE_MAX_CHARS == DEFAULT_CHUNKER.chunk_size * ARTICLE_MAX_CHUNKS
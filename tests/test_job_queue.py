@@ -0,0 +1,65 @@
+import os
+import pytest
+
+# Runs the queue SQL against a real database; set JOB_QUEUE_TEST_DSN to a
+# scratch Postgres (e.g. "dbname=test user=postgres") to enable these tests.
+psycopg2 = pytest.importorskip("psycopg2")
+DSN = os.getenv("JOB_QUEUE_TEST_DSN")
+pytestmark = pytest.mark.skipif(not DSN, reason="JOB_QUEUE_TEST_DSN is not set")
+
+from job_queue import claim_jobs, complete_jobs, enqueue_jobs, ensure_job_table, fail_jobs, renew_leases
+
+
+@pytest.fixture
+def conn():
+    connection = psycopg2.connect(DSN)
+    cursor = connection.cursor()
+    cursor.execute("CREATE SCHEMA IF NOT EXISTS job_queue_test")
+    cursor.execute("SET search_path TO job_queue_test")
+    cursor.execute("DROP TABLE IF EXISTS ClaimJobs")
+    connection.commit()
+    ensure_job_table(connection)
+    yield connection
+    cursor.execute("DROP SCHEMA job_queue_test CASCADE")
+    connection.commit()
+    connection.close()
+
+
+def _job(n):
+    return {'label': f"post {n}", 'claim_text': f"claim {n}", 'claim_hash': f"hash{n}", 'search_query': "q",
+            'source_data': {'platform': "Reddit", 'source_url': f"https://reddit.com/{n}"},
+            'claim_data': {'claim_text': f"claim {n}"}}
+
+
+def test_enqueue_skips_known_claims(conn):
+    assert enqueue_jobs(conn, [_job(1), _job(2), _job(2)]) == 2
+    assert enqueue_jobs(conn, [_job(1), _job(3)]) == 1
+
+
+def test_claimed_jobs_are_not_claimed_twice(conn):
+    enqueue_jobs(conn, [_job(n) for n in range(5)])
+    first = claim_jobs(conn, "worker-a", 3)
+    second = claim_jobs(conn, "worker-b", 10)
+    assert len(first) == 3 and len(second) == 2
+    assert not {job['queue_job_id'] for job in first} & {job['queue_job_id'] for job in second}
+    assert first[0]['queue_attempt'] == 1 and first[0]['source_data']['platform'] == "Reddit"
+
+
+def test_complete_and_fail_only_touch_own_leases(conn):
+    enqueue_jobs(conn, [_job(1), _job(2)])
+    job_ids = [job['queue_job_id'] for job in claim_jobs(conn, "worker-a", 2)]
+    assert complete_jobs(conn, job_ids, "worker-b") == 0
+    assert renew_leases(conn, job_ids, "worker-b") == set(job_ids)
+    assert renew_leases(conn, job_ids, "worker-a") == set()
+    assert complete_jobs(conn, job_ids[:1], "worker-a") == 1
+    assert fail_jobs(conn, {job_ids[1]: "boom"}, "worker-a", retry_delay=0) == 0
+    cursor = conn.cursor()
+    cursor.execute("SELECT job_id, status, last_error FROM ClaimJobs ORDER BY job_id")
+    assert cursor.fetchall() == [(job_ids[0], 'done', None), (job_ids[1], 'pending', "boom")]
+
+
+def test_last_attempt_is_dead_lettered(conn):
+    enqueue_jobs(conn, [_job(1)], max_attempts=1)
+    job_id = claim_jobs(conn, "worker-a", 1)[0]['queue_job_id']
+    assert fail_jobs(conn, {job_id: "boom"}, "worker-a", retry_delay=0) == 1
+    assert claim_jobs(conn, "worker-a", 1) == []
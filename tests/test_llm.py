@@ -0,0 +1,69 @@
+import json
+import pytest
+from LLM import NO_CLAIMS_PHRASE, _parse_batch_output, parse_structured_output, validate_evaluation_fields
+
+
+def _item(rating="Likely True", score=7, claims="Skatten höjs", reasoning="Källorna bekräftar."):
+    return {"claims_detected": claims, "rating": rating, "reasoning": reasoning, "truthfulness_score": score}
+
+
+def test_batch_output_is_parsed_per_item():
+    reply = "```json\n" + json.dumps({"1": _item(), "2": _item(rating="Likely False", score="2")}) + "\n```"
+    results = _parse_batch_output(reply, 2)
+    assert sorted(results) == [1, 2]
+    assert results[1][0]["rating"] == "Likely True" and results[1][0]["truthfulness_score"] == 7
+    assert results[2][0]["truthfulness_score"] == 2
+    assert json.loads(results[1][1]) == _item()
+
+
+def test_missing_and_unusable_items_are_left_out():
+    reply = json.dumps({"1": _item(), "3": "not an object", "4": {"reasoning": "no rating"}})
+    assert sorted(_parse_batch_output(reply, 4)) == [1]
+
+
+def test_no_claim_items_are_normalized():
+    reply = json.dumps({"1": _item(rating=NO_CLAIMS_PHRASE, claims=NO_CLAIMS_PHRASE, score=None)})
+    result = _parse_batch_output(reply, 1)[1][0]
+    assert result["rating"] == NO_CLAIMS_PHRASE and result["truthfulness_score"] is None
+
+
+def test_batch_reply_must_be_an_object():
+    with pytest.raises(ValueError):
+        _parse_batch_output(json.dumps([_item()]), 1)
+    with pytest.raises(ValueError):
+        _parse_batch_output("Rating: Likely True", 1)
+
+
+def test_structured_output_is_validated_and_normalized():
+    result = parse_structured_output(json.dumps(_item(rating="Misleading.", score="4")))
+    assert result == {"claims_detected": "Skatten höjs", "rating": "Misleading", "reasoning": "Källorna bekräftar.",
+                      "truthfulness_score": 4}
+
+
+def test_structured_no_claim_reply():
+    result = parse_structured_output(json.dumps(_item(rating=NO_CLAIMS_PHRASE, claims=NO_CLAIMS_PHRASE + ".", score=None)))
+    assert result["rating"] == NO_CLAIMS_PHRASE and result["claims_detected"] == NO_CLAIMS_PHRASE
+    assert result["truthfulness_score"] is None
+
+
+def test_structured_output_falls_back_to_the_text_parser():
+    text = "Claim(s) Detected: Skatten höjs\nRating: Likely True\nReasoning: Bekräftat.\nTruthfulness Score: 8"
+    result = parse_structured_output(text)
+    assert result["rating"] == "Likely True" and result["truthfulness_score"] == 8
+
+
+def test_unexpected_rating_is_kept_like_the_text_parser():
+    result = parse_structured_output(json.dumps(_item(rating="Troligen sant")))
+    assert result["rating"] == "Troligen sant" and result["truthfulness_score"] == 7
+
+
+@pytest.mark.parametrize("fields", [
+    [],
+    {"rating": "Likely True", "reasoning": "r", "truthfulness_score": 1},
+    _item(reasoning="  "),
+    _item(score=True),
+    _item(score=[1]),
+])
+def test_validator_rejects_malformed_evaluations(fields):
+    with pytest.raises(ValueError):
+        validate_evaluation_fields(fields)
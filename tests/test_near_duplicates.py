@@ -0,0 +1,73 @@
+import pytest
+from near_duplicates import NearDuplicateIndex, estimate_similarity, minhash_signature, normalize_claim_text
+
+CLAIM = "Regeringen höjer skatten på bensin med två kronor per liter från och med första januari"
+REWORDED = "REGERINGEN HÖJER skatten på bensin, med två kronor per liter från och med första januari! https://t.co/x"
+OTHER = "Riksbanken lämnar styrräntan oförändrad på fyra procent enligt dagens penningpolitiska besked"
+
+
+@pytest.fixture
+def index(tmp_path):
+    near_dup_index = NearDuplicateIndex(str(tmp_path / "index.sqlite3"), "model-a", threshold=0.8)
+    yield near_dup_index
+    near_dup_index.close()
+
+
+def _job(text, url):
+    from hashlib import sha256
+    return {'claim_hash': sha256(text.encode()).hexdigest(), 'claim_text': text, 'source_data': {'source_url': url}}
+
+
+def test_normalization_and_signatures():
+    assert normalize_claim_text("#Svpol: Hej, världen! https://x.se/a") == "svpol hej världen"
+    assert minhash_signature("för kort") is None
+    assert minhash_signature(CLAIM) == minhash_signature(REWORDED)
+    assert estimate_similarity(minhash_signature(CLAIM), minhash_signature(OTHER)) < 0.3
+
+
+def test_near_duplicate_waits_for_its_representative(index):
+    first, follower = _job(CLAIM, "u1"), _job(REWORDED, "u2")
+    assert index.assign(first, minhash_signature(CLAIM))[0] == "new"
+    decision, matched_hash, similarity, _ = index.assign(follower, minhash_signature(REWORDED))
+    assert (decision, matched_hash, similarity) == ("grouped", first['claim_hash'], 1.0)
+    assert index.assign(_job(OTHER, "u3"), minhash_signature(OTHER))[0] == "new"
+
+    assert index.complete(first, minhash_signature(CLAIM), {"evaluation": {"rating": "Likely True"}}) == [follower]
+    decision, matched_hash, _, result = index.assign(_job(REWORDED, "u4"), minhash_signature(REWORDED))
+    assert decision == "reused" and matched_hash == first['claim_hash']
+    assert result == {"evaluation": {"rating": "Likely True"}}
+
+
+def test_released_claims_orphan_their_followers(index):
+    first, follower = _job(CLAIM, "u1"), _job(REWORDED, "u2")
+    index.assign(first, minhash_signature(CLAIM))
+    index.assign(follower, minhash_signature(REWORDED))
+    index.release(first)
+    assert index.drain_orphans() == [follower]
+    assert index.drain_orphans() == []
+    # The released claim is no longer a match
+    assert index.assign(_job(REWORDED, "u3"), minhash_signature(REWORDED))[0] == "new"
+
+
+def test_drain_orphans_clears_unfinished_representatives(index):
+    first, follower = _job(CLAIM, "u1"), _job(REWORDED, "u2")
+    index.assign(first, minhash_signature(CLAIM))
+    index.assign(follower, minhash_signature(REWORDED))
+    assert index.drain_orphans() == [follower]
+    assert index.assign(_job(REWORDED, "u3"), minhash_signature(REWORDED))[0] == "new"
+
+
+def test_stored_results_survive_a_restart_per_model(tmp_path):
+    path = str(tmp_path / "index.sqlite3")
+    index = NearDuplicateIndex(path, "model-a")
+    first = _job(CLAIM, "u1")
+    index.assign(first, minhash_signature(CLAIM))
+    index.complete(first, minhash_signature(CLAIM), {"evaluation": {"rating": "Misleading"}})
+    index.close()
+
+    reopened = NearDuplicateIndex(path, "model-a")
+    assert reopened.assign(_job(REWORDED, "u2"), minhash_signature(REWORDED))[0] == "reused"
+    reopened.close()
+    other_model = NearDuplicateIndex(path, "model-b")
+    assert other_model.assign(_job(REWORDED, "u2"), minhash_signature(REWORDED))[0] == "new"
+    other_model.close()
@@ -0,0 +1,54 @@
+import sqlite3
+import time
+import pytest
+import no_claim_cache
+from cache import DiskCache
+from no_claim_cache import find_no_claim_verdict, no_claim_key, record_no_claim_verdict
+
+NO_CLAIM = {'truthfulness_rating': "Inga verifierbara påståenden hittades", 'llm_reasoning': "En åsikt."}
+CANNOT_VERIFY = {'truthfulness_rating': "Cannot Verify", 'llm_reasoning': "Inga källor."}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    disk_cache = DiskCache(str(tmp_path / "no_claims.sqlite3"), table="no_claims",
+                           default_ttl=no_claim_cache.NO_CLAIM_CACHE_TTL)
+    monkeypatch.setattr(no_claim_cache, "NO_CLAIM_CACHE_DISABLED", False)
+    monkeypatch.setattr(no_claim_cache, "_cache", disk_cache)
+    return disk_cache
+
+
+def _expires_in(cache, key):
+    (expires_at,) = sqlite3.connect(cache.path).execute(
+        "SELECT expires_at FROM no_claims WHERE key = ?", (key,)).fetchone()
+    return expires_at - time.time()
+
+
+def test_verdicts_are_keyed_by_model_and_claim(cache):
+    record_no_claim_verdict("model-a", "hash", NO_CLAIM, "https://reddit.com/1")
+    verdict = find_no_claim_verdict("model-a", "hash")
+    assert verdict['rating'] == NO_CLAIM['truthfulness_rating'] and verdict['source_url'] == "https://reddit.com/1"
+    assert find_no_claim_verdict("model-b", "hash") is None
+    assert find_no_claim_verdict("model-a", "other") is None
+
+
+def test_cannot_verify_expires_sooner(cache):
+    record_no_claim_verdict("m", "no-claim", NO_CLAIM)
+    record_no_claim_verdict("m", "unverifiable", CANNOT_VERIFY)
+    assert _expires_in(cache, no_claim_key("m", "no-claim")) == pytest.approx(no_claim_cache.NO_CLAIM_CACHE_TTL, abs=5)
+    assert _expires_in(cache, no_claim_key("m", "unverifiable")) == \
+        pytest.approx(no_claim_cache.NO_CLAIM_CACHE_UNVERIFIABLE_TTL, abs=5)
+
+
+def test_expired_verdicts_are_forgotten(cache, monkeypatch):
+    monkeypatch.setattr(no_claim_cache, "NO_CLAIM_CACHE_UNVERIFIABLE_TTL", -1)
+    record_no_claim_verdict("m", "unverifiable", CANNOT_VERIFY)
+    record_no_claim_verdict("m", "no-claim", NO_CLAIM)
+    assert find_no_claim_verdict("m", "unverifiable") is None
+    assert find_no_claim_verdict("m", "no-claim") is not None
+
+
+def test_disabled_cache_records_nothing(monkeypatch):
+    monkeypatch.setattr(no_claim_cache, "NO_CLAIM_CACHE_DISABLED", True)
+    record_no_claim_verdict("m", "hash", NO_CLAIM)
+    assert find_no_claim_verdict("m", "hash") is None
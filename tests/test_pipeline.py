@@ -0,0 +1,74 @@
+import threading
+import pytest
+from pipeline import Pipeline, Stage
+
+
+def test_items_flow_through_every_stage():
+    pipeline = Pipeline([Stage("double", lambda x: x * 2, workers=3), Stage("inc", lambda x: x + 1, workers=2)])
+    assert sorted(pipeline.run(range(10))) == [x * 2 + 1 for x in range(10)]
+    assert pipeline.stages[0].stats["processed"] == 10
+    assert pipeline.stages[1].stats["emitted"] == 10
+
+
+def test_none_drops_the_item():
+    pipeline = Pipeline([Stage("odd", lambda x: x if x % 2 else None), Stage("id", lambda x: x)])
+    assert sorted(pipeline.run(range(6))) == [1, 3, 5]
+    assert pipeline.stages[0].stats["dropped"] == 3
+
+
+def test_fan_out_forwards_every_element():
+    pipeline = Pipeline([Stage("split", lambda n: range(n), fan_out=True), Stage("id", lambda x: x)])
+    assert sorted(pipeline.run([2, 3])) == [0, 0, 1, 1, 2]
+    assert pipeline.stages[0].stats["emitted"] == 5
+
+
+def test_batch_stage_receives_lists():
+    sizes = []
+    lock = threading.Lock()
+
+    def batch(items):
+        with lock:
+            sizes.append(len(items))
+        return [item * 10 for item in items]
+
+    pipeline = Pipeline([Stage("batch", batch, batch_size=4, batch_timeout=0.2)])
+    assert sorted(pipeline.run(range(10))) == [x * 10 for x in range(10)]
+    assert sum(sizes) == 10 and max(sizes) <= 4
+
+
+def test_failed_items_are_dropped_and_recorded():
+    def fragile(x):
+        if x == 3:
+            raise ValueError("boom")
+        return x
+
+    pipeline = Pipeline([Stage("fragile", fragile, workers=2), Stage("id", lambda x: x)])
+    assert sorted(pipeline.run(range(5))) == [0, 1, 2, 4]
+    assert pipeline.stages[0].stats["failed"] == 1
+    assert pipeline.failures == [("fragile", 3)]
+
+
+def test_failed_batch_records_every_item():
+    def fragile(items):
+        raise RuntimeError("boom")
+
+    pipeline = Pipeline([Stage("batch", fragile, batch_size=5, batch_timeout=0.2)])
+    assert pipeline.run([1, 2]) == []
+    assert sorted(item for _, item in pipeline.failures) == [1, 2]
+    assert pipeline.stages[0].stats["failed"] == 2
+
+
+def test_merge_adds_stats_of_stages_with_the_same_name():
+    main = Pipeline([Stage("fetch", lambda x: x), Stage("search", lambda x: x)])
+    main.run(range(3))
+    follow_up = Pipeline([Stage("search", lambda x: None if x == 0 else x)])
+    follow_up.run(range(2))
+    main.merge(follow_up)
+    assert main.stages[0].stats["processed"] == 3
+    assert main.stages[1].stats["processed"] == 5
+    assert main.stages[1].stats["dropped"] == 1
+
+
+def test_pipeline_needs_a_stage():
+    with pytest.raises(ValueError):
+        Pipeline([])
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+from prefilter import (HEURISTIC_BIAS, HEURISTIC_WEIGHTS, HEURISTICS, PREFILTER_THRESHOLD, ClaimPrefilter,
+                       PrefilterModel, heuristic_flags, train_prefilter)
+
+
+@pytest.fixture
+def prefilter(tmp_path):
+    claim_prefilter = ClaimPrefilter(model_path=str(tmp_path / "missing.npz"), log_path=str(tmp_path / "log.sqlite3"))
+    yield claim_prefilter
+    claim_prefilter.close()
+
+
+def _job(text, platform="Reddit"):
+    return {'claim_text': text, 'claim_hash': "h", 'label': "post",
+            'source_data': {'platform': platform, 'source_url': "https://reddit.com/r/x/1"}}
+
+
+@pytest.mark.parametrize("text, flags", [
+    ("Varför höjs skatten igen?", ["question", "short", "claim_signal"]),
+    ("Är det bara jag som tycker att detta är pinsamt?", ["question", "opinion"]),
+    ("Skriv under uppropet", ["call_to_action", "short"]),
+    ("Regeringen avgår", ["short", "claim_signal"]),
+    ("Enligt SCB steg arbetslösheten till 8 procent i mars", ["claim_signal"]),
+    ("Läs mer https://example.se/artikel?id=1 här", ["call_to_action", "short"]),
+])
+def test_heuristic_flags(text, flags):
+    assert heuristic_flags(text) == flags
+
+
+def test_question_mark_inside_the_body_is_not_a_question():
+    assert "question" not in heuristic_flags("Regeringen har beslutat om nya regler\nVad betyder det? Mycket.")
+
+
+def test_each_heuristic_has_a_weight():
+    assert len(HEURISTIC_WEIGHTS) == len(HEURISTICS)
+
+
+def _heuristic_probability(*flags):
+    logit = HEURISTIC_BIAS + sum(HEURISTIC_WEIGHTS[HEURISTICS.index(flag)] for flag in flags)
+    return 1.0 / (1.0 + np.exp(-logit))
+
+
+def test_short_alone_stays_below_the_threshold():
+    assert _heuristic_probability("short") < PREFILTER_THRESHOLD
+    assert _heuristic_probability("short", "question") >= PREFILTER_THRESHOLD
+    assert _heuristic_probability("short", "opinion") >= PREFILTER_THRESHOLD
+
+
+@pytest.mark.parametrize("flag", ["question", "opinion", "call_to_action"])
+def test_strong_signals_clear_the_threshold_alone(flag):
+    assert _heuristic_probability(flag) >= PREFILTER_THRESHOLD
+    assert _heuristic_probability(flag, "claim_signal") < PREFILTER_THRESHOLD
+
+
+def test_should_skip_logs_the_decision(prefilter):
+    assert prefilter.scorer == "heuristics"
+    assert prefilter.should_skip(_job("Vad tycker ni om det här?"))
+    assert not prefilter.should_skip(_job("Enligt SCB steg arbetslösheten till 8 procent i mars"))
+    rows = prefilter._conn.execute("SELECT claim_hash, platform, reasons FROM skips").fetchall()
+    assert rows == [("h", "Reddit", "question,opinion")]
+
+
+def test_articles_and_manual_claims_are_never_skipped(prefilter):
+    assert not prefilter.should_skip(_job("Vad tycker ni om det här?", platform="Manual Input"))
+    assert not prefilter.should_skip(_job("Vad tycker ni om det här?", platform="Article via Reddit"))
+
+
+def _examples(count):
+    claims = [f"Enligt rapporten steg priset med {i} procent i Stockholm" for i in range(count)]
+    opinions = [f"Jag tycker verkligen att detta är pinsamt nummer {i}" for i in range(count)]
+    return [(text, False) for text in claims] + [(text, True) for text in opinions]
+
+
+def test_training_needs_enough_examples_of_each_class():
+    assert train_prefilter(_examples(5)) is None
+
+
+def test_trained_model_separates_the_classes_and_round_trips(tmp_path):
+    model = train_prefilter(_examples(40), iterations=100)
+    assert model is not None and model.meta["training_accuracy"] == 1.0
+    opinion = "Jag tycker att detta är pinsamt"
+    claim = "Enligt rapporten steg priset med 12 procent"
+    assert model.probability(opinion, heuristic_flags(opinion)) > 0.5 > model.probability(claim, heuristic_flags(claim))
+
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+    loaded = PrefilterModel.load(path)
+    assert loaded.bias == model.bias and loaded.meta == model.meta
+    assert np.array_equal(loaded.weights, model.weights)
@@ -0,0 +1,59 @@
+from prompts import (PromptTemplate, build_batch_prompt, build_claim_prompt, estimate_tokens, format_metadata,
+                     format_snippets, truncate_to_tokens)
+
+
+def test_estimate_tokens_counts_word_pieces_and_punctuation():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens(None) == 0
+    assert estimate_tokens("Hej") == 1
+    assert estimate_tokens("Hej, världen!") == 5  # hej + , + världen (2) + !
+    assert estimate_tokens("regeringen") == 3
+
+
+def test_truncate_to_tokens_cuts_at_a_word():
+    assert truncate_to_tokens("ett två tre", 10) == "ett två tre"
+    assert truncate_to_tokens("ett två tre fyra fem", 3) == "ett två tre …"
+
+
+def test_template_render_matches_token_estimate():
+    template = PromptTemplate("Claim: {claim}\nEvidence: {evidence}\n{{literal}}")
+    prompt, tokens = template.render(claim="Skatten höjs", evidence="SCB rapporterar")
+    assert prompt == "Claim: Skatten höjs\nEvidence: SCB rapporterar\n{literal}"
+    assert tokens == estimate_tokens(prompt)
+
+
+def test_format_metadata():
+    assert format_metadata(None) == ""
+    assert format_metadata({}) == ""
+    assert format_metadata({"platform": "Reddit", "post_date": "2024-01-01"}) == \
+        "\n[Metadata]\nPlatform: Reddit\nPost Date: 2024-01-01\n"
+
+
+def test_format_snippets_truncates_and_respects_the_evidence_budget():
+    results = [{"url": f"https://example.se/{i}", "title": f"Titel {i}", "snippet": "ord " * 500} for i in range(10)]
+    text = format_snippets(results, snippet_tokens=20, evidence_tokens=100)
+    assert text.startswith("\n1. URL: https://example.se/0")
+    assert "ord ord" in text and "…" in text
+    assert estimate_tokens(text) <= 100
+
+
+def test_format_snippets_always_keeps_the_best_result():
+    results = [{"url": "https://example.se", "title": "T", "snippet": "ord " * 50}]
+    assert "1. URL: https://example.se" in format_snippets(results, snippet_tokens=100, evidence_tokens=1)
+
+
+def test_claim_prompts_include_claim_and_evidence():
+    results = [{"url": "https://example.se", "title": "Titel", "snippet": "Utdrag"}]
+    prompt, tokens = build_claim_prompt("Skatten höjs", results, metadata={"platform": "Reddit"})
+    assert '"Skatten höjs"' in prompt and "Snippet: Utdrag" in prompt and "Platform: Reddit" in prompt
+    assert "Rating:" in prompt and tokens == estimate_tokens(prompt)
+    structured, _ = build_claim_prompt("Skatten höjs", results, structured=True)
+    assert '"truthfulness_score"' in structured
+
+
+def test_batch_prompt_numbers_every_item():
+    batch = [{"claim_text": f"Påstående {i}", "search_results": [], "metadata": None} for i in range(1, 4)]
+    prompt, _ = build_batch_prompt(batch)
+    assert "evaluate 3 separate items" in prompt
+    for i in range(1, 4):
+        assert f"=== Item {i} ===" in prompt and f'"Påstående {i}"' in prompt
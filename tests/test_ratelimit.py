@@ -0,0 +1,64 @@
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from ratelimit import RateLimiter, TokenBucket, is_throttling_error, parse_retry_after
+
+
+def test_burst_is_served_without_waiting():
+    bucket = TokenBucket(rate=1.0, capacity=3)
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.stats["acquired"] == 3
+
+
+def test_empty_bucket_waits_for_a_refill():
+    bucket = TokenBucket(rate=50.0, capacity=1)
+    bucket.acquire()
+    started = time.monotonic()
+    waited = bucket.acquire()
+    assert waited > 0 and time.monotonic() - started >= 0.015
+
+
+def test_throttling_blocks_and_halves_the_rate():
+    bucket = TokenBucket(rate=8.0, capacity=1)
+    assert bucket.throttled(retry_after=0.05) == 0.05
+    assert bucket.rate == 4.0 and bucket.tokens == 0.0
+    started = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - started >= 0.05
+    bucket.succeeded()
+    assert bucket.rate == 4.8 and bucket.consecutive_throttles == 0
+
+
+def test_rate_never_drops_below_a_sixteenth():
+    bucket = TokenBucket(rate=16.0, capacity=1)
+    for _ in range(10):
+        bucket.throttled(retry_after=0)
+    assert bucket.rate == 1.0
+
+
+def test_limiter_keeps_one_bucket_per_provider_and_article_host():
+    limiter = RateLimiter({"tavily": (5.0, 3)})
+    assert limiter.bucket("tavily") is limiter.bucket("tavily")
+    assert limiter.bucket("tavily").capacity == 3
+    assert limiter.bucket("article:a.se") is not limiter.bucket("article:b.se")
+    assert limiter.bucket("unknown").base_rate == limiter.limits["article"][0]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("soon") is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 <= parse_retry_after(later) <= 30
+
+
+def test_is_throttling_error():
+    class Response:
+        status_code = 429
+
+    class HTTPError(Exception):
+        response = Response()
+
+    assert is_throttling_error(HTTPError())
+    assert is_throttling_error(Exception("Quota exceeded for requests"))
+    assert not is_throttling_error(ValueError("bad input"))
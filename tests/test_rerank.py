@@ -0,0 +1,48 @@
+from rerank import bm25_scores, deduplicate_results, rerank_results, tokenize
+
+
+def test_tokenize_drops_stopwords_and_stems_inflections():
+    assert tokenize("Regeringen och regeringens regeringar") == ["regering"] * 3
+    assert tokenize("") == []
+
+
+def test_tokenize_drops_single_letters_but_keeps_single_digits():
+    assert tokenize("Skatt på 6 procent i x") == ["skatt", "6", "procent"]
+
+
+def test_deduplicate_results_by_canonical_url_and_snippet():
+    results = [
+        {"url": "https://example.se/a?utm_source=x", "snippet": "Första"},
+        {"url": "https://EXAMPLE.se/a", "snippet": "Annan text"},
+        {"url": "https://example.se/b", "snippet": "  första "},
+        {"url": "https://example.se/c", "snippet": "Tredje"},
+    ]
+    assert [r["url"] for r in deduplicate_results(results)] == ["https://example.se/a?utm_source=x",
+                                                                 "https://example.se/c"]
+
+
+def test_bm25_scores_are_normalized_and_ordered():
+    scores = bm25_scores("skatten höjs", ["skatten höjs i år", "vädret blir fint", "skatten"])
+    assert scores[0] > scores[2] > scores[1] == 0
+    assert all(0 <= score <= 1 for score in scores)
+    assert list(bm25_scores("och", ["skatten"])) == [0]
+
+
+def test_rerank_results_orders_by_relevance():
+    results = [
+        {"url": "https://example.se/1", "title": "Vädret", "snippet": "Sol i helgen"},
+        {"url": "https://example.se/2", "title": "Skatten höjs", "snippet": "Regeringen höjer skatten på bensin"},
+        {"url": "https://example.se/3", "title": "Bensin", "snippet": "Priset på bensin stiger"},
+    ]
+    ranked = rerank_results("Regeringen höjer skatten på bensin", results)
+    assert [r["url"] for r in ranked] == ["https://example.se/2", "https://example.se/3", "https://example.se/1"]
+    assert ranked[0]["relevance_score"] > ranked[1]["relevance_score"] > ranked[2]["relevance_score"]
+    assert "relevance_score" not in results[0]
+
+
+def test_rerank_results_limits():
+    results = [{"url": f"https://example.se/{i}", "title": "skatt", "snippet": f"skatt {'ord ' * 40}{i}"}
+               for i in range(10)]
+    assert len(rerank_results("skatt", results, top_k=3)) == 3
+    assert len(rerank_results("skatt", results, token_budget=1)) == 1  # The best result is always kept
+    assert rerank_results("skatt", []) == []
@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+import pytest
+from run_journal import RunJournal
+
+
+@pytest.fixture
+def journal(tmp_path):
+    run_journal = RunJournal(str(tmp_path / "journal.sqlite3"))
+    yield run_journal
+    run_journal.close()
+
+
+def _job(n, **extra):
+    return dict({'claim_hash': f"hash{n}", 'claim_text': f"claim {n}", 'minhash': (1, 2, 3),
+                 'source_data': {'source_url': f"https://reddit.com/{n}", 'post_timestamp': datetime(2024, 1, n, tzinfo=timezone.utc)},
+                 'claim_data': {'date_extracted': datetime(2024, 2, n, tzinfo=timezone.utc)}}, **extra)
+
+
+def test_unfinished_run_resumes_from_each_claims_last_stage(journal):
+    run_id = journal.begin()
+    assert journal.latest_unfinished_run() == run_id and journal.run_exists(run_id)
+    journal.record([_job(1), _job(2), _job(3)], 'fetched')
+    journal.record([_job(1, search_results=[{'url': "https://e.se"}]), _job(2, search_results=[])], 'searched')
+    journal.record([_job(2)], 'fetched')  # Never moves a claim back
+    journal.mark_stored([("https://reddit.com/3", "hash3")])
+    assert journal.stage_counts(run_id) == {'searched': 2, 'stored': 1}
+
+    pending = {job['claim_hash']: job for job in journal.pending_jobs(run_id)}
+    assert sorted(pending) == ["hash1", "hash2"]
+    assert pending["hash1"]['journal_stage'] == 'searched'
+    assert pending["hash1"]['search_results'] == [{'url': "https://e.se"}]
+    assert 'minhash' not in pending["hash1"]
+    assert pending["hash1"]['source_data']['post_timestamp'] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert pending["hash2"]['claim_data']['date_extracted'] == datetime(2024, 2, 2, tzinfo=timezone.utc)
+
+
+def test_finished_runs_are_not_resumed_and_can_be_reopened(journal):
+    run_id = journal.begin()
+    journal.finish()
+    assert journal.latest_unfinished_run() is None
+    journal.record([_job(1)], 'fetched')  # Ignored without an open run
+    assert journal.stage_counts(run_id) == {}
+    assert journal.begin(run_id) == run_id
+    assert journal.latest_unfinished_run() == run_id
+
+
+def test_evaluated_jobs_returns_jobs_with_an_evaluation(journal):
+    journal.begin()
+    evaluation = {'truthfulness_rating': "Likely True", 'evaluation_timestamp': datetime(2024, 3, 1, tzinfo=timezone.utc)}
+    journal.record([_job(1, evaluation_data=evaluation), _job(2)], 'evaluated')
+    journal.record([_job(3)], 'fetched')
+    journal.mark_stored([("https://reddit.com/1", "hash1")])
+    journal.finish()
+    jobs = list(journal.evaluated_jobs())
+    assert [job['claim_hash'] for job in jobs] == ["hash1"]
+    assert jobs[0]['evaluation_data']['evaluation_timestamp'] == evaluation['evaluation_timestamp']
+
+
+def test_old_finished_runs_are_pruned(tmp_path):
+    path = str(tmp_path / "journal.sqlite3")
+    journal = RunJournal(path)
+    run_id = journal.begin()
+    journal.record([_job(1)], 'fetched')
+    journal.finish()
+    journal.close()
+    pruned = RunJournal(path, max_age=-1)
+    assert not pruned.run_exists(run_id) and pruned.stage_counts(run_id) == {}
+    pruned.close()
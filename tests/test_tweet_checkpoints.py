@@ -0,0 +1,104 @@
+from datetime import datetime
+import pytest
+import fetchresponse
+
+QUERY = "skatt"
+NAME = f"x:{QUERY}"
+
+
+class NoLimits:
+    def acquire(self, provider):
+        return 0.0
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+def _page(ids, next_token=None):
+    meta = {"result_count": len(ids)}
+    if next_token:
+        meta["next_token"] = next_token
+    return {"data": [{"id": str(i), "text": f"tweet {i}", "created_at": _created_at()} for i in ids], "meta": meta}
+
+
+def _created_at():
+    return datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+class FakeXApi:
+    """Serves scripted search pages and keeps checkpoints in a dict."""
+
+    def __init__(self):
+        self.pages = []
+        self.sent = []
+        self.checkpoints = {}
+
+    def get(self, url, params=None, **kwargs):
+        self.sent.append(dict(params))
+        return FakeResponse(self.pages.pop(0))
+
+
+@pytest.fixture
+def x_api(monkeypatch):
+    api = FakeXApi()
+    checkpoints = api.checkpoints
+    monkeypatch.setattr(fetchresponse.transport, "get", api.get)
+    monkeypatch.setattr(fetchresponse, "get_rate_limiter", lambda: NoLimits())
+    monkeypatch.setattr(fetchresponse, "get_x_user_cache", lambda: None)
+    monkeypatch.setattr(fetchresponse, "_lookup_x_usernames", lambda ids, headers, url: {})
+    monkeypatch.setattr(fetchresponse, "get_checkpoint", lambda name, default=None: checkpoints.get(name, default))
+    monkeypatch.setattr(fetchresponse, "set_checkpoint", checkpoints.__setitem__)
+    return api
+
+
+def _fetch(api, pages, max_results=2):
+    api.pages = list(pages)
+    return fetchresponse.fetch_tweets_requests(QUERY, max_results, "token", incremental=True, max_pages=1)
+
+
+def test_complete_fetch_moves_since_id_to_the_newest_tweet(x_api):
+    x_api.checkpoints[NAME] = {"since_id": "100", "created_at": _created_at()}
+    tweets = _fetch(x_api, [_page([105, 103])])
+    fetchresponse.save_tweet_checkpoint(QUERY, tweets)
+    assert x_api.sent[0]["since_id"] == "100"
+    assert x_api.checkpoints[NAME]["since_id"] == "105" and "until_id" not in x_api.checkpoints[NAME]
+
+
+def test_unread_pages_keep_since_id_until_the_gap_is_fetched(x_api):
+    x_api.checkpoints[NAME] = {"since_id": "100", "created_at": _created_at()}
+    fetchresponse.save_tweet_checkpoint(QUERY, _fetch(x_api, [_page([110, 109], next_token="more")]))
+    checkpoint = x_api.checkpoints[NAME]
+    assert (checkpoint["since_id"], checkpoint["until_id"], checkpoint["newest_id"]) == ("100", "109", "110")
+
+    fetchresponse.save_tweet_checkpoint(QUERY, _fetch(x_api, [_page([108, 107], next_token="more")]))
+    assert (x_api.sent[1]["since_id"], x_api.sent[1]["until_id"]) == ("100", "109")
+    assert x_api.checkpoints[NAME]["until_id"] == "107"
+
+    fetchresponse.save_tweet_checkpoint(QUERY, _fetch(x_api, [_page([104])]))
+    assert x_api.sent[2]["until_id"] == "107"
+    assert x_api.checkpoints[NAME]["since_id"] == "110" and "until_id" not in x_api.checkpoints[NAME]
+
+
+def test_failed_claim_in_the_gap_keeps_the_window(x_api):
+    x_api.checkpoints[NAME] = {"since_id": "100", "created_at": _created_at(), "until_id": "109",
+                               "newest_id": "110", "newest_created_at": _created_at()}
+    tweets = _fetch(x_api, [_page([104, 102])])
+    fetchresponse.save_tweet_checkpoint(QUERY, [tweet for tweet in tweets if tweet["id"] == "102"])
+    assert x_api.checkpoints[NAME]["until_id"] == "109" and x_api.checkpoints[NAME]["since_id"] == "100"
+
+
+def test_first_run_without_a_checkpoint_starts_from_the_newest_tweet(x_api):
+    fetchresponse.save_tweet_checkpoint(QUERY, _fetch(x_api, [_page([110, 109], next_token="more")]))
+    assert "since_id" not in x_api.sent[0]
+    assert x_api.checkpoints[NAME]["since_id"] == "110" and "until_id" not in x_api.checkpoints[NAME]
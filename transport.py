@@ -0,0 +1,114 @@
+import os
+import threading
+from bisect import bisect_left
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Shared HTTP transport for every outbound provider. Sessions keep connections
+# alive per host, so repeated calls to NewsAPI, X or Tavily reuse a warm socket.
+# requests/urllib3 only speak HTTP/1.1; keep-alive pooling gives most of the
+# benefit HTTP/2 multiplexing would for this request volume.
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "20"))
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "20"))  # Number of hosts kept pooled
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))          # Connections kept per host
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+
+DEFAULT_TIMEOUT = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS_MS = [50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class LatencyHistogram:
+    """Thread-safe per-host histogram of response latencies."""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def record(self, host, seconds):
+        milliseconds = seconds * 1000
+        with self._lock:
+            host_stats = self._hosts.setdefault(host, {
+                "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                "buckets": [0] * (len(self.buckets_ms) + 1)
+            })
+            host_stats["count"] += 1
+            host_stats["total_ms"] += milliseconds
+            host_stats["max_ms"] = max(host_stats["max_ms"], milliseconds)
+            host_stats["buckets"][bisect_left(self.buckets_ms, milliseconds)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {host: dict(stats, buckets=list(stats["buckets"])) for host, stats in self._hosts.items()}
+
+
+latency_histogram = LatencyHistogram()
+
+
+def _record_latency(response, *args, **kwargs):
+    latency_histogram.record(urlparse(response.url).netloc, response.elapsed.total_seconds())
+
+
+def build_session():
+    """Creates a pooled keep-alive session with the shared retry policy.
+    Throttling (429) is not retried here; the rate limiter handles it. Read and
+    5xx retries keep urllib3's idempotent-method default, so a POST such as a
+    Tavily search that may already have been billed is never sent twice."""
+    session = requests.Session()
+    retry = Retry(
+        total=HTTP_MAX_RETRIES,
+        connect=HTTP_MAX_RETRIES,
+        read=HTTP_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.hooks["response"].append(_record_latency)
+    return session
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(name="default"):
+    """Returns a process-wide pooled session. Clients that mutate session
+    headers (Tavily, the article loader) get their own named session so
+    their auth/User-Agent headers never leak to other providers."""
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = _sessions[name] = build_session()
+        return session
+
+
+def request(method, url, session_name="default", timeout=DEFAULT_TIMEOUT, **kwargs):
+    return get_session(session_name).request(method, url, timeout=timeout, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def print_http_stats():
+    for host, stats in sorted(latency_histogram.snapshot().items()):
+        average = stats["total_ms"] / stats["count"] if stats["count"] else 0.0
+        labels = [f"<={bound}ms" for bound in latency_histogram.buckets_ms] + [f">{latency_histogram.buckets_ms[-1]}ms"]
+        histogram = " ".join(f"{label}:{count}" for label, count in zip(labels, stats["buckets"]) if count)
+        print(f"HTTP {host:<28} requests={stats['count']:<5} avg={average:.0f}ms max={stats['max_ms']:.0f}ms  {histogram}")
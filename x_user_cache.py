@@ -0,0 +1,24 @@
+import os
+import threading
+from cache import DiskCache, CACHE_DIR
+
+X_USER_CACHE_PATH = os.getenv("X_USER_CACHE_PATH", os.path.join(CACHE_DIR, "x_users.sqlite3"))
+X_USER_CACHE_MAX_ENTRIES = int(os.getenv("X_USER_CACHE_MAX_ENTRIES", "50000"))
+# Usernames can be changed, so resolved IDs are looked up again after a month.
+X_USER_CACHE_TTL = int(os.getenv("X_USER_CACHE_TTL", str(30 * 24 * 3600)))
+X_USER_CACHE_DISABLED = os.getenv("X_USER_CACHE_DISABLED", "").lower() in ("1", "true", "yes")
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_x_user_cache():
+    """Returns the process-wide author-ID -> username store (None when disabled)."""
+    global _cache
+    if X_USER_CACHE_DISABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = DiskCache(X_USER_CACHE_PATH, table="x_users", max_entries=X_USER_CACHE_MAX_ENTRIES,
+                               default_ttl=X_USER_CACHE_TTL)
+    return _cache